@@ -1,31 +1,100 @@
+import os
 from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
 from flask_cors import CORS
 from flask_migrate import Migrate
+from .config import CONFIG_PROFILES
+from .database import RoamSQLAlchemy
 
 
-db = SQLAlchemy()
+db = RoamSQLAlchemy()
 migrate = Migrate()
+# Next to the app package rather than relative to the working directory, so scripts and tests find it too
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
 
 def create_app(config_name='default'):
+    """Build the app with the named profile from `app.config.CONFIG_PROFILES` applied over the defaults."""
+    if config_name not in CONFIG_PROFILES:
+        raise ValueError(f"Unknown config profile {config_name!r}; expected one of {', '.join(CONFIG_PROFILES)}.")
     app = Flask(__name__)
-    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///mydatabase.db'
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     
     app.config['SECRET_KEY'] = "843cc893a5ce8ae33d2d55b121732d26fdd9fce875c25f09d9aeff62eef71959571b0068b6ce06b3ea6b76db86a3c6ef41bae4563008d1a63220e8885daa5db0"
 
+    # Connection search: minimum connect times in minutes, overridable per airport GUID
+    app.config['MIN_CONNECT_MINUTES'] = 60
+    app.config['AIRPORT_MIN_CONNECT_MINUTES'] = {}
+    app.config['MAX_CONNECT_MINUTES'] = 12 * 60
+
+    # Search response cache: entry limit and time-to-live in seconds (None never expires)
+    app.config['SEARCH_CACHE_MAX_ENTRIES'] = 1024
+    app.config['SEARCH_CACHE_TTL_SECONDS'] = 300
+
+    # Serialized airport and airline fragments; reference data only changes through its repositories
+    app.config['FRAGMENT_CACHE_MAX_ENTRIES'] = 20000
+
+    # Seat bookings are optimistic; a booking that loses a race is retried on a fresh read this many times
+    app.config['SEAT_BOOKING_MAX_ATTEMPTS'] = 10
+
+    # Seats picked during checkout are held for this long before they are released to other bookings
+    app.config['SEAT_HOLD_MINUTES'] = 10
+
+    # Largest batch accepted by POST /api/flights/availability
+    app.config['AVAILABILITY_MAX_FLIGHTS'] = 500
+
+    # Seat map streams send a keep-alive this often, and replay at most this many missed deltas
+    app.config['SEAT_STREAM_HEARTBEAT_SECONDS'] = 15
+    app.config['SEAT_STREAM_HISTORY'] = 64
+
+    # Flights inserted per commit when POST /api/flights receives a list
+    app.config['FLIGHT_IMPORT_CHUNK_SIZE'] = 1000
+
+    # Most seat blocks returned by GET /api/flight/<guid>/seats/suggest
+    app.config['SEAT_SUGGESTION_LIMIT'] = 5
+
+    # Cache-Control for conditional GET responses, by blueprint name; ETags make revalidation cheap
+    app.config['CACHE_CONTROL_DEFAULT'] = 'no-cache'
+    app.config['CACHE_CONTROL'] = {
+        'airport': 'public, no-cache',
+        'airline': 'public, no-cache',
+        'popular_destinations': 'public, no-cache',
+    }
+
+    # Database, engine and SQLite settings of the profile, see app/config.py
+    app.config.from_object(CONFIG_PROFILES[config_name])
+
     CORS(app)
-    if config_name == 'testing':
-        app.config['TESTING'] = True
-        app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite:///:memory:'  # Use an in-memory database for tests
-        app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-    
+
     # Initialize db with app
     db.init_app(app)
-    #migrate.init_app(app, db)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIRECTORY)
+
+    # Process-local search structures, filled lazily from the database
+    from .repositories.route_index import RouteIndex
+    from .cache import LRUCache
+    from .middleware import TableVersions
+    from .seat_holds import SeatHolds
+    from .seat_events import SeatEventBroker
+    app.extensions['route_index'] = RouteIndex()
+    app.extensions['search_cache'] = LRUCache(
+        max_entries=app.config['SEARCH_CACHE_MAX_ENTRIES'],
+        ttl_seconds=app.config['SEARCH_CACHE_TTL_SECONDS']
+    )
+    app.extensions['fragment_cache'] = LRUCache(max_entries=app.config['FRAGMENT_CACHE_MAX_ENTRIES'], ttl_seconds=None)
+    app.extensions['table_versions'] = TableVersions()
+    seat_events = SeatEventBroker(history=app.config['SEAT_STREAM_HISTORY'])
+    app.extensions['seat_events'] = seat_events
+    app.extensions['seat_holds'] = SeatHolds(
+        listener=lambda flight_id, taken, freed: seat_events.publish(flight_id, taken, freed)
+    )
 
     # Import and register blueprints
     from .blueprints import register_blueprints
     register_blueprints(app)
 
+    from .read_routing import init_read_routing
+    init_read_routing(app)
+
+    from .cli import roam_cli
+    app.cli.add_command(roam_cli)
+
     return app
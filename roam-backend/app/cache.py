@@ -0,0 +1,176 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Set, Tuple, Union
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with per-entry expiry and tag-based invalidation.
+
+    Entries are tagged with what they were built from, so a write can drop exactly the entries
+    it affects instead of clearing the whole cache. `get_or_set` does not store a value computed
+    while an invalidation was running, so a slow miss can never put stale data back.
+    """
+    def __init__(self, max_entries: int = 1024, ttl_seconds: Optional[float] = 300,
+                 clock: Callable[[], float] = time.monotonic) -> None:
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.RLock()
+        self._entries: "OrderedDict[Hashable, Tuple[Any, Optional[float], FrozenSet[Hashable]]]" = OrderedDict()
+        self._keys_by_tag: Dict[Hashable, Set[Hashable]] = {}
+        self._generation = 0  # Bumped by every invalidation
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.invalidations = 0
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for `key`, or `default` if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, expires_at, _ = entry
+                if expires_at is None or expires_at > self._clock():
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                self._discard(key)
+                self.expirations += 1
+            self.misses += 1
+            return default
+
+    def set(self, key: Hashable, value: Any, tags: Iterable[Hashable] = ()) -> None:
+        """Store a value, evicting the least recently used entries beyond `max_entries`."""
+        with self._lock:
+            self._store(key, value, frozenset(tags))
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any], tags: Iterable[Hashable] = ()) -> Any:
+        """Return the cached value for `key`, computing and storing it with `factory` on a miss."""
+        missing = object()
+        with self._lock:
+            value = self.get(key, missing)
+            generation = self._generation
+        if value is not missing:
+            return value
+
+        # Compute outside the lock so one slow miss does not block every other lookup
+        value = factory()
+        with self._lock:
+            if generation == self._generation:
+                self._store(key, value, frozenset(tags))
+        return value
+
+    def get_many(self, keys: Iterable[Hashable],
+                 loader: Callable[[List[Hashable]], Dict[Hashable, Any]]) -> Dict[Hashable, Any]:
+        """Return the cached values for `keys`, loading every miss with a single `loader` call.
+
+        Keys the loader does not return are left out of the result and are not cached.
+        """
+        missing = object()
+        found: Dict[Hashable, Any] = {}
+        misses: List[Hashable] = []
+        with self._lock:
+            for key in keys:
+                value = self.get(key, missing)
+                if value is missing:
+                    misses.append(key)
+                else:
+                    found[key] = value
+            generation = self._generation
+        if not misses:
+            return found
+
+        loaded = loader(misses)
+        with self._lock:
+            if generation == self._generation:
+                for key, value in loaded.items():
+                    self._store(key, value, frozenset())
+        found.update(loaded)
+        return found
+
+    def invalidate(self, key: Hashable) -> bool:
+        """Drop a single entry."""
+        with self._lock:
+            self._generation += 1
+            if key not in self._entries:
+                return False
+            self._discard(key)
+            self.invalidations += 1
+            return True
+
+    def invalidate_tags(self, tags: Iterable[Hashable]) -> int:
+        """Drop every entry carrying any of the given tags and return how many were dropped."""
+        with self._lock:
+            self._generation += 1
+            keys = set()
+            for tag in tags:
+                keys |= self._keys_by_tag.get(tag, set())
+            for key in keys:
+                self._discard(key)
+            self.invalidations += len(keys)
+            return len(keys)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._generation += 1
+            self._entries.clear()
+            self._keys_by_tag.clear()
+
+    def stats(self) -> Dict[str, Union[int, float, None]]:
+        """Counters describing how well the cache is doing."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "invalidations": self.invalidations,
+            }
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._entries
+
+    def _store(self, key: Hashable, value: Any, tags: FrozenSet[Hashable]) -> None:
+        if key in self._entries:
+            self._discard(key)
+        expires_at = self._clock() + self.ttl_seconds if self.ttl_seconds is not None else None
+        self._entries[key] = (value, expires_at, tags)
+        for tag in tags:
+            self._keys_by_tag.setdefault(tag, set()).add(key)
+
+        while len(self._entries) > self.max_entries:
+            oldest = next(iter(self._entries))
+            self._discard(oldest)
+            self.evictions += 1
+
+    def _discard(self, key: Hashable) -> None:
+        _, _, tags = self._entries.pop(key)
+        for tag in tags:
+            keys = self._keys_by_tag.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._keys_by_tag[tag]
+
+def route_tag(departure_airport_id: Optional[str], arrival_airport_id: Optional[str]) -> Tuple[str, Optional[str], Optional[str]]:
+    """Tag for cached data built from one route; a missing airport stands for any airport."""
+    return ("route", departure_airport_id or None, arrival_airport_id or None)
+
+def route_tags_for_flight(departure_airport_id: str, arrival_airport_id: str) -> List[Tuple[str, Optional[str], Optional[str]]]:
+    """Every route tag whose cached data can include a flight on this route."""
+    return [
+        route_tag(departure_airport_id, arrival_airport_id),
+        route_tag(departure_airport_id, None),
+        route_tag(None, arrival_airport_id),
+        route_tag(None, None),
+    ]
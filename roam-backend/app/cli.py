@@ -0,0 +1,55 @@
+"""`flask roam ...` maintenance commands."""
+import os
+import sys
+from pathlib import Path
+from typing import Optional
+import click
+from flask.cli import AppGroup
+from app.loader import KINDS, LoadStats, iter_json_records, load
+from app.schema import upgrade_database
+
+roam_cli = AppGroup("roam", help="Roam data maintenance commands.")
+
+def peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process in MB, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / (1 << 10)  # Bytes on macOS, KB elsewhere
+
+def _guess_kind(path: str) -> Optional[str]:
+    name = Path(path).name.lower()
+    return next((kind for kind in KINDS if kind.rstrip("s") in name), None)
+
+def _report(stats: LoadStats, final: bool = False) -> None:
+    peak = peak_rss_mb()
+    click.echo(
+        f"{stats.kind}: {stats.records} records read, {stats.rows} rows inserted, {stats.skipped} skipped, "
+        f"{stats.rows_per_second:,.0f} rows/s, {stats.elapsed:.1f}s"
+        + (f", peak RSS {peak:.0f} MB" if peak is not None else ""),
+        err=not final,
+    )
+
+@roam_cli.command("load")
+@click.argument("paths", nargs=-1, required=True, type=click.Path(exists=True, dir_okay=False))
+@click.option("--kind", type=click.Choice(KINDS), help="What the files hold; guessed from each file name by default.")
+@click.option("--batch-size", default=5000, show_default=True, help="Records per executemany batch and commit.")
+def load_command(paths, kind: Optional[str], batch_size: int) -> None:
+    """Stream-load flights, airports or popular destinations from JSON or NDJSON files.
+
+    Records that are already stored are skipped, so a load can be re-run after an interruption.
+    """
+    upgrade_database()
+    for path in paths:
+        file_kind = kind or _guess_kind(path)
+        if file_kind is None:
+            raise click.UsageError(f"Cannot tell what {path} holds; pass --kind.")
+        click.echo(f"Loading {file_kind} from {path} ({os.path.getsize(path) / (1 << 20):.1f} MB)")
+        with open(path, encoding="utf-8") as stream:
+            try:
+                stats = load(file_kind, iter_json_records(stream), batch_size, on_batch=_report)
+            except ValueError as e:
+                raise click.ClickException(f"{path}: {e}")
+        _report(stats, final=True)
@@ -0,0 +1,93 @@
+"""Named configuration profiles for `create_app(config_name)`.
+
+`create_app` sets the application defaults, then applies the profile's settings on top:
+
+- `default`: the development setup, `app/mydatabase.db` with SQLite's own defaults.
+- `production`: the same database, or `ROAM_DATABASE_URI`, tuned for multi-threaded serving.
+  WAL journaling lets readers carry on while a booking writes, `synchronous=NORMAL` syncs at
+  checkpoints instead of on every commit (a power loss can drop the last commits but never corrupts
+  the file), and a connection pool keeps connections and their page caches alive between requests.
+- `benchmark`: the production settings against a scratch database, `ROAM_BENCHMARK_DATABASE_URI`
+  or `roam-benchmark.db` in the temp directory, so benchmarks measure what production runs.
+- `postgres`: PostgreSQL at `ROAM_DATABASE_URI`, for more concurrent writers than SQLite's single
+  write lock allows. Pool size and overflow come from `ROAM_DB_POOL_SIZE` and `ROAM_DB_MAX_OVERFLOW`,
+  and every connection runs with a statement timeout and a lock timeout (`ROAM_DB_STATEMENT_TIMEOUT_MS`,
+  `ROAM_DB_LOCK_TIMEOUT_MS`), so a stuck query or a queue on a seat map row fails instead of pinning
+  a worker. Connections are pre-pinged, so ones dropped by the server or a proxy are replaced.
+- `testing`: an in-memory database, or `ROAM_TEST_DATABASE_URI` to run the suite against another
+  database such as a local PostgreSQL.
+
+`SQLITE_PRAGMAS` are run on every new SQLite connection, in order.
+
+The production profiles send repository reads to `ROAM_READ_REPLICA_URI` when it is set, see
+`app/read_routing.py`. With SQLite it can be the primary's own URI, which gives reads a separate,
+read-only connection pool.
+"""
+import os
+import tempfile
+from sqlalchemy.pool import QueuePool
+
+# Seconds a connection waits for another one's write lock before failing with "database is locked"
+SQLITE_BUSY_TIMEOUT_SECONDS = 5
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = "sqlite:///mydatabase.db"
+    SQLALCHEMY_ENGINE_OPTIONS: dict = {}
+    SQLITE_PRAGMAS: dict = {}
+    READ_REPLICA_URI = None
+    # After a write, that session and client read from the primary for this long, however far the replica lags
+    READ_YOUR_WRITES_SECONDS = 5
+
+class ProductionConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get("ROAM_DATABASE_URI", Config.SQLALCHEMY_DATABASE_URI)
+    SQLITE_PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "busy_timeout": SQLITE_BUSY_TIMEOUT_SECONDS * 1000,
+        "mmap_size": 256 * 1024 * 1024,
+        "cache_size": -32 * 1024,  # Negative sizes are in KiB, so 32 MiB per connection
+        "foreign_keys": "ON",
+    }
+    READ_REPLICA_URI = os.environ.get("ROAM_READ_REPLICA_URI")
+    # Flask-SQLAlchemy opens a new SQLite connection per checkout unless a pool is configured
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "poolclass": QueuePool,
+        "pool_size": 8,
+        "max_overflow": 16,
+        "pool_timeout": 30,
+        "connect_args": {"check_same_thread": False, "timeout": SQLITE_BUSY_TIMEOUT_SECONDS},
+    }
+
+class BenchmarkConfig(ProductionConfig):
+    SQLALCHEMY_DATABASE_URI = os.environ.get(
+        "ROAM_BENCHMARK_DATABASE_URI", "sqlite:///" + os.path.join(tempfile.gettempdir(), "roam-benchmark.db")
+    )
+
+class PostgresConfig(Config):
+    SQLALCHEMY_DATABASE_URI = os.environ.get("ROAM_DATABASE_URI", "postgresql+psycopg2://roam@localhost:5432/roam")
+    READ_REPLICA_URI = os.environ.get("ROAM_READ_REPLICA_URI")
+    SQLALCHEMY_ENGINE_OPTIONS = {
+        "pool_size": int(os.environ.get("ROAM_DB_POOL_SIZE", 10)),
+        "max_overflow": int(os.environ.get("ROAM_DB_MAX_OVERFLOW", 20)),
+        "pool_timeout": 30,
+        "pool_recycle": 1800,
+        "pool_pre_ping": True,
+        "connect_args": {
+            "application_name": "roam-backend",
+            "options": (f"-c statement_timeout={int(os.environ.get('ROAM_DB_STATEMENT_TIMEOUT_MS', 5000))}"
+                        f" -c lock_timeout={int(os.environ.get('ROAM_DB_LOCK_TIMEOUT_MS', 2000))}"),
+        },
+    }
+
+class TestingConfig(Config):
+    TESTING = True
+    SQLALCHEMY_DATABASE_URI = os.environ.get("ROAM_TEST_DATABASE_URI", "sqlite:///:memory:")
+    SQLITE_PRAGMAS = {"foreign_keys": "ON"}
+
+CONFIG_PROFILES = {
+    "default": Config,
+    "production": ProductionConfig,
+    "benchmark": BenchmarkConfig,
+    "postgres": PostgresConfig,
+    "testing": TestingConfig,
+}
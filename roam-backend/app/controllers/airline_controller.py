@@ -1,6 +1,7 @@
 from typing import List, Optional
 from app.services.airline_service import AirlineService
 from app.models.dto.airline_dto import AirlineDTO
+from app.middleware import conditional_get
 from flask import Blueprint, request, jsonify, Response
 
 airline_bp = Blueprint('airline', __name__)
@@ -24,6 +25,7 @@ def create_airline() -> Response:
         return jsonify({"error": str(e)}), 400
 
 @airline_bp.route('/api/airlines', methods=['GET'])
+@conditional_get("airlines")
 def get_all_airlines() -> Response:
     airlines = AirlineService.get_all_airlines()
     airline_list = [airline.to_dto().to_dict() for airline in airlines]
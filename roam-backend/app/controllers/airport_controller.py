@@ -1,7 +1,9 @@
 from typing import List, Optional
 from app.services.airport_service import AirportService
 from app.models.dto.airport_dto import AirportDTO
+from app.middleware import conditional_get
 from flask import Blueprint, request, jsonify, Response
+from sqlalchemy.exc import IntegrityError
 
 airport_bp = Blueprint('airport', __name__)
 
@@ -22,34 +24,38 @@ def create_airport() -> Response:
     
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except IntegrityError:
+        return jsonify({"error": "An airport with the same GUID or IATA code already exists."}), 409
 
 @airport_bp.route('/api/airports', methods=['GET'])
+@conditional_get("airports", "locations", "countries", "continents")
 def get_all_airports() -> Response:
-    airports = AirportService.get_all_airports()
-    airport_list = [airport.to_dto().to_dict() for airport in airports]
-    return jsonify(airport_list), 200
+    return jsonify(AirportService.get_serialized_airports()), 200
 
 @airport_bp.route('/api/airports/<string:guid>', methods=['GET'])
 def get_airport_by_id(guid: str) -> Response:
     try:
-        airport = AirportService.get_airport_by_id(guid)
-        return jsonify(airport.to_dto().to_dict()), 200
+        return jsonify(AirportService.get_serialized_airport_by_id(guid)), 200
     except ValueError:
         return jsonify({"error": "Airport not found"}), 404
     except Exception:
         return jsonify({"error": "Internal Server Error"}), 500
 
+@airport_bp.route('/api/airports/<string:guid>', methods=['DELETE'])
+def delete_airport(guid: str) -> Response:
+    if AirportService.delete_airport(guid):
+        return jsonify({"message": "Airport deleted successfully"}), 200
+    return jsonify({"error": "Airport not found"}), 404
+
 @airport_bp.route('/api/airports/iata/<string:iata_code>', methods=['GET'])
 def get_airport_by_iata_code(iata_code: str) -> Response:
-    airport = AirportService.get_airport_by_iata_code(iata_code)
+    airport = AirportService.get_serialized_airport_by_iata_code(iata_code)
     if airport:
-        return jsonify(airport.to_dto().to_dict()), 200
+        return jsonify(airport), 200
     else:
         return jsonify({"error": "Airport not found"}), 404
 
 @airport_bp.route('/api/airports/country/<string:country_code>', methods=['GET'])
 def get_all_airports_by_country_code(country_code: str) -> Response:
-    airports = AirportService.get_all_airports_by_country_code(country_code)
-    airport_list = [airport.to_dto().to_dict() for airport in airports]
-    return jsonify(airport_list), 200
+    return jsonify(AirportService.get_serialized_airports_by_country_code(country_code)), 200
 
@@ -1,8 +1,11 @@
-from typing import List, Optional
+import json
+from typing import Iterator, List, Optional
 from app.services.flight_service import FlightService
 from app.models.dto.flight_dto import FlightDTO
 from app.models.dto.flight_search_dto import FlightSearchDTO
-from flask import Blueprint, request, jsonify, Response
+from app.repositories.flight_import import ImportInterruptedError
+from app.seat_layouts import SeatUnavailableError
+from flask import Blueprint, current_app, request, jsonify, Response
 
 flight_bp = Blueprint("flight", __name__)
 
@@ -10,31 +13,29 @@ flight_bp = Blueprint("flight", __name__)
 def create_flight() -> Response:
     data = request.json
     
-    # Check if data is a list of dict or a single dict
-    flights_data = data if isinstance(data, list) else [data]
-    
     try:
-        flight_dtos = [FlightDTO.from_dict(flight_data) for flight_data in flights_data]
-        
-        for dto in flight_dtos:
-            FlightService.create_flight(dto)
-        
-        return jsonify({"message": f"{len(flight_dtos)} flight(s) created successfully"}), 201
+        # A list of flights goes through the bulk import path
+        if isinstance(data, list):
+            flight_dtos = [FlightDTO.from_dict(flight_data) for flight_data in data]
+            report = FlightService.create_flights(flight_dtos)
+            return jsonify({"message": f"{report['created']} flight(s) created successfully", **report}), 201
+
+        FlightService.create_flight(FlightDTO.from_dict(data))
+        return jsonify({"message": "1 flight(s) created successfully"}), 201
     
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
+    except ImportInterruptedError as e:
+        return jsonify({"error": str(e), "created": e.committed}), 409
 
 @flight_bp.route("/api/flights", methods=["GET"])
 def get_all_flights() -> Response:
-    flights = FlightService.get_all_flights()
-    flight_list = [flight.to_dto().to_dict() for flight in flights]
-    return jsonify(flight_list), 200
+    return jsonify(FlightService.get_serialized_flights()), 200
 
 @flight_bp.route("/api/flights/<string:guid>", methods=["GET"])
 def get_flight_by_id(guid: str) -> Response:
     try:
-        flight = FlightService.get_flight_by_id(guid)
-        return jsonify(flight.to_dto().to_dict()), 200
+        return jsonify(FlightService.get_serialized_flight_by_id(guid)), 200
     except ValueError:
         return jsonify({"error": "Flight not found"}), 404
     except Exception:
@@ -42,29 +43,42 @@ def get_flight_by_id(guid: str) -> Response:
 
 @flight_bp.route("/api/flights/destination/<string:destination_id>", methods=["GET"])
 def get_flights_by_destination_id(destination_id: str) -> Response:
-    flights = FlightService.get_flights_by_destination_id(destination_id)
-    flight_list = [flight.to_dto().to_dict() for flight in flights]
-    return jsonify(flight_list), 200
+    return jsonify(FlightService.get_serialized_flights(arrival_airport_id=destination_id)), 200
 
 @flight_bp.route("/api/flights/departure/<string:departure_id>", methods=["GET"])
 def get_flights_by_departure_id(departure_id: str) -> Response:
-    flights = FlightService.get_flights_by_departure_id(departure_id)
-    flight_list = [flight.to_dto().to_dict() for flight in flights]
-    return jsonify(flight_list), 200
+    return jsonify(FlightService.get_serialized_flights(departure_airport_id=departure_id)), 200
 
 @flight_bp.route("/api/flights/airline/<string:airline_id>", methods=["GET"])
 def get_flights_by_airline_id(airline_id: str) -> Response:
-    flights = FlightService.get_flights_by_airline_id(airline_id)
-    flight_list = [flight.to_dto().to_dict() for flight in flights]
-    return jsonify(flight_list), 200
+    return jsonify(FlightService.get_serialized_flights(airline_id=airline_id)), 200
 
 @flight_bp.route("/api/flights/search", methods=["POST"])
 def get_flights_by_search_query() -> Response:
     data = request.json
-    flight_search_dto = FlightSearchDTO.from_dict(data)
-    flights = FlightService.get_flights_by_search_query(flight_search_dto)
-    flight_list = [flight.to_dto().to_dict() for flight in flights]
-    return jsonify(flight_list), 200
+    try:
+        flight_search_dto = FlightSearchDTO.from_dict(data)
+        body = FlightService.get_search_response(flight_search_dto, shape=request.args.get("shape"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    return current_app.response_class(body, mimetype=current_app.config["JSONIFY_MIMETYPE"]), 200
+
+@flight_bp.route("/api/flights/search/cache", methods=["GET"])
+def get_search_cache_stats() -> Response:
+    return jsonify(FlightService.get_search_cache_stats()), 200
+
+@flight_bp.route("/api/flights/search/connections", methods=["POST"])
+def get_connecting_flights() -> Response:
+    data = request.json
+    try:
+        flight_search_dto = FlightSearchDTO.from_dict(data)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+    itineraries = FlightService.get_connecting_itineraries(flight_search_dto)
+    itinerary_list = [itinerary.to_dict() for itinerary in itineraries]
+    return jsonify(itinerary_list), 200
 
 @flight_bp.route("/api/flights/<string:guid>", methods=["DELETE"])
 def delete_flight(guid: str) -> Response:
@@ -81,7 +95,8 @@ def delete_flight(guid: str) -> Response:
 def get_flight_seats_by_flight_id(guid: str) -> Response:
     try:
         seat_configuration = FlightService.get_flight_seats_by_flight_id(guid)
-        return jsonify(seat_configuration.to_dto().to_dict()), 200
+        # ?hold=<token> shows the caller's own held seats as available
+        return jsonify(FlightService.get_seat_map(seat_configuration, request.args.get("hold"))), 200
     except ValueError:
         return jsonify({"error": "Flight Seats not found"}), 404
     except Exception:
@@ -92,13 +107,110 @@ def get_flight_seats_by_flight_id(guid: str) -> Response:
 def get_flight_seats_by_id(guid: str) -> Response:
     try:
         seat_configuration = FlightService.get_flight_seats_by_id(guid)
-        return jsonify(seat_configuration.to_dto().to_dict()), 200
+        return jsonify(FlightService.get_seat_map(seat_configuration, request.args.get("hold"))), 200
     except ValueError:
         return jsonify({"error": "Flight Seats not found"}), 404
     except Exception:
         return jsonify({"error": "Internal Server Error"}), 500
     
     
+@flight_bp.route("/api/flight/<string:guid>/availability", methods=["GET"])
+def get_flight_seat_availability(guid: str) -> Response:
+    try:
+        return jsonify(FlightService.get_seat_availability(guid)), 200
+    except ValueError:
+        return jsonify({"error": "Flight Seats not found"}), 404
+
+
+@flight_bp.route("/api/flights/availability", methods=["POST"])
+def get_flight_seat_availabilities() -> Response:
+    flight_ids = (request.json or {}).get("flight_ids")
+    if not isinstance(flight_ids, list) or not all(isinstance(flight_id, str) for flight_id in flight_ids):
+        return jsonify({"error": "flight_ids must be a list of flight GUIDs."}), 400
+    if len(flight_ids) > current_app.config['AVAILABILITY_MAX_FLIGHTS']:
+        return jsonify({"error": f"At most {current_app.config['AVAILABILITY_MAX_FLIGHTS']} flights per request."}), 400
+    # Optional group_size adds a "seats_together" flag to every cabin, for search result badges
+    group_size = (request.json or {}).get("group_size")
+    if group_size is not None and (not isinstance(group_size, int) or isinstance(group_size, bool) or group_size < 1):
+        return jsonify({"error": "group_size must be a positive integer."}), 400
+    return jsonify(FlightService.get_seat_availabilities(flight_ids, group_size)), 200
+
+
+@flight_bp.route("/api/flight/<string:guid>/seats/suggest", methods=["GET"])
+def suggest_flight_seats(guid: str) -> Response:
+    count = request.args.get("count", type=int)
+    if count is None:
+        return jsonify({"error": "count must be a number of passengers."}), 400
+
+    try:
+        suggestions = FlightService.suggest_seats(guid, count, request.args.get("cabin"))
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if suggestions is None:
+        return jsonify({"error": "Flight Seats not found"}), 404
+    return jsonify(suggestions), 200
+
+
+@flight_bp.route("/api/flight/<string:guid>/seats/stream", methods=["GET"])
+def stream_flight_seats(guid: str) -> Response:
+    # Subscribe before responding, so nothing committed after this request is missed
+    subscription = FlightService.subscribe_seat_changes(guid)
+    if subscription is None:
+        return jsonify({"error": "Flight Seats not found"}), 404
+    heartbeat = current_app.config["SEAT_STREAM_HEARTBEAT_SECONDS"]
+    # A reconnecting EventSource may have missed deltas while it was away
+    reconnected = "Last-Event-ID" in request.headers
+
+    def events() -> Iterator[str]:
+        yield "retry: 3000\n\n"
+        if reconnected:
+            yield "event: reset\ndata: {}\n\n"
+        while not subscription.closed:
+            deltas = subscription.wait(heartbeat)
+            if not deltas:
+                yield ": keep-alive\n\n"
+            for seq, delta in deltas:
+                if delta is None:
+                    yield f"id: {seq}\nevent: reset\ndata: {{}}\n\n"
+                else:
+                    yield f"id: {seq}\nevent: seats\ndata: {json.dumps(delta, separators=(',', ':'))}\n\n"
+
+    response = Response(events(), mimetype="text/event-stream")
+    response.headers["Cache-Control"] = "no-cache"
+    response.headers["X-Accel-Buffering"] = "no"
+    response.call_on_close(subscription.close)
+    return response
+
+
+@flight_bp.route("/api/flight/<string:guid>/holds", methods=["POST"])
+def hold_flight_seats(guid: str) -> Response:
+    data = request.json or {}
+    seat_ids = data.get("seat_ids")
+    if (not isinstance(seat_ids, list) or not seat_ids
+            or not all(isinstance(seat_id, int) and not isinstance(seat_id, bool) for seat_id in seat_ids)):
+        return jsonify({"error": "seat_ids must be a non-empty list of seat numbers."}), 400
+    token = data.get("token")
+    if token is not None and not isinstance(token, str):
+        return jsonify({"error": "token must be a hold token."}), 400
+
+    try:
+        hold = FlightService.hold_seats(guid, seat_ids, token)
+    except SeatUnavailableError as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    if hold is None:
+        return jsonify({"error": "Flight Seats not found"}), 404
+    return jsonify(hold), 201
+
+
+@flight_bp.route("/api/flight/holds/<string:token>", methods=["DELETE"])
+def release_flight_seat_hold(token: str) -> Response:
+    if FlightService.release_seat_hold(token):
+        return jsonify({"message": "Seat hold released"}), 200
+    return jsonify({"error": "Seat hold not found"}), 404
+    
+    
 @flight_bp.route("/api/flights/random", methods=["POST"])
 def get_random_flight() -> Response:
     data = request.json
@@ -1,6 +1,7 @@
 from typing import List
 from app.services.pop_destination_service import PopularDestinationService
 from app.models.dto.pop_destination_dto import PopularDestinationDTO
+from app.middleware import conditional_get
 from flask import Blueprint, request, jsonify, Response
 
 destination_bp = Blueprint("popular_destinations", __name__)
@@ -24,6 +25,7 @@ def create_destination() -> Response:
         return jsonify({"error": str(e)}), 400
     
 @destination_bp.route('/api/destination/all', methods=['GET'])
+@conditional_get("popular_destinations")
 def get_all_destinations() -> Response:
     destinations = PopularDestinationService.get_all_destinations()
     destination_list = [destination.to_dto().to_dict() for destination in destinations]
@@ -1,6 +1,7 @@
 from typing import List
 from app.services.trip_service import TripService
 from app.models.dto.trip_dto import TripDTO
+from app.seat_layouts import SeatUnavailableError
 from flask import Blueprint, request, jsonify, Response
 
 trip_bp = Blueprint("trip", __name__)
@@ -14,26 +15,37 @@ def create_trip() -> Response:
     
     try:
         trip_dtos = [TripDTO.from_dict(trip_data) for trip_data in trips_data]
-        
-        for trip_dto in trip_dtos:
-            TripService.create_trip(trip_dto)
+
+        # Seats held during checkout are passed back so the booking can claim them
+        hold_tokens = [trip_data.get("hold_tokens") or [] for trip_data in trips_data]
+        if not all(isinstance(tokens, list) and all(isinstance(token, str) for token in tokens) for tokens in hold_tokens):
+            return jsonify({"error": "hold_tokens must be a list of hold tokens."}), 400
+
+        for trip_dto, tokens in zip(trip_dtos, hold_tokens):
+            TripService.create_trip(trip_dto, hold_tokens=tokens)
         
         return jsonify({"message": f"{len(trip_dtos)} trip(s) created successfully"}), 201
     
+    except SeatUnavailableError as e:
+        return jsonify({"error": str(e)}), 409
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+
+def trip_list_response(**filters) -> Response:
+    # ?shape=normalized sends airports and airlines once in side tables instead of inside every flight
+    try:
+        return jsonify(TripService.get_serialized_trips(shape=request.args.get("shape"), **filters)), 200
     except ValueError as e:
         return jsonify({"error": str(e)}), 400
 
 @trip_bp.route("/api/trips", methods=["GET"])
 def get_all_trips() -> Response:
-    trips = TripService.get_all_trips()
-    trip_list = [trip.to_dto().to_dict() for trip in trips]
-    return jsonify(trip_list), 200
+    return trip_list_response()
 
 @trip_bp.route("/api/trips/<string:guid>", methods=["GET"])
 def get_trip_by_id(guid: str) -> Response:
     try:
-        trip = TripService.get_trip_by_id(guid)
-        return jsonify(trip.to_dto().to_dict()), 200
+        return jsonify(TripService.get_serialized_trip_by_id(guid)), 200
     except ValueError:
         return jsonify({"error": "Trip not found"}), 404
     except Exception:
@@ -43,21 +55,15 @@ def get_trip_by_id(guid: str) -> Response:
 def get_round_trips(is_round_trip: str) -> Response:
     # Convert true/false to boolean
     is_round_trip_bool = is_round_trip.lower() == 'true'
-    trips = TripService.get_round_trips(is_round_trip_bool)
-    trip_list = [trip.to_dto().to_dict() for trip in trips]
-    return jsonify(trip_list), 200
+    return trip_list_response(is_round_trip=is_round_trip_bool)
 
 @trip_bp.route("/api/trips/departing_flight/<string:flight_guid>", methods=["GET"])
 def get_trips_by_departing_flight(flight_guid: str) -> Response:
-    trips = TripService.get_trips_by_departing_flight(flight_guid)
-    trip_list = [trip.to_dto().to_dict() for trip in trips]
-    return jsonify(trip_list), 200
+    return trip_list_response(departing_flight_id=flight_guid)
 
 @trip_bp.route("/api/trips/returning_flight/<string:flight_guid>", methods=["GET"])
 def get_trips_by_returning_flight(flight_guid: str) -> Response:
-    trips = TripService.get_trips_by_returning_flight(flight_guid)
-    trip_list = [trip.to_dto().to_dict() for trip in trips]
-    return jsonify(trip_list), 200
+    return trip_list_response(returning_flight_id=flight_guid)
 
 
 @trip_bp.route("/api/trips/<string:guid>", methods=["DELETE"])
@@ -0,0 +1,63 @@
+"""The Flask-SQLAlchemy extension, with SQLite connections set up from the app's `SQLITE_PRAGMAS`
+and reads routed to `READ_REPLICA_URI` where `app.read_routing` allows it."""
+from typing import Dict, Optional
+from flask_sqlalchemy import SQLAlchemy, SignallingSession
+from sqlalchemy import event, orm
+from sqlalchemy.engine import Engine, make_url
+
+# `Session.info` key: True while a `read_only` method may use the replica, False inside `primary()`
+READ_REPLICA = "read_replica"
+
+def apply_sqlite_pragmas(dbapi_connection, pragmas: Dict[str, object]) -> None:
+    cursor = dbapi_connection.cursor()
+    try:
+        for name, value in pragmas.items():
+            cursor.execute(f"PRAGMA {name}={value}")
+    finally:
+        cursor.close()
+
+class RoutingSession(SignallingSession):
+    """A session that sends the queries of `read_only` methods to the read replica engine."""
+
+    def __init__(self, db: "RoamSQLAlchemy", **options) -> None:
+        self._db = db
+        super().__init__(db, **options)
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        if self.info.get(READ_REPLICA) and not self._flushing:
+            replica = self._db.get_replica_engine(self.app)
+            if replica is not None:
+                return replica
+        return super().get_bind(mapper, clause)
+
+class RoamSQLAlchemy(SQLAlchemy):
+    def create_engine(self, sa_url, engine_opts):
+        engine = super().create_engine(sa_url, engine_opts)
+        pragmas = dict(self.get_app().config.get("SQLITE_PRAGMAS") or {})
+        if pragmas and engine.dialect.name == "sqlite":
+            @event.listens_for(engine, "connect")
+            def _set_pragmas(dbapi_connection, connection_record) -> None:
+                apply_sqlite_pragmas(dbapi_connection, pragmas)
+        return engine
+
+    def create_session(self, options):
+        return orm.sessionmaker(class_=RoutingSession, db=self, **options)
+
+    def get_replica_engine(self, app=None) -> Optional[Engine]:
+        """The engine for `READ_REPLICA_URI`, created with the primary's engine options on first use."""
+        app = self.get_app(app)
+        uri = app.config.get("READ_REPLICA_URI")
+        if not uri:
+            return None
+        with self._engine_lock:
+            engines = app.extensions.setdefault("read_replica", {})
+            if uri not in engines:
+                sa_url, options = self.apply_driver_hacks(app, make_url(uri), dict(app.config["SQLALCHEMY_ENGINE_OPTIONS"]))
+                engine = self.create_engine(sa_url, options)
+                if engine.dialect.name == "sqlite":
+                    # A second pool on the primary's file: make sure nothing is written through it
+                    @event.listens_for(engine, "connect")
+                    def _query_only(dbapi_connection, connection_record) -> None:
+                        apply_sqlite_pragmas(dbapi_connection, {"query_only": "ON"})
+                engines[uri] = engine
+            return engines[uri]
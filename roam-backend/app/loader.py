@@ -0,0 +1,171 @@
+"""Streaming loaders behind `flask roam load`.
+
+Records are parsed one at a time from a JSON array, a single JSON object, or NDJSON, reading the
+file in fixed-size blocks, so memory stays bounded by the batch size however large the file is.
+Each batch is written with executemany inserts and one commit. References shared across batches
+(airlines, airports and their countries, continents and locations) are tracked in one
+`ReferenceMap`, so each is looked up or inserted once per load.
+
+Loading flights straight into the database bypasses the route index and caches of running servers,
+which pick the new flights up when they restart.
+"""
+import json
+import time
+from typing import Callable, Dict, IO, Iterable, Iterator, List, Optional
+from app import db
+from app.models.dto.airport_dto import AirportDTO
+from app.models.dto.flight_dto import FlightDTO
+from app.models.entities.pop_destination_entity import PopularDestinationEntity
+from app.repositories.flight_import import FlightImport, ReferenceMap, existing_guids, insert_rows
+
+READ_BLOCK_SIZE = 1 << 20
+# A record larger than this is treated as malformed input rather than buffered indefinitely
+MAX_RECORD_SIZE = 16 << 20
+
+KINDS = ("flights", "airports", "destinations")
+
+class LoadStats:
+    """Running totals of a load, reported after every batch."""
+
+    def __init__(self, kind: str) -> None:
+        self.kind = kind
+        self.records = 0
+        self.skipped = 0
+        self.inserted: Dict[str, int] = {}
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return max(time.perf_counter() - self.started, 1e-9)
+
+    @property
+    def rows(self) -> int:
+        return sum(self.inserted.values())
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.elapsed
+
+    def add(self, inserted: Dict[str, int]) -> None:
+        for table, rows in inserted.items():
+            self.inserted[table] = self.inserted.get(table, 0) + rows
+
+def iter_json_records(stream: IO[str]) -> Iterator[Dict]:
+    """Yield the records of a JSON array, a lone JSON object, or whitespace-separated JSON values (NDJSON)."""
+    decoder = json.JSONDecoder()
+    buffer, position, eof = "", 0, False
+    in_array = None
+
+    def fill() -> None:
+        nonlocal buffer, position, eof
+        block = stream.read(READ_BLOCK_SIZE)
+        eof = not block
+        buffer, position = buffer[position:] + block, 0
+        if len(buffer) > MAX_RECORD_SIZE:
+            raise ValueError(f"A record is larger than {MAX_RECORD_SIZE} characters.")
+
+    while True:
+        # Skip whitespace, and the commas between array elements
+        while position < len(buffer) and (buffer[position].isspace() or (in_array and buffer[position] == ",")):
+            position += 1
+        if position == len(buffer):
+            if eof:
+                return
+            fill()
+            continue
+
+        if in_array is None:
+            in_array = buffer[position] == "["
+            position += in_array
+            continue
+        if in_array and buffer[position] == "]":
+            in_array = False
+            position += 1
+            continue
+
+        try:
+            record, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError as e:
+            if eof:
+                raise ValueError(f"Invalid JSON: {e}") from None
+            fill()
+            continue
+        if end == len(buffer) and not eof:
+            # A number or literal may continue in the next block
+            fill()
+            continue
+        position = end
+        yield record
+
+def batched(records: Iterable[Dict], size: int) -> Iterator[List[Dict]]:
+    batch: List[Dict] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) == size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+def load(kind: str, records: Iterable[Dict], batch_size: int,
+         on_batch: Optional[Callable[[LoadStats], None]] = None) -> LoadStats:
+    """Load `records` of one kind in batches, calling `on_batch` after each commit.
+
+    Records already stored are skipped, so a load can be re-run after a failure. Raises ValueError
+    naming the first invalid record; batches before it stay committed.
+    """
+    stats = LoadStats(kind)
+    references = ReferenceMap()
+    for batch in batched(records, batch_size):
+        try:
+            if kind == "flights":
+                _load_flights(batch, references, stats)
+            elif kind == "airports":
+                _load_airports(batch, references, stats)
+            elif kind == "destinations":
+                _load_destinations(batch, stats)
+            else:
+                raise ValueError(f"Unknown kind {kind}; expected one of {', '.join(KINDS)}.")
+        except (KeyError, TypeError, ValueError) as e:
+            db.session.rollback()
+            raise ValueError(f"Batch starting at record {stats.records + 1}: {e}") from e
+        stats.records += len(batch)
+        if on_batch is not None:
+            on_batch(stats)
+    return stats
+
+def _load_flights(batch: List[Dict], references: ReferenceMap, stats: LoadStats) -> None:
+    for record in batch:
+        for airport in (record.get("departure_airport"), record.get("arrival_airport"), (record.get("layover") or {}).get("airport")):
+            _nest_continent(airport)
+    flight_import = FlightImport([FlightDTO.from_dict(record) for record in batch], references, skip_existing=True).prepare()
+    for _, inserted in flight_import.insert(len(batch)):
+        stats.add(inserted)
+    stats.skipped += flight_import.skipped
+
+def _load_airports(batch: List[Dict], references: ReferenceMap, stats: LoadStats) -> None:
+    for record in batch:
+        _nest_continent(record)
+        references.add_airport(AirportDTO.from_dict(record))
+    new_rows = references.resolve()
+    inserted: Dict[str, int] = {}
+    for entity, rows in new_rows.items():
+        insert_rows(entity, rows, inserted)
+    db.session.commit()
+    stats.add(inserted)
+    stats.skipped += len(batch) - inserted.get("airports", 0)
+
+def _load_destinations(batch: List[Dict], stats: LoadStats) -> None:
+    rows = {record["guid"]: {"guid": record["guid"], "name": record["name"], "image_path": record.get("image_path")}
+            for record in batch}
+    existing = existing_guids(PopularDestinationEntity, rows)
+    inserted: Dict[str, int] = {}
+    insert_rows(PopularDestinationEntity, [row for guid, row in rows.items() if guid not in existing], inserted)
+    db.session.commit()
+    stats.add(inserted)
+    stats.skipped += len(batch) - inserted.get("popular_destinations", 0)
+
+def _nest_continent(airport: Optional[Dict]) -> None:
+    # Exported airports carry the continent beside the country rather than inside it
+    if airport and airport.get("continent") and isinstance(airport.get("country"), dict):
+        airport["country"].setdefault("continent", airport["continent"])
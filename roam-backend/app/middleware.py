@@ -0,0 +1,97 @@
+"""Conditional GET support for read-mostly endpoints.
+
+Every table has an in-memory version counter that is bumped whenever a commit writes to it. A view
+decorated with `conditional_get(*tables)` gets a strong ETag derived from the versions of the tables
+it reads, so a request whose `If-None-Match` still matches is answered with 304 before the view runs
+and without touching the database.
+
+Writes are picked up from the ORM unit of work, including cascaded deletes. Statements that bypass
+it (Core `update()`/`delete()`, raw SQL) must call `TableVersions.bump` themselves. The counters are
+per process: with several workers, a write in one is only noticed by the others when their own
+counters move, so multi-process deployments should keep `Cache-Control` short.
+"""
+import hashlib
+import threading
+import uuid
+from functools import wraps
+from typing import Callable, Dict, Iterable, Set
+from flask import Response, current_app, has_app_context, make_response, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.read_routing import primary
+
+class TableVersions:
+    """Thread-safe version counter per table name."""
+
+    def __init__(self) -> None:
+        # Counters restart at zero, so tags from a previous process must never match
+        self.epoch = uuid.uuid4().hex
+        self._lock = threading.Lock()
+        self._versions: Dict[str, int] = {}
+
+    def get(self, table: str) -> int:
+        with self._lock:
+            return self._versions.get(table, 0)
+
+    def bump(self, tables: Iterable[str]) -> None:
+        with self._lock:
+            for table in tables:
+                self._versions[table] = self._versions.get(table, 0) + 1
+
+    def etag(self, tables: Iterable[str], variant: bytes = b"") -> str:
+        """A strong entity tag for a representation built from `tables`."""
+        with self._lock:
+            state = ",".join(f"{table}={self._versions.get(table, 0)}" for table in sorted(tables))
+        return hashlib.sha1(f"{self.epoch}|{state}|".encode() + variant).hexdigest()
+
+def get_table_versions() -> TableVersions:
+    return current_app.extensions["table_versions"]
+
+def _written_tables(session: Session) -> Set[str]:
+    return session.info.setdefault("written_tables", set())
+
+@event.listens_for(db.session, "after_flush")
+def _record_written_tables(session: Session, flush_context) -> None:
+    written = _written_tables(session)
+    for instance in (*session.new, *session.dirty, *session.deleted):
+        table = getattr(instance, "__tablename__", None)
+        if table is not None and (instance not in session.dirty or session.is_modified(instance)):
+            written.add(table)
+
+@event.listens_for(db.session, "after_commit")
+def _bump_written_tables(session: Session) -> None:
+    written = session.info.pop("written_tables", None)
+    if written and has_app_context() and "table_versions" in current_app.extensions:
+        get_table_versions().bump(written)
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_written_tables(session: Session, previous_transaction) -> None:
+    session.info.pop("written_tables", None)
+
+def cache_control_for(blueprint: str) -> str:
+    """The `Cache-Control` header configured for a blueprint, falling back to `CACHE_CONTROL_DEFAULT`."""
+    return current_app.config["CACHE_CONTROL"].get(blueprint, current_app.config["CACHE_CONTROL_DEFAULT"])
+
+def conditional_get(*tables: str) -> Callable:
+    """Tag a GET view with an ETag built from the versions of `tables` and answer matching requests with 304."""
+    def decorator(view: Callable) -> Callable:
+        @wraps(view)
+        def wrapper(*args, **kwargs) -> Response:
+            # Tag before reading: a write landing mid-request then only makes the tag older, never newer than the body
+            etag = get_table_versions().etag(tables, request.query_string)
+            cache_control = cache_control_for(request.blueprint)
+
+            if request.if_none_match.contains_weak(etag):
+                response = Response(status=304)
+            else:
+                # The tag is the primary's, so the body must be too: a lagging replica's would be cached as current
+                with primary():
+                    response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+            response.set_etag(etag)
+            response.headers["Cache-Control"] = cache_control
+            return response
+        return wrapper
+    return decorator
@@ -1,21 +1,110 @@
-from typing import Optional, Dict
+from typing import Optional, Dict, Union
+from app.utils import parse_clock_time
+
+TIME_OF_DAY_OPTIONS = ("Morning", "Afternoon", "Evening")
+SORT_OPTIONS = ("price", "duration", "departure_time")
+
+def _number(data: Dict, key: str, cast: type, default=None):
+    """`data[key]` converted with `cast`, or `default` when it is missing or null."""
+    value = data.get(key)
+    if value is None:
+        return default
+    try:
+        return cast(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{key} must be a number.")
 
 class FlightSearchDTO:
-    """DTO for searching flights by airport IDs."""
-    def __init__(self, departure_airport_id: str, arival_airport_id: str):
+    """DTO for searching flights by airport IDs, with optional filters, sorting and paging."""
+    def __init__(self, departure_airport_id: str, arival_airport_id: str, max_stops: int = 2, max_results: int = 10,
+                 max_price: Optional[float] = None, stops: Optional[int] = None,
+                 departure_time_of_day: Optional[str] = None, arrival_time_of_day: Optional[str] = None,
+                 departure_after: Optional[int] = None, departure_before: Optional[int] = None,
+                 airline_id: Optional[str] = None, sort_by: Optional[str] = None,
+                 page_size: Optional[int] = None, cursor: Optional[str] = None):
         self.departure_airport_id = departure_airport_id
         self.arival_airport_id = arival_airport_id
-        
+        self.max_stops = max_stops
+        self.max_results = max_results
+        self.max_price = max_price
+        self.stops = stops
+        self.departure_time_of_day = departure_time_of_day
+        self.arrival_time_of_day = arrival_time_of_day
+        self.departure_after = departure_after  # Minutes after midnight, inclusive
+        self.departure_before = departure_before  # Minutes after midnight, inclusive
+        self.airline_id = airline_id
+        self.sort_by = sort_by
+        self.page_size = page_size
+        self.cursor = cursor
+
+    @property
+    def is_paginated(self) -> bool:
+        return self.page_size is not None or self.cursor is not None
 
     def to_dict(self) -> Dict[str, Optional[Dict]]:
         return {
             "departure_airport_id": self.departure_airport_id,
             "arival_airport_id": self.arival_airport_id,
+            "max_stops": self.max_stops,
+            "max_results": self.max_results,
+            "max_price": self.max_price,
+            "stops": self.stops,
+            "departure_time_of_day": self.departure_time_of_day,
+            "arrival_time_of_day": self.arrival_time_of_day,
+            "departure_after": self.departure_after,
+            "departure_before": self.departure_before,
+            "airline_id": self.airline_id,
+            "sort_by": self.sort_by,
+            "page_size": self.page_size,
+            "cursor": self.cursor,
         }
-        
+
     @staticmethod
-    def from_dict(data: Dict[str, str]) -> "FlightSearchDTO":
+    def from_dict(data: Dict[str, Union[str, int, float]]) -> "FlightSearchDTO":
+        max_stops = _number(data, "max_stops", int, 2)
+        max_results = _number(data, "max_results", int, 10)
+        if not 0 <= max_stops <= 2:
+            raise ValueError("max_stops must be between 0 and 2.")
+        if not 1 <= max_results <= 100:
+            raise ValueError("max_results must be between 1 and 100.")
+
+        max_price = _number(data, "max_price", float)
+        stops = _number(data, "stops", int)
+        page_size = _number(data, "page_size", int)
+        if page_size is not None and not 1 <= page_size <= 100:
+            raise ValueError("page_size must be between 1 and 100.")
+
+        for key in ("departure_time_of_day", "arrival_time_of_day"):
+            if data.get(key) and data[key] not in TIME_OF_DAY_OPTIONS:
+                raise ValueError(f"{key} must be one of {', '.join(TIME_OF_DAY_OPTIONS)}.")
+        # Departure window bounds are sent as 24-hour "HH:MM" strings
+        departure_window = {}
+        for key in ("departure_after", "departure_before"):
+            value = data.get(key)
+            if value is None or value == "":
+                continue
+            departure_window[key] = parse_clock_time(value) if isinstance(value, str) else None
+            if departure_window[key] is None:
+                raise ValueError(f"{key} must be a time in HH:MM format.")
+        if data.get("sort_by") and data["sort_by"] not in SORT_OPTIONS:
+            raise ValueError(f"sort_by must be one of {', '.join(SORT_OPTIONS)}.")
+        # Cursors are opaque strings handed out by earlier pages; search_filters decodes them
+        if data.get("cursor") and not isinstance(data["cursor"], str):
+            raise ValueError("Invalid cursor.")
+
         return FlightSearchDTO(
             departure_airport_id=data.get("departure_airport_id", ""),
-            arival_airport_id=data.get("arival_airport_id", "")
+            arival_airport_id=data.get("arival_airport_id", ""),
+            max_stops=max_stops,
+            max_results=max_results,
+            max_price=max_price,
+            stops=stops,
+            departure_time_of_day=data.get("departure_time_of_day") or None,
+            arrival_time_of_day=data.get("arrival_time_of_day") or None,
+            departure_after=departure_window.get("departure_after"),
+            departure_before=departure_window.get("departure_before"),
+            airline_id=data.get("airline_id") or None,
+            sort_by=data.get("sort_by") or None,
+            page_size=page_size,
+            cursor=data.get("cursor") or None
         )
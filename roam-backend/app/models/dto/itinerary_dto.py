@@ -0,0 +1,22 @@
+from typing import Dict, List, Union
+from app.models.dto.flight_dto import FlightDTO
+
+class ItineraryDTO:
+    """DTO for a connecting itinerary, including its flight legs and the wait at each connection."""
+    def __init__(self, legs: List[FlightDTO], wait_minutes: List[int], total_minutes: int, total_price: float) -> None:
+        self.legs = legs
+        self.wait_minutes = wait_minutes
+        self.total_minutes = total_minutes
+        self.total_price = total_price
+
+    def to_dict(self) -> Dict[str, Union[int, float, List[Dict]]]:
+        return {
+            "legs": [leg.to_dict() for leg in self.legs],
+            "connections": [
+                {"airport_id": leg.arrival_airport.guid if leg.arrival_airport else None, "wait_minutes": wait}
+                for leg, wait in zip(self.legs, self.wait_minutes)
+            ],
+            "num_stops": len(self.legs) - 1,
+            "total_minutes": self.total_minutes,
+            "total_price": self.total_price,
+        }
@@ -20,7 +20,7 @@ class AirportEntity(db.Model):
     
     # Foreign keys for Location, Country, and Continent
     location_id: str = db.Column(db.String(36), db.ForeignKey('locations.guid'), nullable=False)
-    country_id: str = db.Column(db.String(36), db.ForeignKey('countries.guid'), nullable=False)
+    country_id: str = db.Column(db.String(36), db.ForeignKey('countries.guid'), nullable=False, index=True)
     
     # Relationships
     location = db.relationship("LocationEntity", back_populates="airports")
@@ -69,8 +69,6 @@ class AirportEntity(db.Model):
                 location = LocationEntity(guid=dto.location.guid, latitude=dto.location.latitude, longitude=dto.location.longitude)
                 db.session.add(location)
 
-        db.session.commit()
-
         return AirportEntity(
             guid=dto.guid,
             full_name=dto.full_name,
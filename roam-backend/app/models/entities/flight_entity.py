@@ -1,4 +1,5 @@
 import uuid
+from sqlalchemy.orm import validates
 from app import db
 import random
 from app.models.entities.airline_entity import AirlineEntity
@@ -6,21 +7,24 @@ from app.models.entities.airport_entity import AirportEntity
 from app.models.entities.layover_entity import LayoverEntity
 from app.models.entities.flight_seats_entity import FlightSeatsEntity
 from app.models.dto.flight_dto import FlightDTO
+from app.utils import parse_time_of_day
 
 class FlightEntity(db.Model):
     """Represents a flight with details like duration, departure and arrival times, stops, prices, and related airline and airports."""
     __tablename__ = 'flights'
     guid: str = db.Column(db.String(36), primary_key=True, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     flight_time_minutes: int = db.Column(db.Integer, nullable=False)  # Flight duration in minutes
-    departure_time: str = db.Column(db.String(5), nullable=False)  # Time in HH:MM format
-    arrival_time: str = db.Column(db.String(5), nullable=False)  # Time in HH:MM format
+    departure_time: str = db.Column(db.String(7), nullable=False)  # Time in H:MMAM format, e.g. "10:30AM"
+    arrival_time: str = db.Column(db.String(7), nullable=False)  # Time in H:MMAM format, e.g. "10:30AM"
+    departure_minute: int = db.Column(db.Integer, nullable=True, index=True)  # departure_time as minutes after midnight
+    arrival_minute: int = db.Column(db.Integer, nullable=True, index=True)  # arrival_time as minutes after midnight
     num_stops: int = db.Column(db.Integer, nullable=True)
     price_economy: float = db.Column(db.Float, nullable=False)
     price_business: float = db.Column(db.Float, nullable=True)
     baggage_allowance: str = db.Column(db.String(50), nullable=False)
     
     # Foreign keys
-    airline_id: str = db.Column(db.String(36), db.ForeignKey('airlines.guid'), nullable=False)
+    airline_id: str = db.Column(db.String(36), db.ForeignKey('airlines.guid'), nullable=False, index=True)
     departure_airport_id: str = db.Column(db.String(36), db.ForeignKey('airports.guid'), nullable=False)
     arrival_airport_id: str = db.Column(db.String(36), db.ForeignKey('airports.guid'), nullable=False)
 
@@ -34,6 +38,23 @@ class FlightEntity(db.Model):
 
     departing_trips = db.relationship("TripEntity", foreign_keys="[TripEntity.departing_flight_id]", back_populates="departing_flight", passive_deletes=True)
     returning_trips = db.relationship("TripEntity", foreign_keys="[TripEntity.returning_flight_id]", back_populates="returning_flight", passive_deletes=True)
+
+    __table_args__ = (
+        # Route searches filtered on a departure window become a single index range scan
+        db.Index("ix_flights_route_departure_minute", "departure_airport_id", "arrival_airport_id", "departure_minute"),
+        # Searches by arrival airport alone, optionally within an arrival window; departures use the route index above
+        db.Index("ix_flights_arrival_airport_minute", "arrival_airport_id", "arrival_minute"),
+    )
+
+    @validates("departure_time", "arrival_time")
+    def validate_time(self, key: str, value: str) -> str:
+        """Keep the numeric minute-of-day columns in step with the display strings."""
+        minute = parse_time_of_day(value)
+        if key == "departure_time":
+            self.departure_minute = minute
+        else:
+            self.arrival_minute = minute
+        return value
     
 
     def to_dto(self) -> FlightDTO:
@@ -85,12 +106,12 @@ class FlightEntity(db.Model):
                 arrival_airport = AirportEntity.from_dto(dto.arrival_airport)
                 db.session.add(arrival_airport)
                 
-        # Check for flight seat configuration and create it if it doesn't exist
+        # Check for flight seat configuration and create it if it doesn't exist. New seat maps and layovers
+        # join the session through the flight, so an autoflush cannot insert them before the flight exists.
         seat_config = FlightSeatsEntity.query.filter_by(flight_id=dto.guid).first()
         if not seat_config:
             seat_config = FlightSeatsEntity(guid=str(uuid.uuid4()), flight_id=dto.guid)
             seat_config.generate_seat_configuration()
-            db.session.add(seat_config)
                 
         # Check for layover and create it if it doesn't exist
         layover = None
@@ -104,7 +125,6 @@ class FlightEntity(db.Model):
             if not layover:
                 layover = LayoverEntity.from_dto(dto.layover)
                 #layover.guid = str(uuid.uuid4())
-                db.session.add(layover)
 
         flight = FlightEntity(
             guid=dto.guid,
@@ -124,5 +144,4 @@ class FlightEntity(db.Model):
         if layover:
             flight.layover = layover
 
-        db.session.commit()
         return flight
\ No newline at end of file
@@ -1,6 +1,9 @@
 import uuid
+from typing import Dict, List, Optional, Sequence, Union
+import numpy as np
 from app import db
-import random
+from app.seat_layouts import STANDARD_LAYOUT, SeatLayout, count_seats, get_layout
+from app.seat_occupancy import pack_occupancy, random_occupancy
 from app.models.dto.flight_seats_dto import FlightSeatsDTO
 
 class FlightSeatsEntity(db.Model):
@@ -8,6 +11,7 @@ class FlightSeatsEntity(db.Model):
     __tablename__ = 'flight_seats'
     guid: str = db.Column(db.String(36), primary_key=True, unique=True, nullable=False, default=lambda: str(uuid.uuid4()))
     seats_available: int = db.Column(db.Integer)
+    version_id: int = db.Column(db.Integer, nullable=False, default=1)
 
     # Foreign keys
     flight_id: str = db.Column(db.String(36), db.ForeignKey('flights.guid'), unique=True, nullable=False)
@@ -15,56 +19,72 @@ class FlightSeatsEntity(db.Model):
     # Relationships
     flight = db.relationship("FlightEntity", back_populates="seat_configuration", uselist=False, passive_deletes=True)
 
-    # JSON seat configuration
-    seat_configuration = db.Column(db.JSON, nullable=False)
-    
-    def generate_seat_configuration(self):
+    # Every UPDATE checks and bumps version_id, so a write based on a stale read fails with StaleDataError.
+    # Deletes are not booking races, so deleting an already deleted seat map stays a no-op.
+    __mapper_args__ = {"version_id_col": version_id, "confirm_deleted_rows": False}
+
+    # Booked seats as a bitset over the shared cabin layout (bit n set = seat n + 1 booked)
+    layout_id: str = db.Column(db.String(36), nullable=False, default=STANDARD_LAYOUT.layout_id)
+    booked_seats: bytes = db.Column(
+        db.LargeBinary, nullable=False,
+        default=lambda context: get_layout(context.get_current_parameters()["layout_id"]).pack(0)
+    )
+
+    @property
+    def layout(self) -> SeatLayout:
+        return get_layout(self.layout_id or STANDARD_LAYOUT.layout_id)
+
+    @property
+    def booked_mask(self) -> int:
+        return SeatLayout.unpack(self.booked_seats)
+
+    @booked_mask.setter
+    def booked_mask(self, booked: int) -> None:
+        layout = self.layout
+        self.booked_seats = layout.pack(booked & layout.all_seats)
+        self.seats_available = layout.size - count_seats(booked & layout.all_seats)
+
+    @property
+    def seat_configuration(self) -> List[Dict[str, Union[int, str, bool]]]:
+        """The per-seat list the API returns, expanded from the layout and the booked bitset."""
+        return self.layout.expand(self.booked_mask)
+
+    @seat_configuration.setter
+    def seat_configuration(self, seat_configuration: List[Dict[str, Union[int, str, bool]]]) -> None:
+        self.booked_mask = self.layout.booked_from_configuration(seat_configuration or [])
+
+    def is_available(self, seat_id: int) -> bool:
+        return self.layout.has_seat(seat_id) and not self.booked_mask & self.layout.seat_mask(seat_id)
+
+    def book_seat(self, seat_id: int) -> bool:
+        """Mark a seat as booked. Returns False if the layout has no such seat."""
+        if not self.layout.has_seat(seat_id):
+            return False
+        self.booked_mask = self.booked_mask | self.layout.seat_mask(seat_id)
+        return True
+
+    def generate_seat_configuration(self, rng: Optional[np.random.Generator] = None):
         """Generates the default seat configuration for the flight."""
-        seats = []
-        for i in range(1, 189):  # Seats 1 to 188
-            if i <= 20:  # Business class
-                seat_type = "Business"
-                position = "Window" if i % 4 in [1, 4] else "Aisle"
-            else:  # Economy class
-                seat_type = "Economy"
-                position = (
-                    "Window" if i % 6 in [1, 6]
-                    else "Aisle" if i % 6 in [2, 5]
-                    else "Middle"
-                )
-            seats.append({"seat_id": i, "type": seat_type, "position": position, "available": True})
-
-        self.seat_configuration = seats
-        self.occupy_seats_randomly()  # Apply occupancy after configuration is set
-
-    def occupy_seats_randomly(self):
+        if self.layout_id is None:
+            self.layout_id = STANDARD_LAYOUT.layout_id
+        self.booked_mask = 0
+        self.occupy_seats_randomly(rng)  # Apply occupancy after configuration is set
+
+    def occupy_seats_randomly(self, rng: Optional[np.random.Generator] = None):
         """Randomly occupies seats to achieve realistic occupancy levels with passenger groupings."""
-        total_seats = 188
-        occupied_percentage = random.uniform(0.25, 0.80)  # Occupy between 25% and 80% of the plane
-        seats_to_occupy = int(total_seats * occupied_percentage)
-        
-        self.seats_available = total_seats - seats_to_occupy
-
-        remaining_seats_to_occupy = seats_to_occupy
-        i = 0
-        while remaining_seats_to_occupy > 0 and i < len(self.seat_configuration):
-            seat = self.seat_configuration[i]
-            if seat["available"]:
-                # 75% chance of choosing this seat and possibly adjacent ones
-                if random.random() < 0.75:
-                    seat["available"] = False
-                    remaining_seats_to_occupy -= 1
-
-                    # Attempt to occupy adjacent seats
-                    if remaining_seats_to_occupy > 0 and seat["type"] == "Economy":
-                        adjacent_indices = [i + 1, i - 1] if seat["position"] in ["Middle", "Aisle"] else [i + 1]
-                        for adj_idx in adjacent_indices:
-                            if 0 <= adj_idx < total_seats and self.seat_configuration[adj_idx]["available"]:
-                                self.seat_configuration[adj_idx]["available"] = False
-                                remaining_seats_to_occupy -= 1
-                                if remaining_seats_to_occupy == 0:
-                                    break
-            i += 1
+        booked_seats, _ = pack_occupancy(random_occupancy(self.layout, 1, rng))
+        self.booked_mask |= SeatLayout.unpack(booked_seats[0])
+
+    @staticmethod
+    def generate_many(flight_ids: Sequence[str], layout: SeatLayout = STANDARD_LAYOUT,
+                      rng: Optional[np.random.Generator] = None) -> List["FlightSeatsEntity"]:
+        """New randomly occupied seat maps for many flights, generated together in one vectorized pass."""
+        booked_seats, booked_counts = pack_occupancy(random_occupancy(layout, len(flight_ids), rng))
+        return [
+            FlightSeatsEntity(guid=str(uuid.uuid4()), flight_id=flight_id, layout_id=layout.layout_id,
+                              booked_seats=packed, seats_available=layout.size - booked)
+            for flight_id, packed, booked in zip(flight_ids, booked_seats, booked_counts)
+        ]
 
     def to_dto(self) -> FlightSeatsDTO:
         return FlightSeatsDTO(
@@ -80,8 +100,8 @@ class FlightSeatsEntity(db.Model):
             guid=dto.guid,
             seats_available=dto.seats_available,
             flight_id=dto.flight_id,
-            seat_configuration=dto.seat_configuration
+            layout_id=STANDARD_LAYOUT.layout_id
         )
+        flight_seats.seat_configuration = dto.seat_configuration
 
-        db.session.commit()
         return flight_seats
\ No newline at end of file
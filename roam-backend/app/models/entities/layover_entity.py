@@ -10,7 +10,7 @@ class LayoverEntity(db.Model):
     
     # Foreign keys
     flight_id: str = db.Column(db.String(36), db.ForeignKey('flights.guid'), unique=True, nullable=False)
-    airport_id: str = db.Column(db.String(36), db.ForeignKey('airports.guid'), nullable=False)
+    airport_id: str = db.Column(db.String(36), db.ForeignKey('airports.guid'), nullable=False, index=True)
     
     # Layover details
     duration_minutes: int = db.Column(db.Integer, nullable=False)
@@ -30,16 +30,14 @@ class LayoverEntity(db.Model):
     @staticmethod
     def from_dto(dto: LayoverDTO) -> "LayoverEntity":
         # Check for airport and create it if it doesn't exist
+        airport = None
         if dto.airport:
             airport = AirportEntity.query.filter_by(guid=dto.airport.guid).first()
             if not airport:
                 airport = AirportEntity.from_dto(dto.airport)
                 
-        layover = LayoverEntity(
+        return LayoverEntity(
             guid=dto.guid,
             airport=airport,
             duration_minutes=dto.duration_minutes
         )
-        
-        db.session.commit()
-        return layover
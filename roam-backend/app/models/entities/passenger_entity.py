@@ -10,7 +10,7 @@ class PassengerEntity(db.Model):
     name = db.Column(db.String(100), nullable=False)
     
     # Foreign key to Trip
-    trip_id = db.Column(db.String(36), db.ForeignKey('trips.guid'), nullable=False)
+    trip_id = db.Column(db.String(36), db.ForeignKey('trips.guid'), nullable=False, index=True)
     trip = db.relationship("TripEntity", back_populates="passengers")
 
     # Seat assignments for both departing and returning flights
@@ -15,8 +15,8 @@ class TripEntity(db.Model):
     return_date = db.Column(db.Date, nullable=True)  # Null if one-way trip
     
     # Foreign keys
-    departing_flight_id = db.Column(db.String(36), db.ForeignKey('flights.guid', ondelete="CASCADE"), nullable=False)
-    returning_flight_id = db.Column(db.String(36), db.ForeignKey('flights.guid', ondelete="CASCADE"), nullable=True)
+    departing_flight_id = db.Column(db.String(36), db.ForeignKey('flights.guid', ondelete="CASCADE"), nullable=False, index=True)
+    returning_flight_id = db.Column(db.String(36), db.ForeignKey('flights.guid', ondelete="CASCADE"), nullable=True, index=True)
 
     # Relationships
     departing_flight = db.relationship("FlightEntity", foreign_keys=[departing_flight_id], back_populates="departing_trips", passive_deletes=True)
@@ -79,6 +79,6 @@ class TripEntity(db.Model):
         trip.passengers = list_passangers
 
         db.session.add(trip)
-        db.session.commit()
+        db.session.flush()
         return trip
     
\ No newline at end of file
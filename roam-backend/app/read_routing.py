@@ -0,0 +1,108 @@
+"""Routing of repository reads to a read replica.
+
+With `READ_REPLICA_URI` set, repository methods decorated with `read_only` run their queries on a
+second engine: a streaming replica of the PostgreSQL primary, or a read-only pool on the same
+SQLite file, whose WAL readers never wait for the writer. Everything else stays on the primary:
+flushes, anything inside a unit of work (so the reads of a booking transaction see what they lock),
+and blocks wrapped in `primary()`, which write methods that look a row up before opening their unit
+of work use. Reads that fill process-wide caches, such as the route index and the serialized
+fragments, are not routed either, since a lagging replica would cache rows past their invalidation.
+For the same reason `conditional_get` views read from the primary, whose table versions their ETags carry.
+
+A replica can lag, so a client must still see its own writes: once a session commits a write, it
+reads from the primary for `READ_YOUR_WRITES_SECONDS`, and in a request the response sets a cookie
+that keeps that client's following requests on the primary for the same window.
+"""
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Iterator
+from flask import Flask, Response, current_app, g, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from app import db
+from app.database import READ_REPLICA
+from app.unit_of_work import in_unit_of_work
+
+STICKY_COOKIE = "roam_primary_until"
+
+def replica_configured() -> bool:
+    return bool(current_app.config.get("READ_REPLICA_URI"))
+
+def _reads_primary(session: Session) -> bool:
+    if in_unit_of_work() or session.info.get("wrote") or session.new or session.deleted:
+        return True
+    if session.info.get("primary_until", 0) > time.monotonic():
+        return True
+    return has_request_context() and g.get("read_primary", False)
+
+def read_only(method: Callable) -> Callable:
+    """Run `method`'s queries on the read replica, unless the session has to read from the primary."""
+    @wraps(method)
+    def wrapper(*args, **kwargs):
+        session = db.session()
+        if session.info.get(READ_REPLICA) is not None or not replica_configured() or _reads_primary(session):
+            return method(*args, **kwargs)
+        session.info[READ_REPLICA] = True
+        try:
+            return method(*args, **kwargs)
+        finally:
+            del session.info[READ_REPLICA]
+    return wrapper
+
+@contextmanager
+def primary() -> Iterator[None]:
+    """Keep the reads of the block on the primary, including those of `read_only` methods."""
+    info = db.session.info
+    previous = info.get(READ_REPLICA)
+    info[READ_REPLICA] = False
+    try:
+        yield
+    finally:
+        if previous is None:
+            info.pop(READ_REPLICA, None)
+        else:
+            info[READ_REPLICA] = previous
+
+@event.listens_for(db.session, "after_flush")
+def _record_write(session: Session, flush_context) -> None:
+    session.info["wrote"] = True
+
+@event.listens_for(db.session, "do_orm_execute")
+def _record_statement_write(execute_state) -> None:
+    # Bulk inserts and Core statements run through `session.execute` without a flush
+    if execute_state.is_insert or execute_state.is_update or execute_state.is_delete:
+        execute_state.session.info["wrote"] = True
+
+@event.listens_for(db.session, "after_commit")
+def _stick_to_primary(session: Session) -> None:
+    if not session.info.pop("wrote", False):
+        return
+    window = current_app.config["READ_YOUR_WRITES_SECONDS"]
+    session.info["primary_until"] = time.monotonic() + window
+    if has_request_context():
+        g.read_primary = True
+        g.primary_until = time.time() + window
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_write(session: Session, previous_transaction) -> None:
+    session.info.pop("wrote", None)
+
+def init_read_routing(app: Flask) -> None:
+    """Carry read-your-writes stickiness across a client's requests in a cookie."""
+    @app.before_request
+    def _read_sticky_cookie() -> None:
+        if not replica_configured():
+            return
+        try:
+            g.read_primary = float(request.cookies.get(STICKY_COOKIE, 0)) > time.time()
+        except ValueError:
+            g.read_primary = False
+
+    @app.after_request
+    def _set_sticky_cookie(response: Response) -> Response:
+        primary_until = g.get("primary_until")
+        if primary_until is not None and replica_configured():
+            response.set_cookie(STICKY_COOKIE, f"{primary_until:.3f}", max_age=current_app.config["READ_YOUR_WRITES_SECONDS"],
+                                httponly=True, samesite="Lax")
+        return response
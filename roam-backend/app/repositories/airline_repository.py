@@ -1,40 +1,70 @@
-from typing import List, Optional
-from app import db
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from app import db, serializers
+from app.cache import LRUCache
 from app.models.entities.airline_entity import AirlineEntity
 from app.models.dto.airline_dto import AirlineDTO
+from app.unit_of_work import after_commit, unit_of_work
+from app.read_routing import primary, read_only
 
 class AirlineRepository:
     @staticmethod
     def add(airline_dto: "AirlineDTO") -> None:
         """Add an airport to the database, creating and or linking the country, continent, and location as needed."""
         # Convert DTO to AirlineEntity and create or link associated entities if needed
-        airline_entity = AirlineEntity.from_dto(airline_dto)
-        
-        db.session.add(airline_entity)
-        db.session.commit()
+        with unit_of_work():
+            airline_entity = AirlineEntity.from_dto(airline_dto)
+            db.session.add(airline_entity)
+            after_commit(lambda: AirlineRepository.get_fragment_cache().invalidate(("airline", airline_dto.guid)))
         
     @staticmethod
+    @read_only
     def get_all() -> List[AirlineEntity]:
         """Retrieve all airports from the database."""
         return AirlineEntity.query.all()
 
     @staticmethod
+    @read_only
     def get_by_guid(guid: str) -> Optional[AirlineEntity]:
         """Retrieve an airport by its GUID."""
         return AirlineEntity.query.filter_by(guid=guid).first()
 
     @staticmethod
+    @read_only
     def find_by_icao_code(icao_code: str) -> Optional[AirlineEntity]:
         """Find an airport by its IATA code."""
         return AirlineEntity.query.filter_by(icao_code=icao_code).first()
     
     @staticmethod
+    @primary()
     def delete_airline(guid: str) -> bool:
         """Delete an airport by its GUID."""
+        from app.repositories.flight_repository import FlightRepository  # It imports this module
+
         airline = AirlineRepository.get_by_guid(guid)
         if airline:
-            db.session.delete(airline)
-            db.session.commit()
+            def invalidate() -> None:
+                AirlineRepository.get_fragment_cache().invalidate(("airline", guid))
+                # Search responses embed the airline fragment
+                FlightRepository.get_search_cache().clear()
+
+            with unit_of_work():
+                db.session.delete(airline)
+                after_commit(invalidate)
             return True
         return False
 
+    @staticmethod
+    def get_fragments(guids: Iterable[str]) -> Dict[str, Dict]:
+        """Serialized airlines by GUID, from the fragment cache with one query for any misses."""
+        def load(keys):
+            statement = serializers.AIRLINE_SELECT.where(AirlineEntity.guid.in_([guid for _, guid in keys]))
+            return {("airline", fragment["guid"]): fragment for fragment in serializers.serialize_airlines(db.session.execute(statement))}
+
+        fragments = AirlineRepository.get_fragment_cache().get_many([("airline", guid) for guid in guids], load)
+        return {guid: fragment for (_, guid), fragment in fragments.items()}
+
+    @staticmethod
+    def get_fragment_cache() -> LRUCache:
+        """Return the app's cache of serialized airport and airline fragments."""
+        return current_app.extensions["fragment_cache"]
@@ -1,24 +1,23 @@
-from typing import List, Optional
-from app import db
+from typing import Dict, Iterable, List, Optional
+from flask import current_app
+from app import db, serializers
+from app.cache import LRUCache
 from app.models.entities.airport_entity import AirportEntity
 from app.models.entities.country_entity import CountryEntity
 from app.models.dto.airport_dto import AirportDTO
+from app.unit_of_work import after_commit, unit_of_work
+from app.read_routing import primary, read_only
 
 class AirportRepository:
     @staticmethod
     def add(airport_dto: "AirportDTO") -> None:
-        print(f"Adding airport: {airport_dto}")  # Debug DTO being added
-        airport_entity = AirportEntity.from_dto(airport_dto)
-        print(f"Airport entity created: {airport_entity}")  # Debug entity content
-        try:
-            db.session.add(airport_entity)
-            db.session.commit()
-            print("Airport added successfully.")
-        except Exception as e:
-            db.session.rollback()
-            print(f"Failed to add airport: {e}")  # Debug error on add
+        """Add an airport, creating or linking its location, country and continent as needed."""
+        with unit_of_work():
+            db.session.add(AirportEntity.from_dto(airport_dto))
+            after_commit(lambda: AirportRepository.get_fragment_cache().invalidate(("airport", airport_dto.guid)))
 
     @staticmethod
+    @read_only
     def get_all() -> List[AirportEntity]:
         print("Fetching all airports...")  # Debug fetch start
         airports = AirportEntity.query.all()
@@ -26,8 +25,63 @@ class AirportRepository:
         return airports
 
     @staticmethod
+    @read_only
     def get_by_guid(guid: str) -> Optional[AirportEntity]:
         print(f"Fetching airport by GUID: {guid}")  # Debug GUID
         airport = AirportEntity.query.filter_by(guid=guid).first()
         print(f"Fetched airport: {airport}")  # Debug fetched airport
         return airport
+
+    @staticmethod
+    @read_only
+    def find_serialized(**filters) -> List[Dict]:
+        """Serialize airports matching column filters straight from one projected query, without entities or DTOs."""
+        airport = serializers.AIRPORT.airport
+        statement = serializers.AIRPORT_SELECT.where(*(getattr(airport, name) == value for name, value in filters.items()))
+        return serializers.serialize_airports(db.session.execute(statement))
+
+    @staticmethod
+    @read_only
+    def find_serialized_by_country_code(country_code: str) -> List[Dict]:
+        """Serialize the airports of a country, looked up by its country code."""
+        statement = serializers.AIRPORT_SELECT.where(serializers.AIRPORT.country.code == country_code)
+        return serializers.serialize_airports(db.session.execute(statement))
+
+    @staticmethod
+    def get_fragments(guids: Iterable[str]) -> Dict[str, Dict]:
+        """Serialized airports by GUID, from the fragment cache with one query for any misses."""
+        def load(keys):
+            airport = serializers.AIRPORT.airport
+            statement = serializers.AIRPORT_SELECT.where(airport.guid.in_([guid for _, guid in keys]))
+            return {("airport", fragment["guid"]): fragment for fragment in serializers.serialize_airports(db.session.execute(statement))}
+
+        fragments = AirportRepository.get_fragment_cache().get_many([("airport", guid) for guid in guids], load)
+        return {guid: fragment for (_, guid), fragment in fragments.items()}
+
+    @staticmethod
+    def get_fragment_cache() -> LRUCache:
+        """Return the app's cache of serialized airport and airline fragments."""
+        return current_app.extensions["fragment_cache"]
+
+    @staticmethod
+    @primary()
+    def delete_airport(guid: str) -> bool:
+        """Delete an airport by its GUID, along with the flights that use it."""
+        from app.repositories.flight_repository import FlightRepository  # It imports this module
+
+        airport = AirportRepository.get_by_guid(guid)
+        if airport:
+            with unit_of_work():
+                flight_ids = {flight.guid for flight in (*airport.departure_flights, *airport.arrival_flights)}
+                db.session.delete(airport)
+
+                def invalidate() -> None:
+                    AirportRepository.get_fragment_cache().invalidate(("airport", guid))
+                    # Cascaded flight deletes bypass FlightRepository, so unindex them and drop cached searches here
+                    index = FlightRepository.get_route_index()
+                    for flight_id in flight_ids:
+                        index.remove(flight_id)
+                    FlightRepository.get_search_cache().clear()
+                after_commit(invalidate)
+            return True
+        return False
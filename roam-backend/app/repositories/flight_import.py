@@ -0,0 +1,287 @@
+"""Bulk flight imports.
+
+`FlightRepository.add` resolves every reference of a flight with its own queries and commits along
+the way, which is fine for one flight but dominates imports of thousands. `FlightImport` checks
+every airline, airport, country, continent and location the batch references with one `IN` query per
+table, remembers them in an identity map, and validates the whole batch before writing anything:
+existing GUIDs and codes, and every column the tables require. It then inserts plain row mappings
+with executemany, committing once per chunk, so a chunk the database still rejects leaves the
+chunks before it committed; `ImportInterruptedError` reports how many flights those hold.
+
+A `ReferenceMap` can outlive one batch: the `flask roam load` command shares one across a whole
+file, so each reference is looked up or inserted once however many flights use it.
+"""
+import uuid
+from collections import Counter
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import select
+from app import db
+from app.models.dto.airline_dto import AirlineDTO
+from app.models.dto.airport_dto import AirportDTO
+from app.models.dto.flight_dto import FlightDTO
+from app.models.entities.airline_entity import AirlineEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.continent_entity import ContinentEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.flight_entity import FlightEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.layover_entity import LayoverEntity
+from app.models.entities.location_entity import LocationEntity
+from app.repositories.route_index import FlightRecord
+from app.seat_layouts import STANDARD_LAYOUT
+from app.seat_occupancy import pack_occupancy, random_occupancy
+from app.utils import parse_time_of_day
+
+# Keeps each IN list below every database's bound parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Schedules repeat the same few hundred times of day, and strptime dominates row building otherwise
+_minute_of_day = lru_cache(maxsize=4096)(parse_time_of_day)
+
+# Insert order, parents first
+REFERENCE_ENTITIES = (ContinentEntity, CountryEntity, LocationEntity, AirportEntity, AirlineEntity)
+
+# Unique columns besides the GUID, checked before new reference rows are inserted
+UNIQUE_COLUMNS = {
+    ContinentEntity: ("code", "name"),
+    CountryEntity: ("code",),
+    AirportEntity: ("iata_code",),
+    AirlineEntity: ("icao_code",),
+}
+
+class ImportInterruptedError(Exception):
+    """The database rejected a chunk after `committed` flights of the batch had been committed."""
+
+    def __init__(self, message: str, committed: int) -> None:
+        super().__init__(message)
+        self.committed = committed
+
+class ReferenceMap:
+    """Identity map of the reference rows a batch points at, by entity and GUID.
+
+    `add_*` queue a reference the first time its GUID is seen; `resolve` returns the queued rows the
+    database does not have yet. GUIDs already known to exist are never looked up again.
+    """
+
+    def __init__(self) -> None:
+        self.known: Dict[type, Set[str]] = {entity: set() for entity in REFERENCE_ENTITIES}
+        self._pending: Dict[type, Dict[str, Dict]] = {entity: {} for entity in REFERENCE_ENTITIES}
+
+    def add_airline(self, airline: AirlineDTO) -> None:
+        self._queue(AirlineEntity, airline.guid, lambda: {
+            "guid": airline.guid, "icao_code": airline.icao_code, "name": airline.name, "logo_path": airline.logo_path,
+        })
+
+    def add_airport(self, airport: AirportDTO) -> None:
+        country, location = airport.country, airport.location
+        continent = country.continent if country else None
+        if continent:
+            self._queue(ContinentEntity, continent.guid, lambda: {
+                "guid": continent.guid, "code": continent.code, "name": continent.name,
+            })
+        if country:
+            self._queue(CountryEntity, country.guid, lambda: {
+                "guid": country.guid, "code": country.code, "name": country.name,
+                "continent_id": continent.guid if continent else None,
+            })
+        if location:
+            self._queue(LocationEntity, location.guid, lambda: {
+                "guid": location.guid, "latitude": location.latitude, "longitude": location.longitude,
+            })
+        self._queue(AirportEntity, airport.guid, lambda: {
+            "guid": airport.guid, "full_name": airport.full_name, "short_name": airport.short_name,
+            "municipality_name": airport.municipality_name, "iata_code": airport.iata_code,
+            "location_id": location.guid if location else None, "country_id": country.guid if country else None,
+        })
+
+    def resolve(self) -> Dict[type, List[Dict]]:
+        """The queued rows still missing from the database, parents first, after which all count as known.
+
+        Raises ValueError for a new airport without a location or country, a new country without
+        a continent, a new row missing a required column, or one whose code is taken by another row.
+        """
+        new_rows: Dict[type, List[Dict]] = {}
+        for entity, rows in self._pending.items():
+            existing = existing_guids(entity, rows)
+            new_rows[entity] = [row for guid, row in rows.items() if guid not in existing]
+        for airport in new_rows[AirportEntity]:
+            if not airport["location_id"] or not airport["country_id"]:
+                raise ValueError(f"New airport {airport['guid']} needs a location and a country.")
+        for country in new_rows[CountryEntity]:
+            if not country["continent_id"]:
+                raise ValueError(f"New country {country['guid']} needs a continent.")
+        for entity, rows in new_rows.items():
+            check_required(entity, rows)
+        for entity, columns in UNIQUE_COLUMNS.items():
+            for column in columns:
+                _check_unique(entity, column, new_rows[entity])
+
+        for entity, rows in self._pending.items():
+            self.known[entity].update(rows)
+            rows.clear()
+        return new_rows
+
+    def _queue(self, entity: type, guid: str, row) -> None:
+        if guid not in self.known[entity] and guid not in self._pending[entity]:
+            self._pending[entity][guid] = row()
+
+class FlightImport:
+    """Row mappings for a batch of new flights and the references they need, ready to insert.
+
+    With `skip_existing`, flights already stored (or repeated in the batch) are dropped instead of
+    rejecting the batch, so re-running an import only adds what is missing.
+    """
+
+    def __init__(self, flight_dtos: Sequence[FlightDTO], references: Optional[ReferenceMap] = None,
+                 skip_existing: bool = False) -> None:
+        self.flight_dtos = list(flight_dtos)
+        self.references = references if references is not None else ReferenceMap()
+        self.skip_existing = skip_existing
+        self.skipped = 0
+        self.new_references: Dict[type, List[Dict]] = {}
+        self.flights: List[Dict] = []
+        self.seat_maps: List[Dict] = []
+        self.layovers: List[Dict] = []
+
+    def prepare(self) -> "FlightImport":
+        """Validate the batch and build every row it inserts. Raises ValueError before anything is written."""
+        self._check_new_flights()
+        for dto in self.flight_dtos:
+            self.references.add_airline(dto.airline)
+            self.references.add_airport(dto.departure_airport)
+            self.references.add_airport(dto.arrival_airport)
+            if dto.layover:
+                self.references.add_airport(dto.layover.airport)
+        self.new_references = self.references.resolve()
+
+        for dto in self.flight_dtos:
+            self.flights.append(_flight_row(dto))
+            if dto.layover:
+                self.layovers.append({
+                    "guid": dto.layover.guid or str(uuid.uuid4()),
+                    "flight_id": dto.guid,
+                    "airport_id": dto.layover.airport.guid,
+                    "duration_minutes": dto.layover.duration_minutes,
+                })
+        check_required(FlightEntity, self.flights)
+        check_required(LayoverEntity, self.layovers)
+
+        booked_seats, booked_counts = pack_occupancy(random_occupancy(STANDARD_LAYOUT, len(self.flight_dtos)))
+        for dto, packed, booked in zip(self.flight_dtos, booked_seats, booked_counts):
+            self.seat_maps.append({
+                "guid": str(uuid.uuid4()), "flight_id": dto.guid, "layout_id": STANDARD_LAYOUT.layout_id,
+                "booked_seats": packed, "seats_available": STANDARD_LAYOUT.size - booked, "version_id": 1,
+            })
+        return self
+
+    def insert(self, chunk_size: int) -> Iterable[Tuple[List[FlightRecord], Dict[str, int]]]:
+        """Insert the batch, committing every `chunk_size` flights.
+
+        Yields the route index records of each committed chunk and the rows it inserted per table. The new
+        references go in with the first chunk.
+        """
+        layovers = {layover["flight_id"]: layover for layover in self.layovers}
+        seat_maps = {seat_map["flight_id"]: seat_map for seat_map in self.seat_maps}
+        for start in range(0, max(len(self.flights), 1), chunk_size):
+            inserted: Dict[str, int] = {}
+            if start == 0:
+                for entity, rows in self.new_references.items():
+                    insert_rows(entity, rows, inserted)
+
+            flights = self.flights[start:start + chunk_size]
+            insert_rows(FlightEntity, flights, inserted)
+            insert_rows(FlightSeatsEntity, [seat_maps[flight["guid"]] for flight in flights], inserted)
+            insert_rows(LayoverEntity, [layovers[flight["guid"]] for flight in flights if flight["guid"] in layovers], inserted)
+            if inserted:
+                db.session.commit()
+                yield [_record(flight) for flight in flights], inserted
+
+    def _check_new_flights(self) -> None:
+        guids = [dto.guid for dto in self.flight_dtos]
+        if any(not guid for guid in guids):
+            raise ValueError("Every flight needs a guid.")
+        existing = existing_guids(FlightEntity, guids)
+        if self.skip_existing:
+            first_of_each = {}
+            for dto in self.flight_dtos:
+                if dto.guid not in existing:
+                    first_of_each.setdefault(dto.guid, dto)
+            self.skipped += len(self.flight_dtos) - len(first_of_each)
+            self.flight_dtos = list(first_of_each.values())
+        else:
+            duplicates = sorted(guid for guid, count in Counter(guids).items() if count > 1)
+            if duplicates:
+                raise ValueError(f"Flights appear more than once: {', '.join(duplicates)}")
+            if existing:
+                raise ValueError(f"Flights already exist: {', '.join(sorted(existing))}")
+
+        layover_guids = [dto.layover.guid for dto in self.flight_dtos if dto.layover and dto.layover.guid]
+        existing = existing_guids(LayoverEntity, layover_guids)
+        if existing:
+            raise ValueError(f"Layovers already exist: {', '.join(sorted(existing))}")
+
+        for dto in self.flight_dtos:
+            if not dto.airline or not dto.departure_airport or not dto.arrival_airport:
+                raise ValueError(f"Flight {dto.guid} needs an airline and both airports.")
+            if dto.layover and not dto.layover.airport:
+                raise ValueError(f"The layover of flight {dto.guid} needs an airport.")
+
+def existing_guids(entity: type, guids: Iterable[str]) -> Set[str]:
+    """The given GUIDs that already have a row, looked up in batches."""
+    return existing_values(entity.guid, guids)
+
+def existing_values(column, values: Iterable) -> Set:
+    """The given values that some row already has in `column`, looked up in batches."""
+    values = list(values)
+    existing: Set = set()
+    for start in range(0, len(values), LOOKUP_BATCH_SIZE):
+        batch = values[start:start + LOOKUP_BATCH_SIZE]
+        existing.update(db.session.execute(select(column).where(column.in_(batch))).scalars())
+    return existing
+
+def check_required(entity: type, rows: List[Dict]) -> None:
+    """Raise ValueError for the first row missing a column the table requires and cannot default."""
+    required = [column.name for column in entity.__table__.columns
+                if not column.nullable and column.default is None and column.server_default is None]
+    for row in rows:
+        missing = [name for name in required if row.get(name) is None]
+        if missing:
+            raise ValueError(f"{entity.__tablename__} row {row.get('guid')} is missing {', '.join(missing)}.")
+
+def _check_unique(entity: type, column: str, rows: List[Dict]) -> None:
+    values = [row[column] for row in rows if row[column] is not None]
+    taken = {value for value, count in Counter(values).items() if count > 1}
+    taken |= existing_values(getattr(entity, column), set(values))
+    if taken:
+        raise ValueError(f"{entity.__tablename__}.{column} already in use: {', '.join(sorted(map(str, taken)))}")
+
+def insert_rows(entity: type, rows: List[Dict], inserted: Dict[str, int]) -> None:
+    """Insert row mappings with one executemany, counting them in `inserted` by table.
+
+    Goes through Core, so column defaults apply but ORM events and validators do not.
+    """
+    if rows:
+        db.session.execute(entity.__table__.insert(), rows)
+        inserted[entity.__tablename__] = inserted.get(entity.__tablename__, 0) + len(rows)
+
+def _flight_row(dto: FlightDTO) -> Dict:
+    # Row mappings skip the entity's validators, so the minute columns are filled in here
+    return {
+        "guid": dto.guid,
+        "flight_time_minutes": dto.flight_time_minutes,
+        "departure_time": dto.departure_time,
+        "arrival_time": dto.arrival_time,
+        "departure_minute": _minute_of_day(dto.departure_time),
+        "arrival_minute": _minute_of_day(dto.arrival_time),
+        "num_stops": dto.num_stops,
+        "price_economy": dto.price_economy,
+        "price_business": dto.price_business,
+        "baggage_allowance": dto.baggage_allowance,
+        "airline_id": dto.airline.guid,
+        "departure_airport_id": dto.departure_airport.guid,
+        "arrival_airport_id": dto.arrival_airport.guid,
+    }
+
+def _record(flight: Dict) -> FlightRecord:
+    return FlightRecord(**{field: flight[field] for field in FlightRecord._fields})
@@ -1,63 +1,292 @@
-from typing import List, Optional
-from app import db
+from typing import Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+from flask import current_app
+from sqlalchemy import or_, select
+from sqlalchemy.exc import DBAPIError, IntegrityError
+from sqlalchemy.orm import Query, joinedload
+from sqlalchemy.orm.exc import StaleDataError
+from app import db, serializers
 import uuid
 from app.models.entities.flight_entity import FlightEntity
 from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.layover_entity import LayoverEntity
 from app.models.dto.flight_dto import FlightDTO
+from app.repositories.route_index import RouteIndex, FlightRecord
+from app.repositories.flight_import import FlightImport, ImportInterruptedError
+from app.repositories.airport_repository import AirportRepository
+from app.repositories.airline_repository import AirlineRepository
+from app.cache import LRUCache, route_tags_for_flight
+from app.middleware import get_table_versions
+from app.seat_holds import SeatHolds
+from app.seat_layouts import SeatLayout, SeatUnavailableError, count_seats, get_layout
+from app.unit_of_work import after_commit, in_unit_of_work, unit_of_work
+from app.read_routing import primary, read_only
 
 class FlightRepository:
+    # Columns projected into route index records, in FlightRecord field order
+    RECORD_COLUMNS = (
+        FlightEntity.guid,
+        FlightEntity.departure_airport_id,
+        FlightEntity.arrival_airport_id,
+        FlightEntity.airline_id,
+        FlightEntity.departure_minute,
+        FlightEntity.arrival_minute,
+        FlightEntity.flight_time_minutes,
+        FlightEntity.num_stops,
+        FlightEntity.price_economy,
+        FlightEntity.price_business,
+    )
+
+    @staticmethod
+    def dto_load_options(*path, strategy=joinedload) -> List:
+        """Loader options that fetch everything `FlightEntity.to_dto` touches up front.
+
+        Without them every flight lazily loads its airline, airports, their location, country and
+        continent, its layover and its seat configuration one SELECT at a time. `path` is the chain
+        of relationships leading to the flights, e.g. `TripEntity.departing_flight`, and its first
+        hop is loaded with `strategy`; everything below a flight is many-to-one or one-to-one and
+        is joined into the same statement.
+        """
+        def load(*attributes):
+            chain = path + attributes
+            option = strategy(chain[0]) if path else joinedload(chain[0])
+            for attribute in chain[1:]:
+                option = option.joinedload(attribute)
+            return option
+
+        def airport(*relationship):
+            return [
+                load(*relationship, AirportEntity.location),
+                load(*relationship, AirportEntity.country, CountryEntity.continent),
+            ]
+
+        return [
+            load(FlightEntity.airline),
+            *airport(FlightEntity.departure_airport),
+            *airport(FlightEntity.arrival_airport),
+            *airport(FlightEntity.layover, LayoverEntity.airport),
+            # Only the GUID is serialized, so the seat map JSON stays unloaded
+            load(FlightEntity.seat_configuration).load_only(FlightSeatsEntity.guid),
+        ]
+
     @staticmethod
     def add(flight_dto: FlightDTO) -> None:
         """Add a flight to the database, creating any linking the layover, airport and airline as needed."""
-        flight_entity = FlightEntity.from_dto(flight_dto)
-        db.session.add(flight_entity)
-        db.session.commit()
+        with unit_of_work():
+            flight_entity = FlightEntity.from_dto(flight_dto)
+            db.session.add(flight_entity)
+            db.session.flush()
+            record = FlightRepository.to_record(flight_entity)
+
+            def index() -> None:
+                FlightRepository.get_route_index().add(record)
+                FlightRepository.invalidate_cached_route(*record.route)
+            after_commit(index)
 
     @staticmethod
+    def add_many(flight_dtos: Sequence[FlightDTO], chunk_size: int) -> Dict[str, int]:
+        """Add a batch of new flights with bulk inserts, committing every `chunk_size` flights.
+
+        The whole batch is validated first, so a ValueError means nothing was written. Should the
+        database still reject a chunk, it is rolled back and ImportInterruptedError reports how many
+        flights the chunks before it committed. Returns the rows inserted per table.
+        """
+        flight_import = FlightImport(flight_dtos).prepare()
+        inserted: Dict[str, int] = {}
+        index = FlightRepository.get_route_index()
+        try:
+            for records, chunk_inserted in flight_import.insert(chunk_size):
+                # Bulk inserts bypass the unit of work, so caches and ETags are updated here
+                get_table_versions().bump(chunk_inserted)
+                for record in records:
+                    index.add(record)
+                for route in {record.route for record in records}:
+                    FlightRepository.invalidate_cached_route(*route)
+                for table, rows in chunk_inserted.items():
+                    inserted[table] = inserted.get(table, 0) + rows
+        except IntegrityError as e:
+            db.session.rollback()
+            committed = inserted.get(FlightEntity.__tablename__, 0)
+            raise ImportInterruptedError(f"The database rejected the import after {committed} flight(s): {e.orig}", committed) from e
+        return inserted
+
+    @staticmethod
+    @read_only
     def get_all() -> List[FlightEntity]:
         """Retrieve all flights from the database."""
-        return FlightEntity.query.all()
+        return FlightEntity.query.options(*FlightRepository.dto_load_options()).all()
 
     @staticmethod
+    @read_only
     def get_by_guid(guid: str) -> Optional[FlightEntity]:
         """Retrieve a flight by its GUID."""
-        return FlightEntity.query.filter_by(guid=guid).first()
+        return FlightEntity.query.options(*FlightRepository.dto_load_options()).filter_by(guid=guid).first()
+
+    @staticmethod
+    @read_only
+    def get_by_guids(guids: List[str]) -> List[FlightEntity]:
+        """Retrieve flights by primary key, keeping the order of the given GUIDs."""
+        if not guids:
+            return []
+        query = FlightEntity.query.options(*FlightRepository.dto_load_options()).filter(FlightEntity.guid.in_(guids))
+        flights = {flight.guid: flight for flight in query.all()}
+        return [flights[guid] for guid in guids if guid in flights]
+
+    @staticmethod
+    @read_only
+    def find_serialized(**filters) -> List[Dict]:
+        """Serialize flights matching column filters straight from one projected query, without entities or DTOs."""
+        statement = serializers.FLIGHT_SELECT.where(*(getattr(FlightEntity, name) == value for name, value in filters.items()))
+        return FlightRepository.serialize_rows(db.session.execute(statement).all())
 
     @staticmethod
+    def find_serialized_by_guids(guids: List[str]) -> List[Dict]:
+        """Serialize flights by primary key, keeping the order of the given GUIDs."""
+        if not guids:
+            return []
+        statement = serializers.FLIGHT_SELECT.where(FlightEntity.guid.in_(guids))
+        flights = {flight["guid"]: flight for flight in FlightRepository.serialize_rows(db.session.execute(statement).all())}
+        return [flights[guid] for guid in guids if guid in flights]
+
+    @staticmethod
+    def serialize_rows(rows: List) -> List[Dict]:
+        """Serialize `FLIGHT_SELECT` rows, embedding the cached airline and airport fragments."""
+        airline_ids, airport_ids = serializers.flight_fragment_ids(rows)
+        airports = AirportRepository.get_fragments(airport_ids)
+        airlines = AirlineRepository.get_fragments(airline_ids)
+        return serializers.serialize_flights(rows, airports, airlines)
+
+    @staticmethod
+    @read_only
     def find_by_destination_id(destination_id: str) -> List[FlightEntity]:
         """Find flights by destination airport ID."""
-        return FlightEntity.query.filter_by(arrival_airport_id=destination_id).all()
+        return FlightEntity.query.options(*FlightRepository.dto_load_options()).filter_by(arrival_airport_id=destination_id).all()
 
     @staticmethod
+    @read_only
     def find_by_departure_id(departure_id: str) -> List[FlightEntity]:
         """Find flights by departure airport ID."""
-        return FlightEntity.query.filter_by(departure_airport_id=departure_id).all()
+        return FlightEntity.query.options(*FlightRepository.dto_load_options()).filter_by(departure_airport_id=departure_id).all()
 
     @staticmethod
+    @read_only
     def find_by_airline_id(airline_id: str) -> List[FlightEntity]:
         """Find flights by airline ID."""
-        return FlightEntity.query.filter_by(airline_id=airline_id).all()
+        return FlightEntity.query.options(*FlightRepository.dto_load_options()).filter_by(airline_id=airline_id).all()
     
     @staticmethod
-    def find_by_departure_and_arrival(departure_airport_id: str, arrival_airport_id: str) -> List[FlightEntity]:
-        """Find flights by departure and arrival airport IDs."""
+    @read_only
+    def find_by_departure_and_arrival(departure_airport_id: str, arrival_airport_id: str,
+                                      departure_windows: Sequence[Tuple[int, int]] = (),
+                                      arrival_windows: Sequence[Tuple[int, int]] = ()) -> List[FlightEntity]:
+        """Find flights by departure and arrival airport IDs, optionally within inclusive minute-of-day windows."""
         query = FlightEntity.query
 
         if departure_airport_id:
             query = query.filter_by(departure_airport_id=departure_airport_id)
         if arrival_airport_id:
             query = query.filter_by(arrival_airport_id=arrival_airport_id)
+        for window in departure_windows:
+            query = query.filter(FlightRepository._minute_window_clause(FlightEntity.departure_minute, window))
+        for window in arrival_windows:
+            query = query.filter(FlightRepository._minute_window_clause(FlightEntity.arrival_minute, window))
         
         return query.all()
 
     @staticmethod
+    def _minute_window_clause(column, window: Tuple[int, int]):
+        """Range condition on a minute-of-day column; a window that wraps past midnight becomes two ranges."""
+        start, end = window
+        if start <= end:
+            return column.between(start, end)
+        return or_(column >= start, column <= end)
+
+    @staticmethod
+    def find_by_route(departure_airport_id: str, arrival_airport_id: str) -> List[FlightEntity]:
+        """Find flights on a route using the in-memory route index and a primary key lookup."""
+        records = FlightRepository.find_records_by_route(departure_airport_id, arrival_airport_id)
+        return FlightRepository.get_indexed_by_guids([record.guid for record in records])
+
+    @staticmethod
+    def get_indexed_by_guids(guids: List[str]) -> List[FlightEntity]:
+        """Load flights found through the route index, dropping index records whose rows are gone."""
+        flights = FlightRepository.get_by_guids(guids)
+        FlightRepository._drop_stale_records(guids, [flight.guid for flight in flights])
+        return flights
+
+    @staticmethod
+    def get_indexed_serialized_by_guids(guids: List[str]) -> List[Dict]:
+        """Serialize flights found through the route index, dropping index records whose rows are gone."""
+        flights = FlightRepository.find_serialized_by_guids(guids)
+        FlightRepository._drop_stale_records(guids, [flight["guid"] for flight in flights])
+        return flights
+
+    @staticmethod
+    def _drop_stale_records(guids: List[str], found: List[str]) -> None:
+        # Rows removed without going through this repository leave stale records behind
+        if len(found) != len(guids):
+            index = FlightRepository.get_route_index()
+            for guid in set(guids) - set(found):
+                index.remove(guid)
+
+    @staticmethod
+    def find_records_by_route(departure_airport_id: str, arrival_airport_id: str) -> List[FlightRecord]:
+        """Find the indexed flight records for a route without touching the database."""
+        return FlightRepository.get_route_index().find(departure_airport_id, arrival_airport_id)
+
+    @staticmethod
+    def get_route_index() -> RouteIndex:
+        """Return the app's route index, building it from the flights table on first use."""
+        index: RouteIndex = current_app.extensions["route_index"]
+        if not index.is_built:
+            rows = db.session.query(*FlightRepository.RECORD_COLUMNS).all()
+            index.build(FlightRecord._make(row) for row in rows)
+        return index
+
+    @staticmethod
+    def to_record(flight: FlightEntity) -> FlightRecord:
+        """Build the compact route index record for a flight entity."""
+        return FlightRecord._make(getattr(flight, column.key) for column in FlightRepository.RECORD_COLUMNS)
+
+    @staticmethod
+    def get_search_cache() -> LRUCache:
+        """Return the app's cache of serialized search responses."""
+        return current_app.extensions["search_cache"]
+
+    @staticmethod
+    def get_seat_holds() -> SeatHolds:
+        """Return the app's live checkout seat holds."""
+        return current_app.extensions["seat_holds"]
+
+    @staticmethod
+    def invalidate_cached_route(departure_airport_id: str, arrival_airport_id: str) -> None:
+        """Drop cached search responses that can include flights on this route."""
+        FlightRepository.get_search_cache().invalidate_tags(route_tags_for_flight(departure_airport_id, arrival_airport_id))
+
+    @staticmethod
+    def invalidate_cached_flight(flight_id: str) -> None:
+        """Drop cached search responses that can include this flight."""
+        record = FlightRepository.get_route_index().get(flight_id)
+        if record:
+            FlightRepository.invalidate_cached_route(record.departure_airport_id, record.arrival_airport_id)
+        else:
+            FlightRepository.get_search_cache().clear()
+
+    @staticmethod
+    @primary()
     def delete_flight(guid: str) -> bool:
         """Delete a flight by its GUID."""
         flight = FlightRepository.get_by_guid(guid)
-        print(f"Flight retrieved for deletion: {flight}")
         if flight:
-            db.session.delete(flight)
-            db.session.commit()
+            route = (flight.departure_airport_id, flight.arrival_airport_id)
+            with unit_of_work():
+                db.session.delete(flight)
+
+                def unindex() -> None:
+                    FlightRepository.get_route_index().remove(guid)
+                    FlightRepository.invalidate_cached_route(*route)
+                after_commit(unindex)
             return True
         return False
     
@@ -76,27 +305,177 @@ class FlightRepository:
         """
         Create a random seat configuration for a given flight ID.
         """
-        seat_config = FlightSeatsEntity(guid=str(uuid.uuid4()), flight_id=flight_id)
-        seat_config.generate_seat_configuration()
-        db.session.add(seat_config)
-        
+        with unit_of_work():
+            seat_config = FlightSeatsEntity(guid=str(uuid.uuid4()), flight_id=flight_id)
+            seat_config.generate_seat_configuration()
+            db.session.add(seat_config)
+            after_commit(lambda: FlightRepository.invalidate_cached_flight(flight_id))
+
         return seat_config
     
+    @staticmethod
+    def check_own_transaction() -> None:
+        """Reject a seat map update that would retry inside a caller's unit of work.
+
+        A lost version race is retried by rolling back and starting over, which would also throw
+        away everything the caller wrote before it.
+        """
+        if in_unit_of_work():
+            raise RuntimeError("Seat map updates retry their own transaction and cannot join another unit of work.")
+
+    @staticmethod
+    def seat_maps_for_update(*criteria) -> Query:
+        """Seat maps matching `criteria`, read fresh and row-locked until the transaction ends.
+
+        On PostgreSQL this is `SELECT ... FOR UPDATE`, so concurrent bookings of a flight queue on its
+        row instead of racing and retrying; rows are locked in flight order, so bookings spanning
+        several flights cannot deadlock. Skipping locked rows does not fit here, because a flight's
+        seats are all in one row. SQLite has no row locks and renders no FOR UPDATE; there the write
+        lock and the version check on flush keep bookings apart.
+        """
+        return (FlightSeatsEntity.query.populate_existing().filter(*criteria)
+                .order_by(FlightSeatsEntity.flight_id).with_for_update(of=FlightSeatsEntity))
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Whether a failed seat map update lost a race with another booking and can be retried.
+
+        That is a failed version check, a PostgreSQL lock timeout, deadlock or serialization failure,
+        or SQLite giving up on its busy timeout.
+        """
+        if isinstance(error, StaleDataError):
+            return True
+        orig = getattr(error, "orig", None)
+        return getattr(orig, "pgcode", None) in ("55P03", "40P01", "40001") or "database is locked" in str(orig)
+
+    @staticmethod
+    def reserve_seats(seat_ids_by_flight: Dict[str, List[int]], hold_tokens: Iterable[str] = ()) -> Dict[str, FlightSeatsEntity]:
+        """Book seats on several flights in the current transaction, without committing.
+
+        The seat maps are read in one query and every requested seat is validated before any is
+        booked. Flights that exist but have no seat map get one generated. Raises ValueError for a
+        missing flight or seat, and SeatUnavailableError naming every requested seat that is already
+        booked, requested twice, or held by a checkout other than `hold_tokens`. The seat maps are locked
+        with `seat_maps_for_update`, and their updates are version-checked when flushed, so a caller
+        committing them gets StaleDataError if another booking got in first.
+        """
+        seat_configs = {
+            seat_config.flight_id: seat_config
+            for seat_config in FlightRepository.seat_maps_for_update(FlightSeatsEntity.flight_id.in_(list(seat_ids_by_flight)))
+        }
+        for flight_id in seat_ids_by_flight:
+            if flight_id not in seat_configs:
+                if not FlightEntity.query.filter_by(guid=flight_id).first():
+                    raise ValueError(f"Flight {flight_id} not found.")
+                seat_configs[flight_id] = FlightRepository.create_random_seat_configuration(flight_id)
+
+        requested_by_flight = {}
+        conflicts = []
+        for flight_id, seat_ids in seat_ids_by_flight.items():
+            seat_config = seat_configs[flight_id]
+            booked, requested = seat_config.booked_mask, 0
+            held = FlightRepository.get_seat_holds().held_seats(flight_id, exclude_tokens=hold_tokens)
+            for seat_id in seat_ids:
+                if not seat_config.layout.has_seat(seat_id):
+                    raise ValueError(f"Seat {seat_id} does not exist on flight {flight_id}.")
+                seat_mask = seat_config.layout.seat_mask(seat_id)
+                if (booked | requested) & seat_mask or seat_id in held:
+                    conflicts.append(seat_id)
+                requested |= seat_mask
+            requested_by_flight[flight_id] = requested
+        if conflicts:
+            raise SeatUnavailableError(f"Seats {', '.join(map(str, conflicts))} are already booked.")
+
+        for flight_id, requested in requested_by_flight.items():
+            seat_configs[flight_id].booked_mask |= requested
+        db.session.flush()
+        return seat_configs
+
+    @staticmethod
+    def release_seats(seat_ids_by_flight: Dict[str, List[int]]) -> None:
+        """Free booked seats on several flights in the current transaction, without committing.
+
+        Like `reserve_seats`, the seat maps are locked and their updates version-checked when flushed.
+        """
+        seat_configs = FlightRepository.seat_maps_for_update(FlightSeatsEntity.flight_id.in_(list(seat_ids_by_flight))).all()
+        for seat_config in seat_configs:
+            released = 0
+            for seat_id in seat_ids_by_flight[seat_config.flight_id]:
+                if seat_config.layout.has_seat(seat_id):
+                    released |= seat_config.layout.seat_mask(seat_id)
+            seat_config.booked_mask &= ~released
+        db.session.flush()
+
+    @staticmethod
+    def get_seat_states(flight_ids: Sequence[str]) -> Iterator[Tuple[str, SeatLayout, int, int, int]]:
+        """`(flight_id, layout, booked, held, seats_available)` for the flights that have a seat map.
+
+        Reads only the stored counter and bitset of each flight in one query. `held` has the seats
+        held by checkouts that are not already booked.
+        """
+        rows = db.session.execute(
+            select(FlightSeatsEntity.flight_id, FlightSeatsEntity.layout_id,
+                   FlightSeatsEntity.booked_seats, FlightSeatsEntity.seats_available)
+            .where(FlightSeatsEntity.flight_id.in_(list(flight_ids)))
+        )
+        holds = FlightRepository.get_seat_holds()
+        for flight_id, layout_id, booked_seats, seats_available in rows:
+            layout = get_layout(layout_id)
+            booked = SeatLayout.unpack(booked_seats)
+            held = 0
+            for seat_id in holds.held_seats(flight_id):
+                held |= layout.seat_mask(seat_id)
+            yield flight_id, layout, booked, held & ~booked, seats_available
+
+    @staticmethod
+    @read_only
+    def get_availability(flight_ids: Sequence[str], group_size: Optional[int] = None) -> Dict[str, Dict]:
+        """Seat availability summaries by flight GUID, for the flights that have a seat map.
+
+        Seats held by checkouts count as taken, the same as on the seat map. With `group_size`, each
+        cabin also reports whether it still has that many adjacent free seats in one row, counting seats
+        across an aisle as adjacent like the seat suggestions do.
+        """
+        summaries = {}
+        for flight_id, layout, booked, held, seats_available in FlightRepository.get_seat_states(flight_ids):
+            cabins = layout.availability(booked | held)
+            if group_size is not None:
+                for seat_type, cabin in cabins.items():
+                    cabin["seats_together"] = bool(layout.free_blocks(booked | held, group_size, seat_type, across_aisle=True))
+            summaries[flight_id] = {
+                "flight_id": flight_id,
+                "seats_available": seats_available - count_seats(held),
+                "cabins": cabins,
+            }
+        return summaries
+
     @staticmethod
     def mark_seat_id_as_booked_by_seat_configuration_id(seat_configuration_id: str, seat_id: int) -> Optional[FlightSeatsEntity]:
-        """Mark a seat as booked by its seat configuration ID and seat ID."""
-        seat_config = FlightSeatsEntity.query.filter_by(guid=seat_configuration_id).first()
+        """Mark a seat as booked by its seat configuration ID and seat ID.
 
-        if not seat_config:
-            return None  # Seat configuration not found
+        The update is a compare-and-swap on `version_id`: if another booking commits between our read
+        and our write, the write matches no row, and the booking is retried on a fresh read up to
+        `SEAT_BOOKING_MAX_ATTEMPTS` times. Raises SeatUnavailableError if the seat is already booked
+        or every attempt lost the race.
 
-        # Find the seat within the seat configuration
-        seat = next((s for s in seat_config.seat_configuration if s.get("seat_id") == seat_id), None)
+        Each attempt is its own unit of work, so this cannot run inside another one.
+        """
+        FlightRepository.check_own_transaction()
+        for _ in range(current_app.config["SEAT_BOOKING_MAX_ATTEMPTS"]):
+            try:
+                with unit_of_work():
+                    seat_config = FlightRepository.seat_maps_for_update(FlightSeatsEntity.guid == seat_configuration_id).first()
 
-        if seat:
-            seat["available"] = False  # Set seat as booked
-            db.session.commit()
+                    if not seat_config or not seat_config.layout.has_seat(seat_id):
+                        return None  # Seat configuration or seat not found
+                    if not seat_config.is_available(seat_id):
+                        raise SeatUnavailableError(f"Seat {seat_id} is already booked.")
+                    seat_config.book_seat(seat_id)
+            except (StaleDataError, DBAPIError) as e:
+                if not FlightRepository.is_retryable(e):
+                    raise
+                continue
+            FlightRepository.invalidate_cached_flight(seat_config.flight_id)
             return seat_config
-        else:
-            return None
+        raise SeatUnavailableError(f"Seat {seat_id} could not be booked, the seat map is busy.")
 
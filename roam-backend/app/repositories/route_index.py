@@ -0,0 +1,133 @@
+import threading
+from typing import Dict, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+RouteKey = Tuple[str, str]
+
+class FlightRecord(NamedTuple):
+    """Compact, read-only view of a flight row used to answer searches from memory."""
+    guid: str
+    departure_airport_id: str
+    arrival_airport_id: str
+    airline_id: str
+    departure_minute: Optional[int]
+    arrival_minute: Optional[int]
+    flight_time_minutes: int
+    num_stops: Optional[int]
+    price_economy: float
+    price_business: Optional[float]
+
+    @property
+    def route(self) -> RouteKey:
+        return (self.departure_airport_id, self.arrival_airport_id)
+
+
+class RouteIndex:
+    """Process-local map of (departure_airport_id, arrival_airport_id) to the flights on that route.
+
+    The index is owned by the Flask app (see `create_app`) and is only as fresh as the
+    writes that go through `FlightRepository`, so every flight insert or delete must use it.
+    """
+    def __init__(self) -> None:
+        self._routes: Dict[RouteKey, Dict[str, FlightRecord]] = {}
+        self._records: Dict[str, FlightRecord] = {}
+        self._by_departure: Dict[str, Dict[str, FlightRecord]] = {}
+        self._origins_by_arrival: Dict[str, Set[str]] = {}
+        self._boards: Dict[str, Tuple[List[int], List[FlightRecord]]] = {}
+        self._lock = threading.RLock()
+        self._built = False
+
+    @property
+    def is_built(self) -> bool:
+        return self._built
+
+    def build(self, records: Iterable[FlightRecord]) -> None:
+        """Replace the index contents with the given records."""
+        routes: Dict[RouteKey, Dict[str, FlightRecord]] = {}
+        by_guid: Dict[str, FlightRecord] = {}
+        by_departure: Dict[str, Dict[str, FlightRecord]] = {}
+        origins_by_arrival: Dict[str, Set[str]] = {}
+        for record in records:
+            routes.setdefault(record.route, {})[record.guid] = record
+            by_guid[record.guid] = record
+            by_departure.setdefault(record.departure_airport_id, {})[record.guid] = record
+            origins_by_arrival.setdefault(record.arrival_airport_id, set()).add(record.departure_airport_id)
+
+        with self._lock:
+            self._routes = routes
+            self._records = by_guid
+            self._by_departure = by_departure
+            self._origins_by_arrival = origins_by_arrival
+            self._boards = {}
+            self._built = True
+
+    def add(self, record: FlightRecord) -> None:
+        """Insert or replace a single flight record."""
+        with self._lock:
+            self._discard(record.guid)
+            self._routes.setdefault(record.route, {})[record.guid] = record
+            self._records[record.guid] = record
+            self._by_departure.setdefault(record.departure_airport_id, {})[record.guid] = record
+            self._origins_by_arrival.setdefault(record.arrival_airport_id, set()).add(record.departure_airport_id)
+            self._boards.pop(record.departure_airport_id, None)
+
+    def remove(self, guid: str) -> Optional[FlightRecord]:
+        """Remove a flight record by GUID, returning it if it was indexed."""
+        with self._lock:
+            return self._discard(guid)
+
+    def get(self, guid: str) -> Optional[FlightRecord]:
+        return self._records.get(guid)
+
+    def find(self, departure_airport_id: str, arrival_airport_id: str) -> List[FlightRecord]:
+        """Return the flights indexed for a route, in insertion order."""
+        with self._lock:
+            route = self._routes.get((departure_airport_id, arrival_airport_id))
+            return list(route.values()) if route else []
+
+    def origins_into(self, arrival_airport_id: str) -> Set[str]:
+        """Return the airports with at least one direct flight into the given airport."""
+        with self._lock:
+            return set(self._origins_by_arrival.get(arrival_airport_id, ()))
+
+    def departures(self, departure_airport_id: str) -> Tuple[List[int], List[FlightRecord]]:
+        """Return the timed departures from an airport as parallel lists sorted by departure minute.
+
+        The board is cached until a flight from that airport is added or removed, so callers can
+        bisect the minute list repeatedly without re-sorting.
+        """
+        with self._lock:
+            board = self._boards.get(departure_airport_id)
+            if board is None:
+                records = sorted(
+                    (record for record in self._by_departure.get(departure_airport_id, {}).values()
+                     if record.departure_minute is not None),
+                    key=lambda record: record.departure_minute
+                )
+                board = ([record.departure_minute for record in records], records)
+                self._boards[departure_airport_id] = board
+            return board
+
+    def clear(self) -> None:
+        with self._lock:
+            self._routes = {}
+            self._records = {}
+            self._by_departure = {}
+            self._origins_by_arrival = {}
+            self._boards = {}
+            self._built = False
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+    def _discard(self, guid: str) -> Optional[FlightRecord]:
+        record = self._records.pop(guid, None)
+        if record:
+            route = self._routes.get(record.route)
+            if route is not None:
+                route.pop(guid, None)
+                if not route:
+                    del self._routes[record.route]
+                    self._origins_by_arrival.get(record.arrival_airport_id, set()).discard(record.departure_airport_id)
+            self._by_departure.get(record.departure_airport_id, {}).pop(guid, None)
+            self._boards.pop(record.departure_airport_id, None)
+        return record
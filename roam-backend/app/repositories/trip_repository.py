@@ -1,92 +1,198 @@
-from typing import List, Optional
-from app import db
+from typing import Callable, Dict, Iterable, List, Optional
+from flask import current_app
+from sqlalchemy import select, union
+from sqlalchemy.orm import selectinload
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.orm.exc import StaleDataError
+from app import db, serializers
 from app.models.entities.trip_entity import TripEntity
 from app.models.entities.flight_entity import FlightEntity
 from app.models.entities.passenger_entity import PassengerEntity
 from app.models.dto.trip_dto import TripDTO
+from app.repositories.flight_repository import FlightRepository
+from app.seat_layouts import SeatUnavailableError
+from app.unit_of_work import unit_of_work
+from app.read_routing import primary, read_only
 
 class TripRepository:
+    @staticmethod
+    def dto_load_options() -> List:
+        """Loader options that fetch both flight graphs and the passengers `TripEntity.to_dto` touches.
+
+        Flights and passengers each come from one extra SELECT ... IN query for the whole batch,
+        so the number of queries does not grow with the number of trips.
+        """
+        return [
+            *FlightRepository.dto_load_options(TripEntity.departing_flight, strategy=selectinload),
+            *FlightRepository.dto_load_options(TripEntity.returning_flight, strategy=selectinload),
+            selectinload(TripEntity.passengers),
+        ]
+
     @staticmethod
     def add(trip_dto: TripDTO) -> None:
         """Add a new trip to the database, along with related flights and passengers if needed."""
-        trip_entity = TripEntity.from_dto(trip_dto)
-        db.session.add(trip_entity)
-        db.session.commit()
+        with unit_of_work():
+            TripEntity.from_dto(trip_dto)
+
+    @staticmethod
+    def add_with_seats(trip_dto: TripDTO, seat_ids_by_flight: Dict[str, List[int]], hold_tokens: Iterable[str] = ()) -> None:
+        """Add a trip and book its passengers' seats in a single transaction.
+
+        Nothing is stored unless every seat can be booked. Seats held under `hold_tokens` count as
+        this booking's own, and those holds are released once it commits.
+        """
+        def change() -> None:
+            FlightRepository.reserve_seats(seat_ids_by_flight, hold_tokens)
+            TripEntity.from_dto(trip_dto)
+
+        TripRepository.commit_seat_change(change, seat_ids_by_flight)
+        for token in hold_tokens:
+            FlightRepository.get_seat_holds().release(token, booked=True)
+
+    @staticmethod
+    def commit_seat_change(change: Callable[[], None], seat_ids_by_flight: Dict[str, List[int]]) -> None:
+        """Run `change` in a unit of work, retrying if one of the seat maps it updates was changed concurrently.
+
+        A lost version race or lock timeout is retried on fresh reads up to `SEAT_BOOKING_MAX_ATTEMPTS` times before
+        giving up with SeatUnavailableError; any other error rolls back everything and is re-raised.
+        Each attempt is its own unit of work, so this cannot run inside another one.
+        """
+        FlightRepository.check_own_transaction()
+        for _ in range(current_app.config["SEAT_BOOKING_MAX_ATTEMPTS"]):
+            try:
+                with unit_of_work():
+                    change()
+            except (StaleDataError, DBAPIError) as e:
+                if not FlightRepository.is_retryable(e):
+                    raise
+                continue
+            for flight_id in seat_ids_by_flight:
+                FlightRepository.invalidate_cached_flight(flight_id)
+            return
+        raise SeatUnavailableError("Seats could not be updated, the seat maps are busy.")
 
     @staticmethod
+    def booked_seats(trip: TripEntity, passengers: Iterable[PassengerEntity]) -> Dict[str, List[int]]:
+        """The seat ids `passengers` of a trip occupy, by flight GUID."""
+        seat_ids_by_flight: Dict[str, List[int]] = {}
+        for passenger in passengers:
+            for flight_id, seat_id in ((trip.departing_flight_id, passenger.departing_seat_id),
+                                       (trip.returning_flight_id, passenger.returning_seat_id)):
+                if flight_id and seat_id is not None:
+                    seat_ids_by_flight.setdefault(flight_id, []).append(seat_id)
+        return seat_ids_by_flight
+
+    @staticmethod
+    @read_only
+    def find_serialized(**filters) -> List[Dict]:
+        """Serialize trips matching column filters straight from projected queries, without entities or DTOs.
+
+        Trips, their flights and their passengers are one query each; the flights and passengers are
+        selected through subqueries on the same filters, so no GUID lists are sent back to the database.
+        """
+        criteria = [getattr(TripEntity, name) == value for name, value in filters.items()]
+        rows = db.session.execute(serializers.TRIP_SELECT.where(*criteria)).all()
+        if not rows:
+            return []
+
+        flight_ids = union(
+            select(TripEntity.departing_flight_id).where(*criteria),
+            select(TripEntity.returning_flight_id).where(*criteria)
+        )
+        flight_rows = db.session.execute(serializers.FLIGHT_SELECT.where(FlightEntity.guid.in_(flight_ids))).all()
+        flights = {flight["guid"]: flight for flight in FlightRepository.serialize_rows(flight_rows)}
+
+        trip_ids = select(TripEntity.guid).where(*criteria)
+        passengers = db.session.execute(serializers.PASSENGER_SELECT.where(PassengerEntity.trip_id.in_(trip_ids)))
+        return serializers.serialize_trips(rows, flights, passengers)
+
+    @staticmethod
+    @read_only
     def get_all() -> List[TripEntity]:
         """Retrieve all trips from the database."""
-        return TripEntity.query.all()
+        return TripEntity.query.options(*TripRepository.dto_load_options()).all()
 
     @staticmethod
+    @read_only
     def get_by_guid(guid: str) -> Optional[TripEntity]:
         """Retrieve a trip by its GUID."""
-        return TripEntity.query.filter_by(guid=guid).first()
+        return TripEntity.query.options(*TripRepository.dto_load_options()).filter_by(guid=guid).first()
 
 
     @staticmethod
+    @read_only
     def get_round_trips(is_round_trip: bool) -> List[TripEntity]:
         """Retrieve trips based on whether they are round trips."""
-        return TripEntity.query.filter_by(is_round_trip=is_round_trip).all()
+        return TripEntity.query.options(*TripRepository.dto_load_options()).filter_by(is_round_trip=is_round_trip).all()
 
     @staticmethod
+    @read_only
     def get_by_departing_flight(flight_guid: str) -> List[TripEntity]:
         """Retrieve trips based on the departing flight GUID."""
-        return TripEntity.query.filter_by(departing_flight_id=flight_guid).all()
+        return TripEntity.query.options(*TripRepository.dto_load_options()).filter_by(departing_flight_id=flight_guid).all()
 
     @staticmethod
+    @read_only
     def get_by_returning_flight(flight_guid: str) -> List[TripEntity]:
         """Retrieve trips based on the returning flight GUID."""
-        return TripEntity.query.filter_by(returning_flight_id=flight_guid).all()
+        return TripEntity.query.options(*TripRepository.dto_load_options()).filter_by(returning_flight_id=flight_guid).all()
 
     @staticmethod
+    @primary()
     def delete(guid: str) -> bool:
-        """Delete a trip by its GUID."""
+        """Delete a trip by its GUID, freeing its passengers' seats in the same transaction."""
         trip = TripRepository.get_by_guid(guid)
-        if trip:
+        if not trip:
+            return False
+
+        def change() -> None:
+            trip = TripEntity.query.filter_by(guid=guid).one()
+            FlightRepository.release_seats(TripRepository.booked_seats(trip, trip.passengers))
             db.session.delete(trip)
-            db.session.commit()
-            return True
-        return False
+
+        TripRepository.commit_seat_change(change, TripRepository.booked_seats(trip, trip.passengers))
+        return True
     
     @staticmethod
+    @primary()
     def delete_ticket(trip_guid: str, passenger_guid: str) -> bool:
-        """Delete a specific passenger (ticket) by trip GUID and passenger GUID.
+        """Delete a specific passenger (ticket) by trip GUID and passenger GUID, freeing their seats.
         If the last passenger is deleted, delete the entire trip.
         """
         trip = TripRepository.get_by_guid(trip_guid)
-        
-        if trip:
-            # Find passenger to delete
-            passenger_to_delete = next((p for p in trip.passengers if p.guid == passenger_guid), None)
-            
-            if passenger_to_delete:
-                # Delete passenger
-                db.session.delete(passenger_to_delete)
-                db.session.commit()
+        passenger = next((p for p in trip.passengers if p.guid == passenger_guid), None) if trip else None
+        if not passenger:
+            return False
+
+        def change() -> None:
+            trip = TripEntity.query.filter_by(guid=trip_guid).one()
+            passenger_to_delete = next(p for p in trip.passengers if p.guid == passenger_guid)
+            FlightRepository.release_seats(TripRepository.booked_seats(trip, [passenger_to_delete]))
+            trip.passengers.remove(passenger_to_delete)  # delete-orphan removes the row
+
+            # If no more passengers delete the trip
+            if not trip.passengers:
+                db.session.delete(trip)
 
-                # If no more passengers delete the trip
-                if len(trip.passengers) == 0:
-                    db.session.delete(trip)
-                    db.session.commit()
-                
-                return True
-        
-        return False
+        TripRepository.commit_seat_change(change, TripRepository.booked_seats(trip, [passenger]))
+        return True
 
 
 
     @staticmethod
+    @read_only
     def get_all_passengers() -> List[PassengerEntity]:
         """Retrieve all passengers from the database."""
         return PassengerEntity.query.all()
 
     @staticmethod
+    @read_only
     def get_passengers_by_trip_id(trip_id: str) -> List[PassengerEntity]:
         """Retrieve all passengers associated with a specific trip ID."""
         return PassengerEntity.query.filter_by(trip_id=trip_id).all()
 
     @staticmethod
+    @read_only
     def get_passengers_by_flight_id(flight_id: str) -> List[PassengerEntity]:
         """Retrieve all passengers associated with a specific flight ID."""
         return PassengerEntity.query.filter(
@@ -3,45 +3,50 @@ from app import db
 import uuid
 from app.models.entities.user_entity import UserEntity
 from app.models.dto.user_dto import UserDTO
+from app.unit_of_work import unit_of_work
+from app.read_routing import primary, read_only
 
 
 class UserRepository:
     @staticmethod
     def add(user_dto: UserDTO) -> None:
         """Add a new user to the database."""
-        user_entity = UserEntity.from_dto(user_dto, password=user_dto.password)
-        db.session.add(user_entity)
-        db.session.commit()
+        with unit_of_work():
+            user_entity = UserEntity.from_dto(user_dto, password=user_dto.password)
+            db.session.add(user_entity)
 
     @staticmethod
     def update_user(guid: uuid.UUID, email: Optional[str] = None, phone: Optional[str] = None,
                     first_name: Optional[str] = None, last_name: Optional[str] = None, password: Optional[str] = None) -> None:
-        user = UserRepository.find_by_id(guid)
-        if not user:
-            raise ValueError("User not found.")
-        if email: 
-            user.email = email
-        if phone: 
-            user.phone = phone
-        if first_name:
-            user.first_name = first_name
-        if last_name:
-            user.last_name = last_name
-        if password:
-            user.set_password(password)
-        db.session.commit()
+        with unit_of_work():
+            user = UserRepository.find_by_id(guid)
+            if not user:
+                raise ValueError("User not found.")
+            if email: 
+                user.email = email
+            if phone: 
+                user.phone = phone
+            if first_name:
+                user.first_name = first_name
+            if last_name:
+                user.last_name = last_name
+            if password:
+                user.set_password(password)
 
     @staticmethod
+    @read_only
     def get_all() -> List[UserEntity]:
         """Retrieve all users from the database."""
         return UserEntity.query.all()
 
     @staticmethod
+    @read_only
     def find_by_email(email: str) -> Optional[UserEntity]:
         """Find a user by their email address."""
         return UserEntity.query.filter_by(email=email).first()
     
     @staticmethod
+    @read_only
     def find_by_id(guid: uuid.UUID) -> Optional[UserEntity]:
         """Find a user by their unique ID."""
         try:
@@ -53,16 +58,18 @@ class UserRepository:
             return None
     
     @staticmethod
+    @primary()
     def delete_user(guid: uuid) -> bool:
         """Delete a user by their ID."""
         user = UserRepository.find_by_id(guid)
         if user:
-            db.session.delete(user)
-            db.session.commit()
+            with unit_of_work():
+                db.session.delete(user)
             return True
         return False
     
     @staticmethod
+    @read_only
     def email_exists(email: str) -> bool:
         """Check if an email already exists in the database."""
         return db.session.query(UserEntity.query.filter_by(email=email).exists()).scalar()
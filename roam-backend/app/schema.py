@@ -0,0 +1,113 @@
+import json
+import flask_migrate
+from sqlalchemy import bindparam, inspect, text
+from sqlalchemy.engine import Connection
+from sqlalchemy.types import LargeBinary
+from app import db
+from app.models.entities.flight_entity import FlightEntity
+from app.seat_layouts import STANDARD_LAYOUT, count_seats
+from app.utils import parse_time_of_day
+
+# The revision in `migrations/` whose schema `upgrade_schema` produces
+BASELINE_REVISION = "0001"
+
+def upgrade_database() -> None:
+    """Migrate the database to the latest revision in `migrations/`, creating it if it is empty.
+
+    Databases created with `db.create_all()` before there were migrations have no `alembic_version`
+    table. They are brought up to the baseline revision with `upgrade_schema` and stamped with it
+    first, so only the migrations after it run.
+    """
+    tables = set(inspect(db.engine).get_table_names())
+    if tables and "alembic_version" not in tables:
+        upgrade_schema()
+        flask_migrate.stamp(revision=BASELINE_REVISION)
+    flask_migrate.upgrade()
+
+def upgrade_schema() -> None:
+    """Bring a database created by `db.create_all()` up to the baseline revision.
+
+    `db.create_all()` only creates missing tables, so columns and indexes added to existing
+    tables are applied here. Every step is idempotent. Schema changes since the baseline are
+    migrations instead, see `upgrade_database`.
+    """
+    with db.engine.begin() as connection:
+        add_flight_minute_columns(connection)
+        convert_seat_configurations(connection)
+        add_seat_version_column(connection)
+
+def add_flight_minute_columns(connection: Connection) -> int:
+    """Add the minute-of-day columns and their indexes to flights, then backfill them.
+
+    Returns the number of rows that were backfilled.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns("flights")}
+    for column in ("departure_minute", "arrival_minute"):
+        if column not in columns:
+            connection.execute(text(f"ALTER TABLE flights ADD COLUMN {column} INTEGER"))
+
+    for index in FlightEntity.__table__.indexes:
+        index.create(bind=connection, checkfirst=True)
+
+    rows = connection.execute(text(
+        "SELECT guid, departure_time, arrival_time FROM flights "
+        "WHERE departure_minute IS NULL OR arrival_minute IS NULL"
+    )).fetchall()
+    updates = [
+        {"guid": guid, "departure_minute": parse_time_of_day(departure_time), "arrival_minute": parse_time_of_day(arrival_time)}
+        for guid, departure_time, arrival_time in rows
+    ]
+    # Rows whose times are not in the display format stay NULL and are simply left out of time filters
+    updates = [update for update in updates if update["departure_minute"] is not None or update["arrival_minute"] is not None]
+    if updates:
+        connection.execute(
+            text("UPDATE flights SET departure_minute = :departure_minute, arrival_minute = :arrival_minute WHERE guid = :guid"),
+            updates
+        )
+    return len(updates)
+
+def convert_seat_configurations(connection: Connection) -> int:
+    """Replace the per-flight JSON seat lists with booked-seat bitsets over the standard layout.
+
+    Every stored list was generated from the standard layout, so only seat availability is carried
+    over; a list that disagrees with the layout aborts the upgrade instead of losing data. The JSON
+    column is dropped once every row is converted. Returns the number of rows converted.
+    """
+    columns = {column["name"] for column in inspect(connection).get_columns("flight_seats")}
+    if "layout_id" not in columns:
+        connection.execute(text("ALTER TABLE flight_seats ADD COLUMN layout_id VARCHAR(36)"))
+    if "booked_seats" not in columns:
+        binary = LargeBinary().compile(dialect=connection.dialect)  # BLOB on SQLite, BYTEA on PostgreSQL
+        connection.execute(text(f"ALTER TABLE flight_seats ADD COLUMN booked_seats {binary}"))
+    if "seat_configuration" not in columns:
+        return 0
+
+    # The JSON column is dropped in the same transaction, so while it exists no row has been converted
+    rows = connection.execute(text("SELECT guid, seat_configuration FROM flight_seats WHERE seat_configuration IS NOT NULL")).fetchall()
+    updates = []
+    for guid, seat_configuration in rows:
+        if isinstance(seat_configuration, str):
+            seat_configuration = json.loads(seat_configuration)
+        booked = STANDARD_LAYOUT.booked_from_configuration(seat_configuration or [])
+        updates.append({
+            "guid": guid,
+            "layout_id": STANDARD_LAYOUT.layout_id,
+            "booked_seats": STANDARD_LAYOUT.pack(booked),
+            "seats_available": STANDARD_LAYOUT.size - count_seats(booked),
+        })
+    if updates:
+        connection.execute(
+            text(
+                "UPDATE flight_seats SET layout_id = :layout_id, booked_seats = :booked_seats, "
+                "seats_available = :seats_available WHERE guid = :guid"
+            ).bindparams(bindparam("booked_seats", type_=LargeBinary)),
+            updates
+        )
+    connection.execute(text("ALTER TABLE flight_seats DROP COLUMN seat_configuration"))
+    return len(updates)
+
+def add_seat_version_column(connection: Connection) -> None:
+    """Add the optimistic-locking version counter to flight_seats."""
+    columns = {column["name"] for column in inspect(connection).get_columns("flight_seats")}
+    if "version_id" not in columns:
+        connection.execute(text("ALTER TABLE flight_seats ADD COLUMN version_id INTEGER NOT NULL DEFAULT 1"))
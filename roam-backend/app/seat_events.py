@@ -0,0 +1,161 @@
+"""Live seat-map changes for `GET /api/flight/<guid>/seats/stream`.
+
+Every change to which seats a viewer can pick is published as a compact delta,
+`{"taken": [seat IDs], "free": [seat IDs]}`, to the subscribers of that flight. Bookings and
+cancellations are picked up from the ORM unit of work when they commit. Holds are reported by
+`SeatHolds` as they are taken, released, or expire.
+
+Subscribers do not get a queue or a thread each. Every flight with subscribers has one channel: a
+short log of recent deltas and a condition variable. A publish appends to the log and wakes the
+waiting subscribers, and each subscriber reads the log from its last sequence number. Idle
+subscribers cost a few objects, and a publish costs the same however many subscribers there are.
+A subscriber that falls further behind than the log reaches gets a reset and reloads the seat map.
+
+Channels are per process, like the seat holds themselves.
+"""
+import threading
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Tuple
+from flask import current_app, has_app_context
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import get_history
+from app import db
+from app.seat_layouts import SeatLayout
+
+SeatDelta = Dict[str, List[int]]
+RESET = None  # Delivered in place of deltas a subscriber missed
+
+class _Channel:
+    def __init__(self, history: int) -> None:
+        self.condition = threading.Condition()
+        self.log: Deque[Tuple[int, SeatDelta]] = deque(maxlen=history)
+        self.last_seq = 0
+        self.subscribers = 0
+
+class SeatSubscription:
+    """One viewer's position in a flight's channel. Close it when the viewer goes away."""
+
+    def __init__(self, broker: "SeatEventBroker", flight_id: str, channel: _Channel,
+                 on_idle: Optional[Callable[[], None]] = None) -> None:
+        self.flight_id = flight_id
+        self._on_idle = on_idle
+        self._broker = broker
+        self._channel = channel
+        self.last_seq = channel.last_seq
+        self.closed = False
+
+    def wait(self, timeout: float) -> List[Tuple[int, Optional[SeatDelta]]]:
+        """`(seq, delta)` pairs published since the last call, waiting up to `timeout` seconds for one.
+
+        Returns an empty list on timeout, after calling the subscription's `on_idle`, and a single
+        RESET if deltas were missed.
+        """
+        channel = self._channel
+        with channel.condition:
+            channel.condition.wait_for(lambda: channel.last_seq > self.last_seq or self.closed, timeout)
+            idle = channel.last_seq == self.last_seq
+        if idle:
+            if self._on_idle is not None and not self.closed:
+                self._on_idle()
+            return []
+        with channel.condition:
+            if not channel.log or channel.log[0][0] > self.last_seq + 1:
+                self.last_seq = channel.last_seq
+                return [(self.last_seq, RESET)]
+            deltas = [(seq, delta) for seq, delta in channel.log if seq > self.last_seq]
+            self.last_seq = channel.last_seq
+            return deltas
+
+    def close(self) -> None:
+        if not self.closed:
+            self.closed = True
+            self._broker._unsubscribe(self)
+
+class SeatEventBroker:
+    """In-process fan-out of seat deltas to the viewers of each flight."""
+
+    def __init__(self, history: int = 64) -> None:
+        self._history = history
+        self._lock = threading.Lock()
+        self._channels: Dict[str, _Channel] = {}
+
+    def subscribe(self, flight_id: str, on_idle: Optional[Callable[[], None]] = None) -> SeatSubscription:
+        """Start receiving the deltas published for a flight from now on."""
+        with self._lock:
+            channel = self._channels.get(flight_id)
+            if channel is None:
+                channel = self._channels[flight_id] = _Channel(self._history)
+            channel.subscribers += 1
+        with channel.condition:
+            return SeatSubscription(self, flight_id, channel, on_idle)
+
+    def publish(self, flight_id: str, taken: Iterable[int] = (), free: Iterable[int] = ()) -> None:
+        """Send a delta to the flight's subscribers; a no-op when nobody is watching."""
+        taken, free = sorted(taken), sorted(free)
+        if not taken and not free:
+            return
+        with self._lock:
+            channel = self._channels.get(flight_id)
+        if channel is None:
+            return
+        with channel.condition:
+            channel.last_seq += 1
+            channel.log.append((channel.last_seq, {"taken": taken, "free": free}))
+            channel.condition.notify_all()
+
+    def subscriber_count(self, flight_id: Optional[str] = None) -> int:
+        with self._lock:
+            if flight_id is not None:
+                channel = self._channels.get(flight_id)
+                return channel.subscribers if channel else 0
+            return sum(channel.subscribers for channel in self._channels.values())
+
+    def _unsubscribe(self, subscription: SeatSubscription) -> None:
+        with self._lock:
+            channel = self._channels.get(subscription.flight_id)
+            if channel is not None:
+                channel.subscribers -= 1
+                if channel.subscribers <= 0:
+                    del self._channels[subscription.flight_id]
+        with subscription._channel.condition:
+            subscription._channel.condition.notify_all()
+
+def get_seat_events() -> SeatEventBroker:
+    return current_app.extensions["seat_events"]
+
+def _seat_changes(session: Session) -> Dict[str, List]:
+    return session.info.setdefault("seat_changes", {})  # flight -> [booked before, booked now]
+
+@event.listens_for(db.session, "after_flush")
+def _record_seat_changes(session: Session, flush_context) -> None:
+    changes = _seat_changes(session)
+    for instance in session.dirty:
+        if getattr(instance, "__tablename__", None) != "flight_seats":
+            continue
+        history = get_history(instance, "booked_seats")
+        if not history.has_changes():
+            continue
+        before = SeatLayout.unpack(history.deleted[0]) if history.deleted else 0
+        changes.setdefault(instance.flight_id, [before, before])[1] = instance.booked_mask
+
+@event.listens_for(db.session, "after_commit")
+def _publish_seat_changes(session: Session) -> None:
+    changes = session.info.pop("seat_changes", None)
+    if not changes or not has_app_context() or "seat_events" not in current_app.extensions:
+        return
+    broker = get_seat_events()
+    for flight_id, (before, after) in changes.items():
+        broker.publish(flight_id, _seat_ids(after & ~before), _seat_ids(before & ~after))
+
+@event.listens_for(db.session, "after_soft_rollback")
+def _forget_seat_changes(session: Session, previous_transaction) -> None:
+    session.info.pop("seat_changes", None)
+
+def _seat_ids(mask: int) -> List[int]:
+    seat_ids = []
+    while mask:
+        lowest = mask & -mask
+        seat_ids.append(lowest.bit_length())
+        mask ^= lowest
+    return seat_ids
@@ -0,0 +1,139 @@
+"""Temporary seat holds taken during checkout.
+
+A hold reserves seats on one flight for a few minutes without writing to the database, so seats
+picked on the seat map are not lost while the passenger fills in the rest of the booking. Holds
+expire on their own: expiry times sit in a min-heap, and every operation first pops the holds that
+are due, so reclaiming costs O(expired log n) however many flights and holds are live.
+
+Holds are kept per process, like the route index and the caches. A `listener` is told which seats
+each change takes or frees, so seat-map viewers can be kept up to date.
+"""
+import heapq
+import threading
+import time
+import uuid
+from typing import Callable, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+from app.seat_layouts import SeatUnavailableError
+
+HoldListener = Callable[[str, FrozenSet[int], FrozenSet[int]], None]  # (flight_id, taken, freed)
+
+class SeatHold:
+    """Seats on one flight reserved under a token until `expires_at` (on the holds' clock)."""
+
+    def __init__(self, token: str, flight_id: str, seat_ids: FrozenSet[int], expires_at: float) -> None:
+        self.token = token
+        self.flight_id = flight_id
+        self.seat_ids = seat_ids
+        self.expires_at = expires_at
+
+    def to_dict(self, now: float) -> Dict:
+        return {
+            "token": self.token,
+            "flight_id": self.flight_id,
+            "seat_ids": sorted(self.seat_ids),
+            "expires_in_seconds": max(0, round(self.expires_at - now)),
+        }
+
+class SeatHolds:
+    """Thread-safe set of live seat holds with automatic expiry."""
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic, listener: Optional[HoldListener] = None) -> None:
+        self._clock = clock
+        self._listener = listener
+        self._lock = threading.Lock()
+        self._holds: Dict[str, SeatHold] = {}
+        self._holders: Dict[str, Dict[int, str]] = {}  # flight -> seat -> token
+        self._expiry: List[Tuple[float, str]] = []  # May contain entries for released or extended holds
+
+    def now(self) -> float:
+        return self._clock()
+
+    def hold(self, flight_id: str, seat_ids: Iterable[int], ttl_seconds: float, token: Optional[str] = None) -> SeatHold:
+        """Hold `seat_ids` on a flight for `ttl_seconds`.
+
+        Passing the token of a live hold on the same flight replaces its seats and restarts its clock,
+        so a checkout keeps one hold per flight as seats are picked. An expired or unknown token starts
+        a new hold with a new token. Raises SeatUnavailableError if another hold has any of the seats.
+        """
+        seat_ids = frozenset(seat_ids)
+        with self._lock:
+            self._reclaim_expired()
+            current = self._holds.get(token) if token else None
+            if current is not None and current.flight_id != flight_id:
+                raise ValueError("Hold token belongs to another flight.")
+
+            own_token = current.token if current is not None else None
+            holders = self._holders.get(flight_id, {})
+            conflicts = sorted(seat_id for seat_id in seat_ids if holders.get(seat_id, own_token) != own_token)
+            if conflicts:
+                raise SeatUnavailableError(f"Seats {', '.join(map(str, conflicts))} are held by another booking.")
+
+            previous = frozenset()
+            if current is not None:
+                previous = current.seat_ids
+                self._drop(current)
+            # Tokens are only ever minted here, so a client cannot pick its own
+            hold = SeatHold(own_token or str(uuid.uuid4()), flight_id, seat_ids, self._clock() + ttl_seconds)
+            self._holds[hold.token] = hold
+            holders = self._holders.setdefault(flight_id, {})
+            for seat_id in seat_ids:
+                holders[seat_id] = hold.token
+            heapq.heappush(self._expiry, (hold.expires_at, hold.token))
+            self._notify(flight_id, seat_ids - previous, previous - seat_ids)
+            return hold
+
+    def get(self, token: str) -> Optional[SeatHold]:
+        with self._lock:
+            self._reclaim_expired()
+            return self._holds.get(token)
+
+    def release(self, token: str, booked: bool = False) -> bool:
+        """Drop a hold before it expires. Pass `booked` when its seats were just booked, so they are not reported free."""
+        with self._lock:
+            hold = self._holds.get(token)
+            if hold is None:
+                return False
+            self._drop(hold)
+            if not booked:
+                self._notify(hold.flight_id, frozenset(), hold.seat_ids)
+            return True
+
+    def held_seats(self, flight_id: str, exclude_tokens: Iterable[Optional[str]] = ()) -> Set[int]:
+        """Seats on a flight held by live holds other than `exclude_tokens`."""
+        exclude_tokens = set(exclude_tokens)
+        with self._lock:
+            self._reclaim_expired()
+            return {seat_id for seat_id, token in self._holders.get(flight_id, {}).items() if token not in exclude_tokens}
+
+    def expire(self) -> None:
+        """Drop the holds that are due now rather than on the next operation."""
+        with self._lock:
+            self._reclaim_expired()
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._reclaim_expired()
+            return len(self._holds)
+
+    def _reclaim_expired(self) -> None:
+        now = self._clock()
+        while self._expiry and self._expiry[0][0] <= now:
+            expires_at, token = heapq.heappop(self._expiry)
+            hold = self._holds.get(token)
+            # Entries left behind by a release or an extension no longer match a live hold
+            if hold is not None and hold.expires_at == expires_at:
+                self._drop(hold)
+                self._notify(hold.flight_id, frozenset(), hold.seat_ids)
+
+    def _notify(self, flight_id: str, taken: FrozenSet[int], freed: FrozenSet[int]) -> None:
+        if self._listener is not None and (taken or freed):
+            self._listener(flight_id, taken, freed)
+
+    def _drop(self, hold: SeatHold) -> None:
+        del self._holds[hold.token]
+        holders = self._holders.get(hold.flight_id, {})
+        for seat_id in hold.seat_ids:
+            if holders.get(seat_id) == hold.token:
+                del holders[seat_id]
+        if not holders:
+            self._holders.pop(hold.flight_id, None)
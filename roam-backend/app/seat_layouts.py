@@ -0,0 +1,176 @@
+"""Cabin layout templates and the seat bitsets stored against them.
+
+The type and position of every seat depend only on the aircraft layout, so they live here once
+instead of being copied into every flight. A flight stores which seats are booked as a bitset
+where bit `seat_id - 1` is set for a booked seat; `SeatLayout.expand` turns the two back into the
+`seat_configuration` list the API has always returned.
+
+Layouts also know their rows, split into sections by the aisles, so finding seats together is a few
+shifts and ANDs over the same bitset instead of a walk over the seat map.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+SeatDict = Dict[str, Union[int, str, bool]]
+
+class SeatUnavailableError(ValueError):
+    """A requested seat is already booked, or could not be booked because the seat map kept changing."""
+
+class SeatLayout:
+    """A fixed cabin layout: the type and position of each seat, numbered from 1."""
+
+    def __init__(self, layout_id: str, seats: Iterable[Tuple[str, str]], rows: Sequence[Tuple[int, ...]] = ()) -> None:
+        """`rows` gives, front to back, the widths of the sections of each row between the aisles; seats
+        are numbered along the rows. Without it, seats are not grouped into rows."""
+        self.layout_id = layout_id
+        self.seats: Tuple[Tuple[str, str], ...] = tuple(seats)
+        self.size = len(self.seats)
+        self.num_bytes = (self.size + 7) // 8
+        self.all_seats = (1 << self.size) - 1
+        # Seats of each cabin and position, so availability counts are popcounts rather than seat scans
+        self.category_masks: Dict[Tuple[str, str], int] = {}
+        for index, category in enumerate(self.seats):
+            self.category_masks[category] = self.category_masks.get(category, 0) | 1 << index
+
+        if rows and sum(map(sum, rows)) != self.size:
+            raise ValueError(f"Rows of layout {layout_id} do not add up to {self.size} seats.")
+        self.rows: List[Tuple[int, int]] = []  # (first seat index, width) of each row
+        self.sections: List[Tuple[int, int]] = []  # Same, for each run of seats between aisles
+        start = 0
+        for widths in rows:
+            self.rows.append((start, sum(widths)))
+            for width in widths:
+                self.sections.append((start, width))
+                start += width
+        self._block_starts: Dict[Tuple[int, bool], int] = {}
+
+    def cabin_mask(self, seat_type: Optional[str] = None) -> int:
+        """Seats of one cabin, or every seat when `seat_type` is None."""
+        if seat_type is None:
+            return self.all_seats
+        return sum(mask for (category_type, _), mask in self.category_masks.items() if category_type == seat_type)
+
+    def has_seat(self, seat_id: int) -> bool:
+        return isinstance(seat_id, int) and 1 <= seat_id <= self.size
+
+    def seat_mask(self, seat_id: int) -> int:
+        return 1 << (seat_id - 1)
+
+    def mask_of(self, predicate) -> int:
+        """Bitmask of the seats whose `(type, position)` satisfies `predicate`."""
+        mask = 0
+        for index, (seat_type, position) in enumerate(self.seats):
+            if predicate(seat_type, position):
+                mask |= 1 << index
+        return mask
+
+    def expand(self, booked: int) -> List[SeatDict]:
+        """The `seat_configuration` wire format for a bitset of booked seats."""
+        return [
+            {"seat_id": index + 1, "type": seat_type, "position": position, "available": not booked >> index & 1}
+            for index, (seat_type, position) in enumerate(self.seats)
+        ]
+
+    def availability(self, unavailable: int) -> Dict[str, Dict]:
+        """Free seats by cabin, and by position within each cabin, given a bitset of unavailable seats."""
+        cabins: Dict[str, Dict] = {}
+        for (seat_type, position), mask in self.category_masks.items():
+            free = count_seats(mask & ~unavailable)
+            cabin = cabins.setdefault(seat_type, {"seats_available": 0, "positions": {}})
+            cabin["seats_available"] += free
+            cabin["positions"][position] = free
+        return cabins
+
+    def block_starts(self, count: int, across_aisle: bool = False) -> int:
+        """Bitset of the seats that can start a block of `count` adjacent seats.
+
+        A block stays within one section of a row, or within one row when `across_aisle` is set.
+        """
+        key = (count, across_aisle)
+        if key not in self._block_starts:
+            starts = 0
+            for start, width in self.rows if across_aisle else self.sections:
+                for index in range(start, start + width - count + 1):
+                    starts |= 1 << index
+            self._block_starts[key] = starts
+        return self._block_starts[key]
+
+    def free_blocks(self, unavailable: int, count: int, seat_type: Optional[str] = None, across_aisle: bool = False) -> int:
+        """Bitset of the first seats of every block of `count` adjacent free seats.
+
+        Bit i of `free & free >> 1 & ... & free >> (count - 1)` is set exactly when seats i to
+        i + count - 1 are all free, which is then kept only where such a block fits in a row.
+        """
+        if count < 1:
+            return 0
+        free = self.cabin_mask(seat_type) & ~unavailable
+        runs = free
+        for shift in range(1, count):
+            runs &= free >> shift
+        return runs & self.block_starts(count, across_aisle)
+
+    def suggest_blocks(self, unavailable: int, count: int, seat_type: Optional[str] = None, limit: int = 5) -> List[List[int]]:
+        """Up to `limit` non-overlapping blocks of `count` adjacent free seats, as seat ID lists.
+
+        Blocks on one side of an aisle come first, then blocks split by an aisle; each front to back.
+        """
+        together = self.free_blocks(unavailable, count, seat_type)
+        split = self.free_blocks(unavailable, count, seat_type, across_aisle=True) & ~together
+        blocks: List[List[int]] = []
+        taken = 0
+        for starts in (together, split):
+            while starts and len(blocks) < limit:
+                lowest = starts & -starts
+                starts ^= lowest
+                block = (lowest << count) - lowest
+                if not block & taken:
+                    taken |= block
+                    first = lowest.bit_length()
+                    blocks.append(list(range(first, first + count)))
+        return blocks
+
+    def booked_from_configuration(self, seat_configuration: Iterable[SeatDict]) -> int:
+        """Bitset of booked seats from a `seat_configuration` list; seats it leaves out count as available.
+
+        Raises ValueError when a seat does not exist in this layout or disagrees with its type or position.
+        """
+        booked = 0
+        for seat in seat_configuration:
+            seat_id = seat.get("seat_id")
+            if not self.has_seat(seat_id):
+                raise ValueError(f"Seat {seat_id} does not exist in layout {self.layout_id}.")
+            seat_type, position = self.seats[seat_id - 1]
+            if seat.get("type", seat_type) != seat_type or seat.get("position", position) != position:
+                raise ValueError(f"Seat {seat_id} does not match layout {self.layout_id}.")
+            if seat.get("available") is False:
+                booked |= self.seat_mask(seat_id)
+        return booked
+
+    def pack(self, booked: int) -> bytes:
+        return booked.to_bytes(self.num_bytes, "little")
+
+    @staticmethod
+    def unpack(data: bytes) -> int:
+        return int.from_bytes(data or b"", "little")
+
+def count_seats(mask: int) -> int:
+    return bin(mask).count("1")
+
+def _standard_seats() -> List[Tuple[str, str]]:
+    seats = []
+    for i in range(1, 189):  # Seats 1 to 188
+        if i <= 20:  # Business class
+            seats.append(("Business", "Window" if i % 4 in [1, 4] else "Aisle"))
+        else:  # Economy class
+            seats.append(("Economy", "Window" if i % 6 in [1, 6] else "Aisle" if i % 6 in [2, 5] else "Middle"))
+    return seats
+
+# Five business rows of 2 + 2 seats, then 28 economy rows of 3 + 3
+STANDARD_LAYOUT = SeatLayout("standard_188", _standard_seats(), rows=[(2, 2)] * 5 + [(3, 3)] * 28)
+
+LAYOUTS: Dict[str, SeatLayout] = {STANDARD_LAYOUT.layout_id: STANDARD_LAYOUT}
+
+def get_layout(layout_id: str) -> SeatLayout:
+    try:
+        return LAYOUTS[layout_id]
+    except KeyError:
+        raise ValueError(f"Unknown seat layout: {layout_id}") from None
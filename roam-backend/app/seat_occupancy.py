@@ -0,0 +1,81 @@
+"""Random seat occupancy for new flights, generated for many flights at once with NumPy.
+
+Every generated seat map follows the same walk: between 25% and 80% of the seats get booked,
+going front to back. Each free seat is picked with probability 0.75. A picked Economy seat also
+books the seat after it, and a picked Middle or Aisle seat books the free seat before it, until
+the flight's target is reached.
+
+The walk is only sequential in one place: a seat cannot be picked when the pick before it already
+booked it. So the picks are found with one vector step per seat across all flights. The bookings
+they make are then laid out in walk order, and a running count cuts each flight off at its target.
+"""
+from functools import lru_cache
+from typing import List, Optional, Tuple
+import numpy as np
+from app.seat_layouts import SeatLayout
+
+MIN_OCCUPANCY = 0.25
+MAX_OCCUPANCY = 0.80
+PICK_PROBABILITY = 0.75
+
+@lru_cache(maxsize=None)
+def _adjacency(layout: SeatLayout) -> Tuple[np.ndarray, np.ndarray]:
+    """Per seat: whether a pick books the next seat, and whether it books the previous one."""
+    economy = np.array([seat_type == "Economy" for seat_type, _ in layout.seats])
+    inner = np.array([position in ("Middle", "Aisle") for _, position in layout.seats])
+    books_next = economy.copy()
+    books_next[-1] = False
+    books_previous = economy & inner
+    books_previous[0] = False
+    return books_next, books_previous
+
+def occupancy_from_draws(layout: SeatLayout, fractions: np.ndarray, picks: np.ndarray) -> np.ndarray:
+    """Booked seats, shape `(flights, layout.size)`, from the walk's random draws.
+
+    `fractions` has the occupancy of each flight. `picks[f, i]` says whether seat i is picked
+    on flight f, if it is still free when the walk reaches it.
+    """
+    flights, size = picks.shape
+    books_next, books_previous = _adjacency(layout)
+    targets = (size * fractions).astype(np.int64)
+
+    # Seat i is free when reached unless the pick at i - 1 booked it as its next seat
+    picked = np.zeros((flights, size), dtype=bool)
+    blocked = np.zeros(flights, dtype=bool)
+    for i in range(size):
+        picked[:, i] = picks[:, i] & ~blocked
+        blocked = picked[:, i] & books_next[i]
+
+    # Bookings in walk order: the seat itself, the seat after it, then the seat before it if still free
+    booked_before = np.zeros((flights, size), dtype=bool)  # Booked by the time seat i - 1 was left
+    booked_before[:, 1:] = picked[:, :-1]
+    booked_before[:, 2:] |= picked[:, :-2] & books_next[:-2]
+    events = np.zeros((flights, size, 3), dtype=bool)
+    events[:, :, 0] = picked
+    events[:, :, 1] = picked & books_next
+    events[:, 1:, 2] = picked[:, 1:] & books_previous[1:] & ~booked_before[:, 1:]
+
+    # Each event books a different seat, so the running count of events is the running occupancy
+    events &= (np.cumsum(events.reshape(flights, size * 3), axis=1) <= targets[:, None]).reshape(events.shape)
+    booked = events[:, :, 0].copy()
+    booked[:, 1:] |= events[:, :-1, 1]
+    booked[:, :-1] |= events[:, 1:, 2]
+    return booked
+
+def random_occupancy(layout: SeatLayout, flights: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    """Booked seats for `flights` new flights, shape `(flights, layout.size)`.
+
+    Pass a seeded `np.random.default_rng(seed)` for reproducible seat maps.
+    """
+    rng = rng if rng is not None else np.random.default_rng()
+    fractions = rng.uniform(MIN_OCCUPANCY, MAX_OCCUPANCY, flights)
+    picks = rng.random((flights, layout.size)) < PICK_PROBABILITY
+    return occupancy_from_draws(layout, fractions, picks)
+
+def pack_occupancy(booked: np.ndarray) -> Tuple[List[bytes], List[int]]:
+    """The stored `booked_seats` bitset and booked seat count of each row of `booked`.
+
+    The bytes match `SeatLayout.pack`: little-endian, with bit n for seat n + 1.
+    """
+    packed = np.packbits(booked, axis=1, bitorder="little")
+    return [row.tobytes() for row in packed], booked.sum(axis=1).tolist()
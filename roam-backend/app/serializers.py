@@ -0,0 +1,227 @@
+"""Row serializers for the read-only endpoints.
+
+Going through `entity.to_dto().to_dict()` builds three object graphs per row: the ORM entity, the
+DTO and the dict. The serializers here select exactly the columns the wire format needs in one
+flat query and turn each result row straight into the response dict. The dicts have the same
+keys and values as the DTO `to_dict()` methods, so the JSON responses stay byte-for-byte identical.
+
+Airports and airlines are reference data, so their serialized fragments are cached by GUID (see
+`AirportRepository.get_fragments`) and embedded into flights instead of being joined and rebuilt
+for every leg.
+"""
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+from sqlalchemy import select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+from app.models.entities.airline_entity import AirlineEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.continent_entity import ContinentEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.flight_entity import FlightEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.layover_entity import LayoverEntity
+from app.models.entities.location_entity import LocationEntity
+from app.models.entities.passenger_entity import PassengerEntity
+from app.models.entities.trip_entity import TripEntity
+
+class AirportJoin:
+    """An airport alias with its location, country and continent, as joined into a projection."""
+
+    def __init__(self, name: str) -> None:
+        self.airport = aliased(AirportEntity, name=name)
+        self.location = aliased(LocationEntity, name=f"{name}_location")
+        self.country = aliased(CountryEntity, name=f"{name}_country")
+        self.continent = aliased(ContinentEntity, name=f"{name}_continent")
+
+    def columns(self) -> list:
+        airport, location, country, continent = self.airport, self.location, self.country, self.continent
+        return [
+            airport.guid, airport.full_name, airport.short_name, airport.municipality_name, airport.iata_code,
+            location.guid, location.latitude, location.longitude,
+            country.guid, country.code, country.name,
+            continent.guid, continent.code, continent.name,
+        ]
+
+    def join(self, statement: Select) -> Select:
+        """Outer join the location, country and continent of the airport already in `statement`."""
+        return (
+            statement
+            .outerjoin(self.location, self.airport.location_id == self.location.guid)
+            .outerjoin(self.country, self.airport.country_id == self.country.guid)
+            .outerjoin(self.continent, self.country.continent_id == self.continent.guid)
+        )
+
+def airport_from_row(row: Sequence, i: int) -> Optional[Dict]:
+    """Build the `AirportDTO.to_dict()` shape from the airport columns starting at `i`."""
+    if row[i] is None:
+        return None
+    country = None
+    if row[i + 8] is not None:
+        continent = {"guid": row[i + 11], "code": row[i + 12], "name": row[i + 13]} if row[i + 11] is not None else None
+        country = {"guid": row[i + 8], "code": row[i + 9], "name": row[i + 10], "continent": continent}
+    return {
+        "guid": row[i],
+        "full_name": row[i + 1],
+        "short_name": row[i + 2],
+        "municipality_name": row[i + 3],
+        "iata_code": row[i + 4],
+        "location": {"guid": row[i + 5], "latitude": row[i + 6], "longitude": row[i + 7]} if row[i + 5] is not None else None,
+        "country": country,
+    }
+
+# Callers filter the airport projection through these aliases, e.g. `AIRPORT.airport.iata_code == code`
+AIRPORT = AirportJoin("airport")
+AIRPORT_SELECT = AIRPORT.join(select(*AIRPORT.columns()).select_from(AIRPORT.airport))
+
+def serialize_airports(rows: Iterable[Row]) -> List[Dict]:
+    return [airport_from_row(row, 0) for row in rows]
+
+
+AIRLINE_SELECT = select(AirlineEntity.guid, AirlineEntity.icao_code, AirlineEntity.name, AirlineEntity.logo_path)
+
+def serialize_airlines(rows: Iterable[Row]) -> List[Dict]:
+    return [{"guid": guid, "icao_code": icao_code, "name": name, "logo_path": logo_path} for guid, icao_code, name, logo_path in rows]
+
+
+# Airlines and airports are embedded from cached fragments, so flight rows only carry their GUIDs
+FLIGHT_SELECT = select(
+    FlightEntity.guid, FlightEntity.flight_time_minutes, FlightEntity.departure_time, FlightEntity.arrival_time,
+    FlightEntity.num_stops, FlightEntity.price_economy, FlightEntity.price_business, FlightEntity.baggage_allowance,
+    FlightEntity.airline_id, FlightEntity.departure_airport_id, FlightEntity.arrival_airport_id,
+    LayoverEntity.guid, LayoverEntity.duration_minutes, LayoverEntity.airport_id,
+    FlightSeatsEntity.guid,
+).select_from(FlightEntity).outerjoin(
+    LayoverEntity, LayoverEntity.flight_id == FlightEntity.guid
+).outerjoin(
+    FlightSeatsEntity, FlightSeatsEntity.flight_id == FlightEntity.guid
+)
+
+def flight_fragment_ids(rows: Iterable[Sequence]) -> Tuple[Set[str], Set[str]]:
+    """The airline and airport GUIDs a batch of `FLIGHT_SELECT` rows embeds."""
+    airline_ids, airport_ids = set(), set()
+    for row in rows:
+        airline_ids.add(row[8])
+        airport_ids.update((row[9], row[10], row[13]))
+    airport_ids.discard(None)
+    return airline_ids, airport_ids
+
+def flight_from_row(row: Sequence, airports: Dict[str, Dict], airlines: Dict[str, Dict]) -> Dict:
+    """Build the `FlightDTO.to_dict()` shape from one row of `FLIGHT_SELECT` and the serialized fragments.
+
+    Fragments are shared between flights and with the fragment cache, so they must not be mutated.
+    """
+    layover = None
+    if row[11] is not None:
+        layover = {"guid": row[11], "airport": airports.get(row[13]), "duration_minutes": row[12]}
+    return {
+        "guid": row[0],
+        "flight_time_minutes": row[1],
+        "departure_time": row[2],
+        "arrival_time": row[3],
+        "num_stops": row[4],
+        "price_economy": row[5],
+        "price_business": row[6],
+        "baggage_allowance": row[7],
+        "airline": airlines.get(row[8]),
+        "departure_airport": airports.get(row[9]),
+        "arrival_airport": airports.get(row[10]),
+        "layover": layover,
+        "seat_configuration_id": row[14],
+    }
+
+def serialize_flights(rows: Iterable[Row], airports: Dict[str, Dict], airlines: Dict[str, Dict]) -> List[Dict]:
+    return [flight_from_row(row, airports, airlines) for row in rows]
+
+
+TRIP_SELECT = select(
+    TripEntity.guid, TripEntity.name, TripEntity.is_round_trip, TripEntity.departure_date, TripEntity.return_date,
+    TripEntity.departing_flight_id, TripEntity.returning_flight_id,
+)
+PASSENGER_SELECT = select(
+    PassengerEntity.guid, PassengerEntity.trip_id, PassengerEntity.name,
+    PassengerEntity.departing_seat_id, PassengerEntity.returning_seat_id,
+)
+
+def serialize_trips(rows: Iterable[Row], flights: Dict[str, Dict], passengers: Iterable[Row]) -> List[Dict]:
+    """Build `TripDTO.to_dict()` shapes from trip rows, serialized flights by GUID and passenger rows."""
+    passengers_by_trip: Dict[str, List[Dict]] = {}
+    for guid, trip_id, name, departing_seat_id, returning_seat_id in passengers:
+        passengers_by_trip.setdefault(trip_id, []).append({
+            "guid": guid,
+            "trip_id": trip_id,
+            "name": name,
+            "departing_seat_id": departing_seat_id,
+            "returning_seat_id": returning_seat_id,
+        })
+    return [
+        {
+            "guid": guid,
+            "name": name,
+            "is_round_trip": is_round_trip,
+            "departure_date": departure_date.isoformat() if departure_date else None,
+            "return_date": return_date.isoformat() if return_date else None,
+            "departing_flight": flights.get(departing_flight_id),
+            "returning_flight": flights.get(returning_flight_id),
+            "passengers": passengers_by_trip.get(guid, []),
+        }
+        for guid, name, is_round_trip, departure_date, return_date, departing_flight_id, returning_flight_id in rows
+    ]
+
+
+# Response shapes: "nested" embeds airports and airlines in every flight, "normalized" references
+# them by GUID and sends each distinct one once in side tables
+NESTED = "nested"
+NORMALIZED = "normalized"
+SHAPES = (NESTED, NORMALIZED)
+
+def check_shape(shape: Optional[str]) -> str:
+    shape = shape or NESTED
+    if shape not in SHAPES:
+        raise ValueError(f"shape must be one of {', '.join(SHAPES)}.")
+    return shape
+
+def normalize_flight(flight: Optional[Dict], airports: Dict[str, Dict], airlines: Dict[str, Dict]) -> Optional[Dict]:
+    """Swap the embedded airline and airports of a serialized flight for GUIDs, collecting them in side tables."""
+    if flight is None:
+        return None
+    normalized = {key: value for key, value in flight.items() if key not in ("airline", "departure_airport", "arrival_airport", "layover")}
+    for key in ("departure_airport", "arrival_airport"):
+        airport = flight[key]
+        normalized[f"{key}_id"] = airport["guid"] if airport else None
+        if airport:
+            airports[airport["guid"]] = airport
+    airline = flight["airline"]
+    normalized["airline_id"] = airline["guid"] if airline else None
+    if airline:
+        airlines[airline["guid"]] = airline
+
+    layover = flight["layover"]
+    normalized["layover"] = None
+    if layover:
+        airport = layover["airport"]
+        normalized["layover"] = {"guid": layover["guid"], "airport_id": airport["guid"] if airport else None, "duration_minutes": layover["duration_minutes"]}
+        if airport:
+            airports[airport["guid"]] = airport
+    return normalized
+
+def normalize_flights(flights: List[Dict]) -> Dict:
+    """The normalized shape of a flight list: `{"flights", "airports", "airlines"}`."""
+    airports: Dict[str, Dict] = {}
+    airlines: Dict[str, Dict] = {}
+    normalized = [normalize_flight(flight, airports, airlines) for flight in flights]
+    return {"flights": normalized, "airports": airports, "airlines": airlines}
+
+def normalize_trips(trips: List[Dict]) -> Dict:
+    """The normalized shape of a trip list: `{"trips", "airports", "airlines"}`."""
+    airports: Dict[str, Dict] = {}
+    airlines: Dict[str, Dict] = {}
+    normalized = [
+        {
+            **trip,
+            "departing_flight": normalize_flight(trip["departing_flight"], airports, airlines),
+            "returning_flight": normalize_flight(trip["returning_flight"], airports, airlines),
+        }
+        for trip in trips
+    ]
+    return {"trips": normalized, "airports": airports, "airlines": airlines}
@@ -2,12 +2,14 @@ from typing import List, Optional
 from app.models.dto.airline_dto import AirlineDTO
 from app.repositories.airline_repository import AirlineRepository
 from app.models.entities.airline_entity import AirlineEntity
+from app.unit_of_work import unit_of_work
 
 class AirlineService:
     @staticmethod
     def create_airline(airline_dto: AirlineDTO) -> AirlineEntity:
         """Create a new airport and add it to the database."""
-        AirlineRepository.add(airline_dto)
+        with unit_of_work():
+            AirlineRepository.add(airline_dto)
         return AirlineRepository.get_by_guid(airline_dto.guid)
 
     @staticmethod
@@ -1,13 +1,15 @@
-from typing import List, Optional
+from typing import Dict, List, Optional
 from app.models.dto.airport_dto import AirportDTO
 from app.repositories.airport_repository import AirportRepository
 from app.models.entities.airport_entity import AirportEntity
+from app.unit_of_work import unit_of_work
 
 class AirportService:
     @staticmethod
     def create_airport(airport_dto: AirportDTO) -> AirportEntity:
         """Create a new airport and add it to the database."""
-        AirportRepository.add(airport_dto)
+        with unit_of_work():
+            AirportRepository.add(airport_dto)
         return AirportRepository.get_by_guid(airport_dto.guid)
 
     @staticmethod
@@ -15,6 +17,30 @@ class AirportService:
         """Retrieve all airports from the database."""
         return AirportRepository.get_all()
 
+    @staticmethod
+    def get_serialized_airports() -> List[Dict]:
+        """Response dicts of all airports."""
+        return AirportRepository.find_serialized()
+
+    @staticmethod
+    def get_serialized_airport_by_id(guid: str) -> Dict:
+        """Response dict of an airport by its GUID."""
+        airport = AirportRepository.get_fragments([guid]).get(guid)
+        if not airport:
+            raise ValueError("Airport not found.")
+        return airport
+
+    @staticmethod
+    def get_serialized_airport_by_iata_code(iata_code: str) -> Optional[Dict]:
+        """Response dict of an airport by its IATA code."""
+        airports = AirportRepository.find_serialized(iata_code=iata_code)
+        return airports[0] if airports else None
+
+    @staticmethod
+    def get_serialized_airports_by_country_code(country_code: str) -> List[Dict]:
+        """Response dicts of all airports in a country, by country code."""
+        return AirportRepository.find_serialized_by_country_code(country_code)
+
     @staticmethod
     def get_airport_by_id(guid: str) -> Optional[AirportEntity]:
         """Retrieve an airport by its GUID."""
@@ -0,0 +1,172 @@
+import heapq
+from bisect import bisect_left
+from typing import Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Tuple
+from app.repositories.route_index import RouteIndex, FlightRecord
+
+MINUTES_PER_DAY = 24 * 60
+
+class Itinerary(NamedTuple):
+    """A chain of flight legs from origin to destination with the wait at each connection."""
+    legs: Tuple[FlightRecord, ...]
+    waits: Tuple[int, ...]
+    total_minutes: int
+    total_price: float
+
+
+class ConnectionSearch:
+    """Time-aware best-first search for itineraries built from individual flight legs.
+
+    Flights only carry a time of day, so schedules are treated as daily: a connection that
+    misses the next departure waits for the following day's one. Labels are expanded in order
+    of total travel time (or price), so the first `max_results` itineraries that reach the
+    destination are the best ones. Airports that cannot reach the destination within the
+    remaining number of legs are pruned using the route index's inbound route sets.
+    """
+    def __init__(self, route_index: RouteIndex, default_min_connect: int = 60,
+                 min_connect_by_airport: Optional[Dict[str, int]] = None,
+                 max_connect: int = 12 * 60, max_labels: int = 200000) -> None:
+        self.route_index = route_index
+        self.default_min_connect = default_min_connect
+        self.min_connect_by_airport = min_connect_by_airport or {}
+        self.max_connect = max_connect
+        self.max_labels = max_labels
+
+    def min_connect(self, airport_id: str) -> int:
+        """Minimum connection time at an airport, in minutes."""
+        return self.min_connect_by_airport.get(airport_id, self.default_min_connect)
+
+    def search(self, origin: str, destination: str, max_stops: int = 2,
+               max_results: int = 10, rank_by: str = "duration") -> List[Itinerary]:
+        """Return up to `max_results` itineraries with at most `max_stops` connections, best first."""
+        if not origin or not destination or origin == destination:
+            return []
+
+        max_legs = max_stops + 1
+        within = self._reachable_within(destination, max_legs - 1)
+        by_price = rank_by == "price"
+        remaining = self._remaining_minutes_bound(destination, within)
+
+        heap: List[tuple] = []
+        counter = 0
+
+        # Max-heap of the best complete costs pushed so far; labels that cannot beat the
+        # `max_results`-th of them are never pushed
+        best_complete: List[float] = []
+
+        def push(key: tuple, legs: Tuple[FlightRecord, ...], waits: Tuple[int, ...], arrival: int, elapsed: int) -> None:
+            nonlocal counter
+            if len(best_complete) == max_results and key[0] > -best_complete[0]:
+                return
+            if legs[-1].arrival_airport_id == destination:
+                if len(best_complete) < max_results:
+                    heapq.heappush(best_complete, -key[0])
+                else:
+                    heapq.heapreplace(best_complete, -key[0])
+            heapq.heappush(heap, (key, counter, legs, waits, arrival, elapsed))
+            counter += 1
+
+        _, first_legs = self.route_index.departures(origin)
+        for leg in first_legs:
+            if leg.arrival_airport_id not in within[max_legs - 1]:
+                continue
+            elapsed = leg.flight_time_minutes
+            price = leg.price_economy
+            key = (price, elapsed) if by_price else (elapsed + remaining(leg.arrival_airport_id, max_legs - 1), price)
+            push(key, (leg,), (), leg.departure_minute + elapsed, elapsed)
+
+        results: List[Itinerary] = []
+        while heap and len(results) < max_results and counter < self.max_labels:
+            key, _, legs, waits, arrival, elapsed = heapq.heappop(heap)
+            price = key[0] if by_price else key[1]
+            airport = legs[-1].arrival_airport_id
+            if airport == destination:
+                results.append(Itinerary(legs=legs, waits=waits, total_minutes=elapsed, total_price=price))
+                continue
+
+            legs_left = max_legs - len(legs)
+            if legs_left <= 0:
+                continue
+
+            min_connect = self.min_connect(airport)
+            ready = arrival + min_connect
+            for leg, slack in self._connecting_legs(airport, destination, ready, legs_left, within, self.max_connect - min_connect):
+                wait = min_connect + slack
+                next_airport = leg.arrival_airport_id
+                if next_airport == origin or any(previous.arrival_airport_id == next_airport for previous in legs):
+                    continue
+
+                next_arrival = ready + slack + leg.flight_time_minutes
+                next_elapsed = elapsed + wait + leg.flight_time_minutes
+                next_price = price + leg.price_economy
+                next_key = (next_price, next_elapsed) if by_price else (next_elapsed + remaining(next_airport, legs_left - 1), next_price)
+                push(next_key, legs + (leg,), waits + (wait,), next_arrival, next_elapsed)
+
+        return results
+
+    def _connecting_legs(self, airport: str, destination: str, ready: int, legs_left: int,
+                         within: List[Set[str]], max_slack: int) -> Iterator[Tuple[FlightRecord, int]]:
+        """Yield (leg, slack) for departures within `max_slack` minutes of `ready` that can still reach the destination."""
+        if legs_left == 1:
+            # The last leg has to land at the destination, so only that route needs checking
+            for leg in self.route_index.find(airport, destination):
+                if leg.departure_minute is not None:
+                    slack = (leg.departure_minute - ready) % MINUTES_PER_DAY
+                    if slack <= max_slack:
+                        yield leg, slack
+            return
+
+        minutes, departures = self.route_index.departures(airport)
+        if not departures:
+            return
+        targets = within[legs_left - 1]
+        start = bisect_left(minutes, ready % MINUTES_PER_DAY)
+        total = len(departures)
+
+        # Walking the board circularly from `ready` visits departures in increasing wait order
+        for step in range(total):
+            leg = departures[(start + step) % total]
+            slack = (leg.departure_minute - ready) % MINUTES_PER_DAY
+            if slack > max_slack:
+                return
+            if leg.arrival_airport_id in targets:
+                yield leg, slack
+
+    def _remaining_minutes_bound(self, destination: str, within: List[Set[str]]) -> Callable[[str, int], int]:
+        """Build an admissible lower bound on the minutes left from an airport to the destination.
+
+        Every itinerary still needs a connection and a final leg into the destination, and when
+        only one leg is left that leg has to be a direct flight. Using the bound as an A* heuristic
+        lets the best itineraries surface before slow partial ones are expanded, without changing
+        the ranking.
+        """
+        fastest_into_destination = min(
+            (leg.flight_time_minutes for origin in within[1] - {destination}
+             for leg in self.route_index.find(origin, destination)),
+            default=0
+        )
+        bounds: Dict[Tuple[str, bool], int] = {}
+
+        def remaining(airport: str, legs_left: int) -> int:
+            if airport == destination:
+                return 0
+            last_leg = legs_left == 1
+            bound = bounds.get((airport, last_leg))
+            if bound is None:
+                direct = [leg.flight_time_minutes for leg in self.route_index.find(airport, destination)] if last_leg else []
+                bound = self.min_connect(airport) + (min(direct) if direct else fastest_into_destination)
+                bounds[(airport, last_leg)] = bound
+            return bound
+
+        return remaining
+
+    def _reachable_within(self, destination: str, max_legs: int) -> List[Set[str]]:
+        """For each k up to `max_legs`, the airports that reach the destination in at most k legs."""
+        within = [{destination}]
+        frontier = {destination}
+        for _ in range(max_legs):
+            previous = set()
+            for airport in frontier:
+                previous |= self.route_index.origins_into(airport)
+            frontier = previous - within[-1]
+            within.append(within[-1] | previous)
+        return within
@@ -1,25 +1,69 @@
 import random
-from datetime import datetime, timedelta
+import time
 import uuid
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple, Union
+from flask import current_app, jsonify
 from app.models.dto.flight_dto import FlightDTO
 from app.models.dto.flight_search_dto import FlightSearchDTO
+from app.models.dto.itinerary_dto import ItineraryDTO
 from app.repositories.flight_repository import FlightRepository
+from app.repositories.route_index import FlightRecord
+from app.services.connection_search import ConnectionSearch
+from app.seat_events import SeatSubscription, get_seat_events
+from app.seat_layouts import SeatUnavailableError
+from app.services import search_filters
+from app import serializers
+from app.cache import route_tag
+from app.utils import format_time_of_day
 from app.models.entities.flight_entity import FlightEntity
 from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.unit_of_work import unit_of_work
 
 class FlightService:
     @staticmethod
     def create_flight(flight_dto: FlightDTO) -> FlightEntity:
         """Create a new flight and add it to the database."""
-        FlightRepository.add(flight_dto)
+        with unit_of_work():
+            FlightRepository.add(flight_dto)
         return FlightRepository.get_by_guid(flight_dto.guid)
 
+    @staticmethod
+    def create_flights(flight_dtos: List[FlightDTO]) -> Dict:
+        """Bulk-create new flights and report how many rows went in and how fast.
+
+        Raises ValueError, without writing anything, if any flight is invalid or already exists, and
+        ImportInterruptedError if the database rejects a chunk after earlier ones were committed.
+        """
+        started = time.perf_counter()
+        inserted = FlightRepository.add_many(flight_dtos, current_app.config["FLIGHT_IMPORT_CHUNK_SIZE"])
+        elapsed = max(time.perf_counter() - started, 1e-9)
+        rows = sum(inserted.values())
+        return {
+            "created": len(flight_dtos),
+            "rows_inserted": inserted,
+            "elapsed_seconds": round(elapsed, 3),
+            "flights_per_second": round(len(flight_dtos) / elapsed, 1),
+            "rows_per_second": round(rows / elapsed, 1),
+        }
+
     @staticmethod
     def get_all_flights() -> List[FlightEntity]:
         """Retrieve all flights from the database."""
         return FlightRepository.get_all()
 
+    @staticmethod
+    def get_serialized_flights(**filters) -> List[Dict]:
+        """Response dicts of the flights matching column filters such as `arrival_airport_id`."""
+        return FlightRepository.find_serialized(**filters)
+
+    @staticmethod
+    def get_serialized_flight_by_id(guid: str) -> Dict:
+        """Response dict of a flight by its GUID."""
+        flights = FlightRepository.find_serialized(guid=guid)
+        if not flights:
+            raise ValueError("Flight not found.")
+        return flights[0]
+
     @staticmethod
     def get_flight_by_id(guid: str) -> Optional[FlightEntity]:
         """Retrieve a flight by its GUID."""
@@ -40,13 +84,99 @@ class FlightService:
         """Retrieve all flights by a specific airline."""
         return FlightRepository.find_by_airline_id(airline_id)
     
+    @staticmethod
+    def get_search_response(search_dto: FlightSearchDTO, shape: Optional[str] = None) -> bytes:
+        """Return the serialized JSON response for a search, reusing the cached one for repeated searches.
+
+        `shape` is "nested" (the default) or "normalized", see `serializers.SHAPES`.
+        """
+        shape = serializers.check_shape(shape)
+        return FlightRepository.get_search_cache().get_or_set(
+            (shape, search_filters.cache_key(search_dto)),
+            lambda: FlightService._render_search_response(search_dto, shape),
+            tags=[route_tag(search_dto.departure_airport_id, search_dto.arival_airport_id)]
+        )
+
+    @staticmethod
+    def get_search_cache_stats() -> Dict[str, Union[int, float, None]]:
+        """Hit, miss and eviction counters of the search response cache."""
+        return FlightRepository.get_search_cache().stats()
+
+    @staticmethod
+    def _render_search_response(search_dto: FlightSearchDTO, shape: str) -> bytes:
+        # Paged requests get an envelope with the next cursor, plain requests keep the list shape
+        records = FlightService.get_flight_records_by_search_query(search_dto)
+        next_cursor = None
+        if search_dto.is_paginated:
+            records, next_cursor = search_filters.paginate(records, search_dto)
+        else:
+            records = search_filters.filter_and_sort(records, search_dto)
+        flight_list = FlightRepository.get_indexed_serialized_by_guids([record.guid for record in records])
+
+        if shape == serializers.NORMALIZED:
+            body = serializers.normalize_flights(flight_list)
+            if search_dto.is_paginated:
+                body["next_cursor"] = next_cursor
+            return jsonify(body).get_data()
+        if search_dto.is_paginated:
+            return jsonify({"flights": flight_list, "next_cursor": next_cursor}).get_data()
+        return jsonify(flight_list).get_data()
+
     @staticmethod
     def get_flights_by_search_query(search_dto: FlightSearchDTO) -> List[FlightEntity]:
-        """Retrieve flights by departure and arrival airport IDs."""
-        return FlightRepository.find_by_departure_and_arrival(
+        """Retrieve flights by departure and arrival airport IDs, applying any search filters and sort."""
+        records = search_filters.filter_and_sort(FlightService.get_flight_records_by_search_query(search_dto), search_dto)
+        return FlightRepository.get_indexed_by_guids([record.guid for record in records])
+
+    @staticmethod
+    def get_flight_page_by_search_query(search_dto: FlightSearchDTO) -> Tuple[List[FlightEntity], Optional[str]]:
+        """Retrieve one keyset-paginated page of matching flights and the cursor for the next page."""
+        records, next_cursor = search_filters.paginate(FlightService.get_flight_records_by_search_query(search_dto), search_dto)
+        return FlightRepository.get_indexed_by_guids([record.guid for record in records]), next_cursor
+
+    @staticmethod
+    def get_flight_records_by_search_query(search_dto: FlightSearchDTO) -> List[FlightRecord]:
+        """Retrieve the compact records of every flight matching the search airports."""
+        # Full routes are answered from the route index, partial searches still scan the table
+        if search_dto.departure_airport_id and search_dto.arival_airport_id:
+            return FlightRepository.find_records_by_route(search_dto.departure_airport_id, search_dto.arival_airport_id)
+        flights = FlightRepository.find_by_departure_and_arrival(
             departure_airport_id=search_dto.departure_airport_id,
-            arrival_airport_id=search_dto.arival_airport_id
+            arrival_airport_id=search_dto.arival_airport_id,
+            departure_windows=search_filters.departure_windows(search_dto),
+            arrival_windows=search_filters.arrival_windows(search_dto)
         )
+        return [FlightRepository.to_record(flight) for flight in flights]
+
+    @staticmethod
+    def get_connecting_itineraries(search_dto: FlightSearchDTO) -> List[ItineraryDTO]:
+        """Build direct and connecting itineraries between two airports, ranked by total travel time."""
+        search = ConnectionSearch(
+            FlightRepository.get_route_index(),
+            default_min_connect=current_app.config["MIN_CONNECT_MINUTES"],
+            min_connect_by_airport=current_app.config["AIRPORT_MIN_CONNECT_MINUTES"],
+            max_connect=current_app.config["MAX_CONNECT_MINUTES"]
+        )
+        itineraries = search.search(
+            search_dto.departure_airport_id,
+            search_dto.arival_airport_id,
+            max_stops=search_dto.max_stops,
+            max_results=search_dto.max_results
+        )
+
+        guids = list({leg.guid for itinerary in itineraries for leg in itinerary.legs})
+        flights = {flight.guid: flight for flight in FlightRepository.get_by_guids(guids)}
+
+        return [
+            ItineraryDTO(
+                legs=[flights[leg.guid].to_dto() for leg in itinerary.legs],
+                wait_minutes=list(itinerary.waits),
+                total_minutes=itinerary.total_minutes,
+                total_price=itinerary.total_price
+            )
+            for itinerary in itineraries
+            if all(leg.guid in flights for leg in itinerary.legs)
+        ]
 
     @staticmethod
     def delete_flight(guid: str) -> bool:
@@ -71,34 +201,119 @@ class FlightService:
         else:
             raise ValueError("Seat configuration not found for this ID.")
         
+    @staticmethod
+    def get_seat_map(seat_config: FlightSeatsEntity, hold_token: Optional[str] = None) -> Dict:
+        """Response dict of a seat configuration, with seats held by other checkouts shown as taken."""
+        seat_map = seat_config.to_dto().to_dict()
+        held = FlightRepository.get_seat_holds().held_seats(seat_config.flight_id, exclude_tokens=[hold_token])
+        for seat in seat_map["seat_configuration"]:
+            if seat["available"] and seat["seat_id"] in held:
+                seat["available"] = False
+                seat_map["seats_available"] -= 1
+        return seat_map
+
+    @staticmethod
+    def get_seat_availability(flight_id: str) -> Dict:
+        """Free seats on a flight, in total and by cabin and position."""
+        summary = FlightRepository.get_availability([flight_id]).get(flight_id)
+        if summary is None:
+            raise ValueError("Seat configuration not found for this flight.")
+        return summary
+
+    @staticmethod
+    def get_seat_availabilities(flight_ids: List[str], group_size: Optional[int] = None) -> Dict[str, Dict]:
+        """Availability summaries by flight GUID; flights without a seat map are left out.
+
+        With `group_size`, each cabin also says whether that many passengers can still sit together.
+        """
+        return FlightRepository.get_availability(flight_ids, group_size)
+
+    @staticmethod
+    def suggest_seats(flight_id: str, count: int, cabin: Optional[str] = None) -> Optional[Dict]:
+        """The best blocks of `count` adjacent free seats on a flight, or None if the flight has no seat map.
+
+        Blocks on one side of an aisle come before blocks split by one, and front rows before back
+        rows. Seats held by other checkouts are not suggested. Raises ValueError for a count no row
+        can seat or a cabin the flight does not have.
+        """
+        states = list(FlightRepository.get_seat_states([flight_id]))
+        if not states:
+            return None
+        _, layout, booked, held, _ = states[0]
+
+        if cabin is not None and not layout.cabin_mask(cabin):
+            raise ValueError(f"This flight has no {cabin} cabin.")
+        widest_row = max((width for _, width in layout.rows), default=0)
+        if not 1 <= count <= widest_row:
+            raise ValueError(f"count must be between 1 and {widest_row}.")
+
+        suggestions = layout.suggest_blocks(booked | held, count, cabin, current_app.config["SEAT_SUGGESTION_LIMIT"])
+        return {
+            "flight_id": flight_id,
+            "cabin": cabin,
+            "count": count,
+            "suggestions": [{"seat_ids": seat_ids} for seat_ids in suggestions],
+        }
+
+    @staticmethod
+    def hold_seats(flight_id: str, seat_ids: List[int], token: Optional[str] = None) -> Optional[Dict]:
+        """Hold seats on a flight for `SEAT_HOLD_MINUTES` and return the hold, or None if the flight has no seat map.
+
+        Passing the token of an existing hold on the flight replaces its seats and restarts its clock.
+        Raises ValueError for seats the flight does not have, and SeatUnavailableError for seats that
+        are booked or held by another checkout.
+        """
+        seat_config = FlightRepository.get_seat_configuration_by_flight_id(flight_id)
+        if seat_config is None:
+            return None
+        unknown = [seat_id for seat_id in seat_ids if not seat_config.layout.has_seat(seat_id)]
+        if unknown:
+            raise ValueError(f"Seats {', '.join(map(str, unknown))} do not exist on this flight.")
+        booked = [seat_id for seat_id in seat_ids if not seat_config.is_available(seat_id)]
+        if booked:
+            raise SeatUnavailableError(f"Seats {', '.join(map(str, booked))} are already booked.")
+
+        holds = FlightRepository.get_seat_holds()
+        hold = holds.hold(flight_id, seat_ids, current_app.config["SEAT_HOLD_MINUTES"] * 60, token)
+        return hold.to_dict(holds.now())
+
+    @staticmethod
+    def subscribe_seat_changes(flight_id: str) -> Optional[SeatSubscription]:
+        """Follow the seat changes of a flight, or None if the flight has no seat map."""
+        if FlightRepository.get_seat_configuration_by_flight_id(flight_id) is None:
+            return None
+        # Holds only expire when touched, so idle streams check them to report the seats they free
+        return get_seat_events().subscribe(flight_id, on_idle=FlightRepository.get_seat_holds().expire)
+
+    @staticmethod
+    def release_seat_hold(token: str) -> bool:
+        """Release a checkout's seat hold before it expires."""
+        return FlightRepository.get_seat_holds().release(token)
+
     @staticmethod
     def get_random_flight(search_dto: FlightSearchDTO) -> FlightEntity:
         # Attempt to find a matching flight
-        flights = FlightRepository.find_by_departure_and_arrival(
-            departure_airport_id=search_dto.departure_airport_id,
-            arrival_airport_id=search_dto.arival_airport_id
-        )
+        flights = FlightService.get_flights_by_search_query(search_dto)
         if flights:
             return flights[0]  # Return the first matching flight if found
 
         # Try finding a reverse route if no direct match exists
-        reverse_flights = FlightRepository.find_by_departure_and_arrival(
-            departure_airport_id=search_dto.arival_airport_id,
-            arrival_airport_id=search_dto.departure_airport_id
+        reverse_flights = FlightService.get_flights_by_search_query(
+            FlightSearchDTO(departure_airport_id=search_dto.arival_airport_id, arival_airport_id=search_dto.departure_airport_id)
         )
 
         if reverse_flights:
             reverse_flight = reverse_flights[0]
             
-            # Parse, adjust, and format departure and arrival times
-            departure_time = datetime.strptime(reverse_flight.departure_time, "%I:%M%p")
-            adjusted_departure_time = departure_time + timedelta(hours=random.choice([-3, 3]))
-            formatted_departure_time = adjusted_departure_time.strftime("%I:%M%p")
-
-            arrival_time = datetime.strptime(reverse_flight.arrival_time, "%I:%M%p")
-            travel_duration = arrival_time - departure_time
-            adjusted_arrival_time = adjusted_departure_time + travel_duration
-            formatted_arrival_time = adjusted_arrival_time.strftime("%I:%M%p")
+            # Shift the stored minute-of-day times and format them back for display
+            shift = random.choice([-3, 3]) * 60
+            if reverse_flight.departure_minute is not None and reverse_flight.arrival_minute is not None:
+                formatted_departure_time = format_time_of_day(reverse_flight.departure_minute + shift)
+                formatted_arrival_time = format_time_of_day(reverse_flight.arrival_minute + shift)
+            else:
+                # Times the minute columns could not be parsed from are kept as stored
+                formatted_departure_time = reverse_flight.departure_time
+                formatted_arrival_time = reverse_flight.arrival_time
             
             # Adjust the reverse flight’s attributes to create a new flight
             new_flight_dto = FlightDTO(
@@ -117,11 +332,10 @@ class FlightService:
                 layover=reverse_flight.layover.to_dto() if reverse_flight.layover else None
             )
 
-            # Save and return the new flight
-            FlightRepository.add(new_flight_dto)
-            
-            # Generate random seat configuration
-            FlightService.create_random_seat_configuration(flight_id=new_flight_dto.guid)
+            # Save the new flight and its random seat configuration together
+            with unit_of_work():
+                FlightRepository.add(new_flight_dto)
+                FlightService.create_random_seat_configuration(flight_id=new_flight_dto.guid)
             
             return FlightRepository.get_by_guid(new_flight_dto.guid)
 
@@ -2,13 +2,15 @@ from typing import List, Optional
 from app.repositories.pop_destination_repository import PopularDestinationRepository
 from app.models.dto.pop_destination_dto import PopularDestinationDTO
 from app.models.entities.pop_destination_entity import PopularDestinationEntity
+from app.unit_of_work import unit_of_work
 import random 
 
 class PopularDestinationService:
     @staticmethod
     def add_destination(pop_destination_dto: PopularDestinationDTO) -> None:
         """Add a popular destination to the database."""
-        PopularDestinationRepository.add(pop_destination_dto)
+        with unit_of_work():
+            PopularDestinationRepository.add(pop_destination_dto)
 
     @staticmethod
     def get_all_destinations() -> List[PopularDestinationEntity]:
@@ -0,0 +1,125 @@
+import base64
+import binascii
+import json
+from bisect import bisect_right
+from typing import Iterable, List, Optional, Tuple, Union
+from app.models.dto.flight_search_dto import FlightSearchDTO
+from app.repositories.route_index import FlightRecord
+
+DEFAULT_PAGE_SIZE = 20
+DEFAULT_SORT = "price"
+
+# Inclusive minute windows matching getTimeCategory in the frontend:
+# Morning is AM, Afternoon 12:00PM-4:59PM, Evening 5:00PM onwards
+TIME_OF_DAY_RANGES = {
+    "Morning": (0, 12 * 60 - 1),
+    "Afternoon": (12 * 60, 17 * 60 - 1),
+    "Evening": (17 * 60, 24 * 60 - 1),
+}
+
+SortKey = Tuple[Union[int, float], str]
+MinuteWindow = Tuple[int, int]
+
+def in_window(minute: Optional[int], window: MinuteWindow) -> bool:
+    """Check an inclusive minute window, which wraps past midnight when start is after end."""
+    if minute is None:
+        return False
+    start, end = window
+    if start <= end:
+        return start <= minute <= end
+    return minute >= start or minute <= end
+
+def departure_windows(search_dto: FlightSearchDTO) -> List[MinuteWindow]:
+    """All departure minute windows a flight has to fall in for the search."""
+    windows = []
+    if search_dto.departure_time_of_day:
+        windows.append(TIME_OF_DAY_RANGES[search_dto.departure_time_of_day])
+    if search_dto.departure_after is not None or search_dto.departure_before is not None:
+        start = search_dto.departure_after if search_dto.departure_after is not None else 0
+        end = search_dto.departure_before if search_dto.departure_before is not None else 24 * 60 - 1
+        windows.append((start, end))
+    return windows
+
+def arrival_windows(search_dto: FlightSearchDTO) -> List[MinuteWindow]:
+    """All arrival minute windows a flight has to fall in for the search."""
+    if search_dto.arrival_time_of_day:
+        return [TIME_OF_DAY_RANGES[search_dto.arrival_time_of_day]]
+    return []
+
+def matches(record: FlightRecord, search_dto: FlightSearchDTO) -> bool:
+    """Check a flight record against the optional filters of a search."""
+    if search_dto.max_price is not None and record.price_economy > search_dto.max_price:
+        return False
+    if search_dto.stops is not None and (record.num_stops or 0) != search_dto.stops:
+        return False
+    if not all(in_window(record.departure_minute, window) for window in departure_windows(search_dto)):
+        return False
+    if not all(in_window(record.arrival_minute, window) for window in arrival_windows(search_dto)):
+        return False
+    if search_dto.airline_id and record.airline_id != search_dto.airline_id:
+        return False
+    return True
+
+def sort_key(record: FlightRecord, sort_by: str) -> SortKey:
+    """Total ordering used for sorting and keyset pagination; the GUID breaks ties."""
+    if sort_by == "duration":
+        value = record.flight_time_minutes
+    elif sort_by == "departure_time":
+        value = record.departure_minute if record.departure_minute is not None else 24 * 60
+    else:
+        value = record.price_economy
+    return (value, record.guid)
+
+def encode_cursor(sort_by: str, key: SortKey) -> str:
+    payload = json.dumps([sort_by, key[0], key[1]], separators=(",", ":"))
+    return base64.urlsafe_b64encode(payload.encode()).decode()
+
+def decode_cursor(cursor: str, sort_by: str) -> SortKey:
+    if not isinstance(cursor, str):
+        raise ValueError("Invalid cursor.")
+    try:
+        cursor_sort, value, guid = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except (binascii.Error, ValueError, TypeError):
+        raise ValueError("Invalid cursor.")
+    # Every sort value is a number (see sort_key), so anything else could not be compared with the keys
+    if isinstance(value, bool) or not isinstance(value, (int, float)) or not isinstance(guid, str):
+        raise ValueError("Invalid cursor.")
+    if cursor_sort != sort_by:
+        raise ValueError("Cursor does not match the requested sort order.")
+    return (value, guid)
+
+def cache_key(search_dto: FlightSearchDTO) -> Tuple:
+    """Normalized key of a search: only the fields that change its response, with paging defaults filled in."""
+    data = search_dto.to_dict()
+    # Stop and result limits only apply to connection searches
+    del data["max_stops"], data["max_results"]
+    data["departure_airport_id"] = data["departure_airport_id"] or None
+    data["arival_airport_id"] = data["arival_airport_id"] or None
+    if search_dto.is_paginated:
+        data["sort_by"] = data["sort_by"] or DEFAULT_SORT
+        data["page_size"] = data["page_size"] or DEFAULT_PAGE_SIZE
+    return tuple(sorted(data.items()))
+
+def filter_and_sort(records: Iterable[FlightRecord], search_dto: FlightSearchDTO) -> List[FlightRecord]:
+    """Apply the search filters, then sort if a sort key was requested."""
+    filtered = [record for record in records if matches(record, search_dto)]
+    if search_dto.sort_by:
+        filtered.sort(key=lambda record: sort_key(record, search_dto.sort_by))
+    return filtered
+
+def paginate(records: Iterable[FlightRecord], search_dto: FlightSearchDTO) -> Tuple[List[FlightRecord], Optional[str]]:
+    """Return the page of matching records after the search cursor and the cursor for the next page."""
+    sort_by = search_dto.sort_by or DEFAULT_SORT
+    page_size = search_dto.page_size or DEFAULT_PAGE_SIZE
+
+    keyed = sorted(
+        ((sort_key(record, sort_by), record) for record in records if matches(record, search_dto)),
+        key=lambda item: item[0]
+    )
+    keys = [key for key, _ in keyed]
+    start = bisect_right(keys, decode_cursor(search_dto.cursor, sort_by)) if search_dto.cursor else 0
+
+    page = keyed[start:start + page_size]
+    has_more = start + page_size < len(keyed)
+    next_cursor = encode_cursor(sort_by, page[-1][0]) if page and has_more else None
+    return [record for _, record in page], next_cursor
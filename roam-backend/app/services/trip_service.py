@@ -1,39 +1,58 @@
-from typing import List, Optional
+from typing import Dict, Iterable, List, Optional, Union
 from app.models.dto.trip_dto import TripDTO
 from app.repositories.trip_repository import TripRepository
 from app.models.entities.trip_entity import TripEntity
 from app.models.entities.passenger_entity import PassengerEntity
-from app.services.flight_service import FlightService
+from app import serializers
 
 class TripService:
     @staticmethod
-    def create_trip(trip_dto: TripDTO) -> TripEntity:
-        """Create a new trip and add it to the database."""
-        TripRepository.add(trip_dto)
-        
-        # Reserve Seats
-        for passenger in trip_dto.passengers:
-            if trip_dto.departing_flight:
-                departing_seats = FlightService.get_flight_seats_by_flight_id(trip_dto.departing_flight.guid)
-                if not departing_seats:
-                    departing_seats = FlightService.create_random_seat_configuration(trip_dto.departing_flight.guid)
-                    
-                FlightService.mark_seat_as_booked(departing_seats.guid, passenger.departing_seat_id)
-            
-            if trip_dto.returning_flight:
-                returning_seats = FlightService.get_flight_seats_by_flight_id(trip_dto.returning_flight.guid)
-                if not returning_seats:
-                    returning_seats = FlightService.create_random_seat_configuration(trip_dto.returning_flight.guid)
-                    
-                FlightService.mark_seat_as_booked(returning_seats.guid, passenger.returning_seat_id)   
-        
+    def create_trip(trip_dto: TripDTO, hold_tokens: Iterable[str] = ()) -> TripEntity:
+        """Create a new trip and book its passengers' seats in one transaction.
+
+        `hold_tokens` are the checkout's seat holds; their seats are booked and the holds released.
+        Raises SeatUnavailableError, storing nothing, if any requested seat is already taken.
+        """
+        TripRepository.add_with_seats(trip_dto, TripService.requested_seats(trip_dto), hold_tokens)
         return TripRepository.get_by_guid(trip_dto.guid)
 
+    @staticmethod
+    def requested_seats(trip_dto: TripDTO) -> Dict[str, List[int]]:
+        """The seat ids the trip's passengers need, by flight GUID."""
+        seat_ids_by_flight: Dict[str, List[int]] = {}
+        for passenger in trip_dto.passengers:
+            for flight, seat_id in ((trip_dto.departing_flight, passenger.departing_seat_id),
+                                    (trip_dto.returning_flight, passenger.returning_seat_id)):
+                if not flight:
+                    continue
+                if seat_id is None:
+                    raise ValueError(f"Passenger {passenger.name} has no seat on flight {flight.guid}.")
+                seat_ids_by_flight.setdefault(flight.guid, []).append(seat_id)
+        return seat_ids_by_flight
+
     @staticmethod
     def get_all_trips() -> List[TripEntity]:
         """Retrieve all trips from the database."""
         return TripRepository.get_all()
 
+    @staticmethod
+    def get_serialized_trips(shape: Optional[str] = None, **filters) -> Union[List[Dict], Dict]:
+        """Response body for the trips matching column filters such as `is_round_trip`.
+
+        `shape` is "nested" (the default, a list of trips) or "normalized", see `serializers.SHAPES`.
+        """
+        shape = serializers.check_shape(shape)
+        trips = TripRepository.find_serialized(**filters)
+        return serializers.normalize_trips(trips) if shape == serializers.NORMALIZED else trips
+
+    @staticmethod
+    def get_serialized_trip_by_id(guid: str) -> Dict:
+        """Response dict of a trip by its GUID."""
+        trips = TripRepository.find_serialized(guid=guid)
+        if not trips:
+            raise ValueError("Trip not found.")
+        return trips[0]
+
     @staticmethod
     def get_trip_by_id(guid: str) -> Optional[TripEntity]:
         """Retrieve a trip by its GUID."""
@@ -7,13 +7,15 @@ import uuid
 from datetime import datetime, timedelta, timezone
 from flask import current_app
 from app.models.dto.login_response_dto import LoginResponseDTO
+from app.unit_of_work import unit_of_work
 
 class UserService:
     @staticmethod
     def create_user(user_dto: UserDTO) -> None:
-        if UserRepository.find_by_email(user_dto.email):
-            raise ValueError("Email already exists.")
-        UserRepository.add(user_dto)
+        with unit_of_work():
+            if UserRepository.find_by_email(user_dto.email):
+                raise ValueError("Email already exists.")
+            UserRepository.add(user_dto)
 
     @staticmethod
     def update_user(user_dto: UserDTO) -> None:
@@ -0,0 +1,60 @@
+"""Transactions owned by the service layer.
+
+A service method wraps its writes in `with unit_of_work():`. Everything the block adds, changes
+or deletes is committed once when it exits, or rolled back if it raises, so a failed request
+never leaves half an object graph behind. Entity factories and repository writes only add and
+flush. Repository writes also open a unit of work of their own, which joins the caller's when
+there is one, so they still commit when called on their own from scripts and tests.
+
+Work that must only happen once the data is durable, such as updating the route index, dropping
+cached responses or releasing seat holds, is registered with `after_commit`. It runs after the
+outermost commit and is dropped on rollback.
+"""
+from contextlib import contextmanager
+from typing import Callable, Iterator, List
+from sqlalchemy.orm import Session
+from app import db
+
+class _State:
+    def __init__(self) -> None:
+        self.depth = 0
+        self.callbacks: List[Callable[[], None]] = []
+
+def _state() -> _State:
+    return db.session.info.setdefault("unit_of_work", _State())
+
+def in_unit_of_work() -> bool:
+    return _state().depth > 0
+
+@contextmanager
+def unit_of_work() -> Iterator[Session]:
+    """Commit everything written in the block once, or roll all of it back if the block raises.
+
+    Nested blocks join the outermost one, which alone commits.
+    """
+    state = _state()
+    state.depth += 1
+    try:
+        yield db.session
+        if state.depth == 1:
+            db.session.commit()
+    except BaseException:
+        if state.depth == 1:
+            db.session.rollback()
+            state.callbacks.clear()
+        raise
+    finally:
+        state.depth -= 1
+
+    if state.depth == 0:
+        callbacks, state.callbacks = state.callbacks, []
+        for callback in callbacks:
+            callback()
+
+def after_commit(callback: Callable[[], None]) -> None:
+    """Run `callback` once the current unit of work commits, or right away outside of one."""
+    state = _state()
+    if state.depth == 0:
+        callback()
+    else:
+        state.callbacks.append(callback)
@@ -19,4 +19,29 @@ def parse_date(date_str: str) -> Optional[date]:
         return datetime.fromisoformat(clean_date_str).date()
     except ValueError:
         # Handle cases where date might not be in a recognized format
-        return None
\ No newline at end of file
+        return None
+
+def parse_time_of_day(time_str: str) -> Optional[int]:
+    """Convert a display time such as '10:30AM' into minutes after midnight."""
+    if not time_str:
+        return None
+    try:
+        parsed = datetime.strptime(time_str.strip(), "%I:%M%p")
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
+
+def format_time_of_day(minute: int) -> str:
+    """Convert minutes after midnight into the display format used for flight times, e.g. '01:30PM'."""
+    minute %= 24 * 60
+    return datetime(2000, 1, 1, minute // 60, minute % 60).strftime("%I:%M%p")
+
+def parse_clock_time(time_str: str) -> Optional[int]:
+    """Convert a 24-hour 'HH:MM' time into minutes after midnight."""
+    if not time_str:
+        return None
+    try:
+        parsed = datetime.strptime(time_str.strip(), "%H:%M")
+    except ValueError:
+        return None
+    return parsed.hour * 60 + parsed.minute
@@ -0,0 +1,86 @@
+# Benchmark for the connection search engine.
+#
+# Builds a synthetic hub-and-spoke network directly in a RouteIndex (no database)
+# and times connection queries between random airport pairs.
+#
+# Usage:
+#   python benchmarks/bench_connections.py [--airports 400] [--flights 40000] [--queries 200]
+#
+
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app.repositories.route_index import RouteIndex, FlightRecord
+from app.services.connection_search import ConnectionSearch
+
+
+def build_network(num_airports: int, num_flights: int, seed: int) -> RouteIndex:
+    rng = random.Random(seed)
+    airports = [f"AP{i:04d}" for i in range(num_airports)]
+    hubs = airports[: max(1, num_airports // 20)]
+
+    records = []
+    for i in range(num_flights):
+        # Most traffic touches a hub, like a real airline network
+        if rng.random() < 0.8:
+            hub, spoke = rng.choice(hubs), rng.choice(airports)
+            departure, arrival = (hub, spoke) if rng.random() < 0.5 else (spoke, hub)
+        else:
+            departure, arrival = rng.sample(airports, 2)
+        if departure == arrival:
+            continue
+        records.append(FlightRecord(
+            guid=f"F{i}",
+            departure_airport_id=departure,
+            arrival_airport_id=arrival,
+            airline_id="AL",
+            departure_minute=rng.randrange(0, 24 * 60, 5),
+            arrival_minute=None,
+            flight_time_minutes=rng.randint(45, 720),
+            num_stops=0,
+            price_economy=float(rng.randint(80, 1500)),
+            price_business=None,
+        ))
+
+    index = RouteIndex()
+    index.build(records)
+    return index
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--airports", type=int, default=400)
+    parser.add_argument("--flights", type=int, default=40000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    index = build_network(args.airports, args.flights, args.seed)
+    search = ConnectionSearch(index, default_min_connect=60)
+    rng = random.Random(args.seed + 1)
+    airports = [f"AP{i:04d}" for i in range(args.airports)]
+
+    # Warm the departure boards so the timings reflect steady state
+    for airport in airports:
+        index.departures(airport)
+
+    timings = []
+    found = 0
+    for _ in range(args.queries):
+        origin, destination = rng.sample(airports, 2)
+        start = time.perf_counter()
+        found += len(search.search(origin, destination, max_stops=2, max_results=10))
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings.sort()
+    print(f"routes={len(index)} airports={args.airports} queries={args.queries} itineraries={found}")
+    print(f"p50={timings[len(timings) // 2]:.2f}ms p95={timings[int(len(timings) * 0.95)]:.2f}ms max={timings[-1]:.2f}ms")
+
+
+if __name__ == "__main__":
+    main()
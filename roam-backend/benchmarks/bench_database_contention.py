@@ -0,0 +1,153 @@
+# Benchmark for reads competing with booking writes, compared across database profiles.
+#
+# For each config profile, seeds a scratch database with flights whose seats are all free, then
+# runs reader threads polling seat availability (POST /api/flights/availability) while writer
+# threads book one seat per trip (POST /api/trips). Reports throughput and latency percentiles
+# for both, and requests that failed (for example with "database is locked").
+#
+# SQLite profiles get a fresh file in the temp directory. The postgres profile uses
+# ROAM_DATABASE_URI, whose tables are dropped and recreated, so point it at a scratch database.
+#
+# Usage:
+#   python benchmarks/bench_database_contention.py [--profiles default production postgres]
+#                                                  [--readers 8] [--writers 4] [--seconds 10] [--flights 50]
+#
+
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+import uuid
+
+from sqlalchemy import text
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app, db
+from app.models.entities.airline_entity import AirlineEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.continent_entity import ContinentEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.flight_entity import FlightEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.location_entity import LocationEntity
+
+
+def fresh_database(profile: str) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"roam-contention-{profile}.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return path
+
+
+def populate(num_flights: int) -> list:
+    continent = ContinentEntity(guid="CT", code="NA", name="North America")
+    country = CountryEntity(guid="CO", code="US", name="United States", continent=continent)
+    airport = AirportEntity(guid="AP", full_name="Airport", short_name="Airport", municipality_name="City",
+                            iata_code="APT", country=country, location=LocationEntity(guid="L", latitude=0.0, longitude=0.0))
+    airline = AirlineEntity(guid="AL", icao_code="ALX", name="Airline", logo_path=None)
+    flights = []
+    for i in range(num_flights):
+        flight = FlightEntity(guid=f"F{i}", flight_time_minutes=60, departure_time="8:00AM", arrival_time="9:00AM",
+                              num_stops=0, price_economy=100.0, price_business=300.0, baggage_allowance="1 checked bag",
+                              airline=airline, departure_airport=airport, arrival_airport=airport)
+        flight.seat_configuration = FlightSeatsEntity(guid=f"S{i}", flight_id=flight.guid)
+        flight.seat_configuration.booked_mask = 0
+        flights.append(flight)
+    db.session.add_all(flights)
+    db.session.commit()
+    return [flight.to_dto().to_dict() for flight in flights]
+
+
+def percentile(timings: list, fraction: float) -> float:
+    return sorted(timings)[min(len(timings) - 1, int(len(timings) * fraction))] * 1000 if timings else 0.0
+
+
+def run(profile: str, args) -> None:
+    app = create_app(profile)
+    if app.config["SQLALCHEMY_DATABASE_URI"].startswith("sqlite"):
+        app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{fresh_database(profile)}"
+    with app.app_context():
+        db.drop_all()
+        db.create_all()
+        flights = populate(args.flights)
+        if db.engine.dialect.name == "sqlite":
+            database = f"journal_mode={db.session.execute(text('PRAGMA journal_mode')).scalar()}"
+        else:
+            database = db.engine.dialect.name
+        db.session.remove()
+
+    client = app.test_client()
+    flight_ids = [flight["guid"] for flight in flights]
+    seats = iter(range(10 ** 9))
+    seats_lock = threading.Lock()
+    results = {"read": [], "write": []}
+    failures = {"read": 0, "write": 0}
+    stop = time.perf_counter() + args.seconds
+
+    def reader() -> None:
+        timings = []
+        while time.perf_counter() < stop:
+            started = time.perf_counter()
+            response = client.post("/api/flights/availability", json={"flight_ids": flight_ids})
+            if response.status_code == 200:
+                timings.append(time.perf_counter() - started)
+            else:
+                failures["read"] += 1
+        results["read"].extend(timings)
+
+    def writer() -> None:
+        timings = []
+        while time.perf_counter() < stop:
+            with seats_lock:
+                n = next(seats)
+            flight = flights[n % len(flights)]
+            seat_id = n // len(flights) + 1
+            if seat_id > 180:
+                break
+            started = time.perf_counter()
+            try:
+                status = client.post("/api/trips", json={
+                    "guid": str(uuid.uuid4()), "name": "Contention", "is_round_trip": False,
+                    "departure_date": "2024-11-20", "departing_flight": flight,
+                    "passengers": [{"guid": str(uuid.uuid4()), "name": "P", "departing_seat_id": seat_id}],
+                }).status_code
+            except Exception:  # "database is locked" surfaces as an OperationalError
+                status = 500
+            if status == 201:
+                timings.append(time.perf_counter() - started)
+            else:
+                failures["write"] += 1
+        results["write"].extend(timings)
+
+    threads = [threading.Thread(target=reader) for _ in range(args.readers)]
+    threads += [threading.Thread(target=writer) for _ in range(args.writers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    print(f"{profile} ({database}, {args.readers} readers, {args.writers} writers, {args.seconds}s)")
+    for kind in ("read", "write"):
+        timings = results[kind]
+        print(f"  {kind:>5}s: {len(timings) / args.seconds:8.1f}/s  p50 {percentile(timings, 0.5):7.2f} ms  "
+              f"p99 {percentile(timings, 0.99):8.2f} ms  max {percentile(timings, 1.0):8.2f} ms  failed {failures[kind]}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profiles", nargs="+", default=["default", "production"])
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=4)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--flights", type=int, default=50)
+    args = parser.parse_args()
+    for profile in args.profiles:
+        run(profile, args)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,113 @@
+# Benchmark for flight list serialization.
+#
+# Fills an in-memory database with synthetic flights and compares the old path
+# (eager-loaded entities -> to_dto() -> to_dict() -> jsonify) with the row
+# serializers (projected rows -> dicts -> jsonify). Reports latency and peak
+# Python allocations per 1,000 rows, and checks both paths produce the same bytes.
+#
+# Usage:
+#   python benchmarks/bench_serialization.py [--flights 5000] [--repeat 5]
+#
+
+import argparse
+import os
+import random
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from flask import jsonify
+from app import create_app, db
+from app.models.entities.airline_entity import AirlineEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.continent_entity import ContinentEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.flight_entity import FlightEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.layover_entity import LayoverEntity
+from app.models.entities.location_entity import LocationEntity
+from app.repositories.flight_repository import FlightRepository
+from app.utils import format_time_of_day
+
+
+def populate(num_flights: int, seed: int) -> None:
+    rng = random.Random(seed)
+    continent = ContinentEntity(guid="CT", code="NA", name="North America")
+    country = CountryEntity(guid="CO", code="US", name="United States", continent=continent)
+    airports = []
+    for i in range(50):
+        location = LocationEntity(guid=f"L{i}", latitude=rng.uniform(-60, 60), longitude=rng.uniform(-180, 180))
+        airports.append(AirportEntity(guid=f"AP{i}", full_name=f"Airport {i}", short_name=f"Airport {i}",
+                                      municipality_name=f"City {i}", iata_code=f"A{i:02d}", location=location, country=country))
+    airlines = [AirlineEntity(guid=f"AL{i}", icao_code=f"L{i:02d}", name=f"Airline {i}", logo_path=None) for i in range(10)]
+    db.session.add_all(airports + airlines)
+
+    for i in range(num_flights):
+        departure, arrival = rng.sample(airports, 2)
+        departure_minute = rng.randrange(0, 24 * 60, 5)
+        duration = rng.randint(45, 720)
+        flight = FlightEntity(guid=f"F{i}", flight_time_minutes=duration,
+                              departure_time=format_time_of_day(departure_minute),
+                              arrival_time=format_time_of_day(departure_minute + duration),
+                              num_stops=0, price_economy=float(rng.randint(80, 1500)), price_business=2000.0,
+                              baggage_allowance="1 checked bag", airline=rng.choice(airlines),
+                              departure_airport=departure, arrival_airport=arrival)
+        flight.seat_configuration = FlightSeatsEntity(guid=f"S{i}", flight_id=flight.guid, seat_configuration=[])
+        if rng.random() < 0.2:
+            flight.layover = LayoverEntity(guid=f"LO{i}", airport=rng.choice(airports), duration_minutes=rng.randint(30, 240))
+        db.session.add(flight)
+    db.session.commit()
+
+
+def dto_path() -> bytes:
+    flights = FlightRepository.get_all()
+    return jsonify([flight.to_dto().to_dict() for flight in flights]).get_data()
+
+
+def row_path() -> bytes:
+    return jsonify(FlightRepository.find_serialized()).get_data()
+
+
+def measure(path, repeat: int):
+    timings = []
+    for _ in range(repeat):
+        db.session.expunge_all()  # Each request starts with an empty identity map
+        start = time.perf_counter()
+        body = path()
+        timings.append(time.perf_counter() - start)
+
+    db.session.expunge_all()
+    tracemalloc.start()
+    path()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return body, statistics.median(timings), peak
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--flights", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+
+    app = create_app("testing")
+    with app.app_context(), app.test_request_context():
+        db.create_all()
+        populate(args.flights, args.seed)
+
+        per_k = 1000 / args.flights
+        results = {}
+        for name, path in (("entity+dto", dto_path), ("rows", row_path)):
+            body, latency, peak = measure(path, args.repeat)
+            results[name] = body
+            print(f"{name:>10}: {latency * 1000 * per_k:7.2f} ms/1k rows  peak alloc {peak * per_k / 1024:8.1f} KiB/1k rows")
+
+        print(f"identical output: {results['entity+dto'] == results['rows']} ({len(results['rows'])} bytes, {args.flights} flights)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+# Benchmark for trip creation latency and the number of commits it takes.
+#
+# Posts trips that each bring a new departing flight with a layover (POST /api/trips), against a
+# fresh SQLite file in the temp directory. Reports median and p95 latency, and the commits per
+# request: every commit is a durable write, so one fsync of the database (and journal or WAL) each.
+# Before the service-owned unit of work, every entity factory committed on its own; run this on
+# both sides of that change to compare, e.g. from a `git worktree` checkout of the older commit.
+#
+# Usage:
+#   python benchmarks/bench_trip_creation.py [--profile default] [--trips 200]
+#
+
+import argparse
+import os
+import statistics
+import sys
+import tempfile
+import time
+import uuid
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), ".."))
+
+from app import create_app, db
+
+
+AIRPORT = {
+    "guid": "bench_airport", "full_name": "Bench Airport", "short_name": "Bench", "municipality_name": "Bench City",
+    "iata_code": "BNC", "location": {"guid": "bench_location", "latitude": 1.0, "longitude": 1.0},
+    "country": {"guid": "bench_country", "code": "BN", "name": "Benchland",
+                "continent": {"guid": "bench_continent", "code": "BC", "name": "Benchinent"}},
+}
+AIRLINE = {"guid": "bench_airline", "icao_code": "BNA", "name": "Bench Air", "logo_path": None}
+
+
+def fresh_database(profile: str) -> str:
+    path = os.path.join(tempfile.gettempdir(), f"roam-trip-creation-{profile}.db")
+    for suffix in ("", "-wal", "-shm", "-journal"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
+    return path
+
+
+def trip_payload(i: int) -> dict:
+    flight = {
+        "guid": f"bench_flight_{i}", "flight_time_minutes": 60, "departure_time": "8:00AM", "arrival_time": "9:00AM",
+        "num_stops": 1, "price_economy": 100.0, "price_business": 300.0, "baggage_allowance": "1 checked bag",
+        "airline": AIRLINE, "departure_airport": AIRPORT, "arrival_airport": AIRPORT,
+        "layover": {"guid": f"bench_layover_{i}", "airport": AIRPORT, "duration_minutes": 30},
+    }
+    return {"guid": str(uuid.uuid4()), "name": "Bench Trip", "is_round_trip": False, "departure_date": "2024-11-20",
+            "departing_flight": flight, "passengers": []}
+
+
+def run(profile: str, num_trips: int) -> None:
+    app = create_app(profile)
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{fresh_database(profile)}"
+    with app.app_context():
+        db.create_all()
+        commits = []
+        event.listen(db.engine, "commit", lambda connection: commits.append(connection))
+
+        client = app.test_client()
+        timings, counts = [], []
+        for i in range(num_trips):
+            commits.clear()
+            started = time.perf_counter()
+            response = client.post("/api/trips", json=trip_payload(i))
+            timings.append(time.perf_counter() - started)
+            if response.status_code != 201:
+                raise SystemExit(f"POST /api/trips failed with {response.status_code}: {response.get_data(as_text=True)}")
+            counts.append(len(commits))
+        db.engine.dispose()
+
+    timings.sort()
+    print(f"{profile}: {num_trips} trips, median {statistics.median(timings) * 1000:.1f} ms, "
+          f"p95 {timings[int(len(timings) * 0.95)] * 1000:.1f} ms, "
+          f"{statistics.mean(counts):.1f} commits (fsyncs) per request")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--profile", default="default", help="Config profile; the database is always a fresh temp file.")
+    parser.add_argument("--trips", type=int, default=200)
+    args = parser.parse_args()
+    run(args.profile, args.trips)
+
+
+if __name__ == "__main__":
+    main()
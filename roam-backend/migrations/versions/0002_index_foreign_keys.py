@@ -0,0 +1,42 @@
+"""Index foreign keys
+
+Indexes the foreign keys the repositories filter and join on, and that foreign key checks look
+up when a parent row is deleted. Departure airports are already covered by the leading column of
+`ix_flights_route_departure_minute`, and `countries.code` by its unique constraint.
+
+Databases created with `db.create_all()` from these models already have the indexes, so they are
+only created where missing.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18 14:19:16.204704
+
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('ix_flights_airline_id', 'flights', ['airline_id']),
+    ('ix_flights_arrival_airport_minute', 'flights', ['arrival_airport_id', 'arrival_minute']),
+    ('ix_trips_departing_flight_id', 'trips', ['departing_flight_id']),
+    ('ix_trips_returning_flight_id', 'trips', ['returning_flight_id']),
+    ('ix_passengers_trip_id', 'passengers', ['trip_id']),
+    ('ix_airports_country_id', 'airports', ['country_id']),
+    ('ix_layovers_airport_id', 'layovers', ['airport_id']),
+]
+
+
+def upgrade():
+    for name, table, columns in INDEXES:
+        op.create_index(name, table, columns, unique=False, if_not_exists=True)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table, if_exists=True)
@@ -6,21 +6,26 @@
 #
 # Input and Output:
 # - Environment variables are used for configuring the host and port 
-#   (FLASK_RUN_HOST and FLASK_RUN_PORT).
+#   (FLASK_RUN_HOST and FLASK_RUN_PORT), and the config profile (ROAM_CONFIG,
+#   see app/config.py; "production" enables WAL and connection pooling).
 # - The script starts the Flask application server and listens for HTTP requests 
 #   on the specified host and port.
 #
 
-from app import create_app, db
+from app import create_app
+from app.repositories.flight_repository import FlightRepository
+from app.schema import upgrade_database
 import os
 
-app = create_app()
+config_name = os.getenv("ROAM_CONFIG", "default")
+app = create_app(config_name)
 
 if __name__ == '__main__':
     with app.app_context():
-        db.create_all()
+        upgrade_database()  # Create the database or apply the migrations it has not had yet
+        FlightRepository.get_route_index()  # Warm the in-memory route index
         
     host = os.getenv("FLASK_RUN_HOST", "127.0.0.1")
     port = int(os.getenv("FLASK_RUN_PORT", 5000))
     
-    app.run(host=host, port=port, debug=True)
+    app.run(host=host, port=port, debug=config_name == "default", threaded=True)
@@ -1,11 +1,32 @@
 import pytest
+from sqlalchemy import event
 from app import create_app, db
 
 @pytest.fixture(scope='session')
 def client():
     app = create_app('testing') 
     with app.app_context():
+        db.drop_all()  # ROAM_TEST_DATABASE_URI can point at a persistent database left over from an earlier run
         db.create_all() # db schema 
         with app.test_client() as client:
             yield client
-        db.drop_all()
\ No newline at end of file
+        db.drop_all()
+
+@pytest.fixture
+def count_queries(client):
+    """Return a function that runs a callable and returns how many SQL statements it issued."""
+    def count(action):
+        statements = []
+
+        def record(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        # Start from an empty identity map so lazy loads cannot be answered from memory
+        db.session.expire_all()
+        event.listen(db.engine, "before_cursor_execute", record)
+        try:
+            action()
+        finally:
+            event.remove(db.engine, "before_cursor_execute", record)
+        return len(statements)
+    return count
@@ -0,0 +1,23 @@
+"""Plain helpers shared by several test modules; fixtures live in conftest.py."""
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def denormalize_flight(flight, airports, airlines):
+    """Rebuild the nested flight shape from a normalized one, like the frontend helper does."""
+    if flight is None:
+        return None
+    nested = {key: value for key, value in flight.items() if not key.endswith("_id") or key == "seat_configuration_id"}
+    nested["airline"] = airlines.get(flight["airline_id"])
+    nested["departure_airport"] = airports.get(flight["departure_airport_id"])
+    nested["arrival_airport"] = airports.get(flight["arrival_airport_id"])
+    if flight["layover"]:
+        layover = flight["layover"]
+        nested["layover"] = {"guid": layover["guid"], "airport": airports.get(layover["airport_id"]), "duration_minutes": layover["duration_minutes"]}
+    return nested
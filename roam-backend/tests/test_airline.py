@@ -2,13 +2,14 @@ import pytest
 from app import create_app, db
 from app.models.dto.airline_dto import AirlineDTO
 from app.models.entities.airline_entity import AirlineEntity
+from app.repositories.airline_repository import AirlineRepository
 
 @pytest.fixture
 def setup_airline(client):
     """Fixture to create a test airline."""
     airline_dto = AirlineDTO(
         guid="airline123",
-        icao_code="ICAO123",
+        icao_code="IC12",
         name="Test Airline",
         logo_path=None
     )
@@ -24,7 +25,7 @@ def setup_airline(client):
 def test_create_airline(client):
     response = client.post('/api/airlines', json={
         "guid": "airline457",
-        "icao_code": "ICAO457",
+        "icao_code": "IC45",
         "name": "New Airline",
         "logo_path": "None"
     })
@@ -53,4 +54,13 @@ def test_delete_airline(client, setup_airline):
 
     assert response.status_code == 200
     data = response.get_json()
-    assert data == {"message": "Airline deleted successfully"}
\ No newline at end of file
+    assert data == {"message": "Airline deleted successfully"}
+
+def test_airline_fragments_are_invalidated(client, setup_airline):
+    cache = client.application.extensions['fragment_cache']
+    assert AirlineRepository.get_fragments([setup_airline.guid])[setup_airline.guid]["name"] == "Test Airline"
+    assert ("airline", setup_airline.guid) in cache
+
+    assert client.delete(f'/api/airlines/{setup_airline.guid}').status_code == 200
+    assert ("airline", setup_airline.guid) not in cache
+    assert AirlineRepository.get_fragments([setup_airline.guid]) == {}
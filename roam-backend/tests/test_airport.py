@@ -25,7 +25,7 @@ def setup_continent_country():
     # Check if country exists, create if not
     country = CountryEntity.query.filter_by(guid="country123").first()
     if not country:
-        country = CountryEntity(guid="country123", code="USA", name="United States", continent=continent)
+        country = CountryEntity(guid="country123", code="US", name="United States", continent=continent)
         db.session.add(country)
 
     db.session.commit()
@@ -90,7 +90,7 @@ def test_create_airport(client, setup_continent_country):
         },
         "country": {
             "guid": "country123",
-            "code": "USA",
+            "code": "US",
             "name": "United States"
         }
     })
@@ -100,6 +100,22 @@ def test_create_airport(client, setup_continent_country):
     assert data == {"message": "1 airport(s) created successfully"}, f"Unexpected response data: {data}"
 
 
+def test_create_duplicate_airport(client, setup_airport):
+    """Test that an airport reusing an existing IATA code is rejected with 409 and nothing of it is stored."""
+    response = client.post('/api/airports', json={
+        "guid": "duplicate_airport",
+        "full_name": "Duplicate Airport Full Name",
+        "short_name": "Duplicate Airport",
+        "municipality_name": "Duplicate City",
+        "iata_code": setup_airport.iata_code,
+        "location": {"guid": "duplicate_location", "latitude": 3.5, "longitude": 4.5},
+        "country": {"guid": "country123", "code": "US", "name": "United States"}
+    })
+
+    assert response.status_code == 409
+    assert AirportEntity.query.filter_by(guid="duplicate_airport").first() is None
+    assert LocationEntity.query.filter_by(guid="duplicate_location").first() is None
+
 def test_get_all_airports(client, setup_airport):
     """Test retrieving all airports."""
     response = client.get('/api/airports')
@@ -117,3 +133,53 @@ def test_get_airport_by_guid(client, setup_airport):
     data = response.get_json()
     assert data['guid'] == setup_airport.guid, "Returned airport GUID should match the setup airport"
 
+
+def test_airport_fragments_are_cached_and_invalidated(client, setup_continent_country):
+    """Test that serialized airports are served from the fragment cache until the airport is deleted."""
+    response = client.post('/api/airports', json={
+        "guid": "fragment_airport",
+        "full_name": "Fragment Airport Full Name",
+        "short_name": "Fragment Airport",
+        "municipality_name": "Fragment City",
+        "iata_code": "FRG",
+        "location": {"guid": "fragment_location", "latitude": 1.5, "longitude": 2.5},
+        "country": {"guid": "country123", "code": "US", "name": "United States"}
+    })
+    assert response.status_code == 201
+    cache = client.application.extensions['fragment_cache']
+
+    first = client.get('/api/airports/fragment_airport')
+    assert first.status_code == 200
+    assert ("airport", "fragment_airport") in cache
+    hits = cache.stats()["hits"]
+    assert client.get('/api/airports/fragment_airport').get_data() == first.get_data()
+    assert cache.stats()["hits"] == hits + 1
+
+    assert client.delete('/api/airports/fragment_airport').status_code == 200
+    assert ("airport", "fragment_airport") not in cache
+    assert client.get('/api/airports/fragment_airport').status_code == 404
+    assert client.delete('/api/airports/fragment_airport').status_code == 404
+
+
+def test_get_all_airports_conditional_get(client, setup_airport, count_queries):
+    """Test that /api/airports answers a matching If-None-Match with 304 until an airport is written."""
+    first = client.get('/api/airports')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert not etag.startswith('W/')
+    assert first.headers['Cache-Control'] == client.application.config['CACHE_CONTROL']['airport']
+
+    responses = []
+    assert count_queries(lambda: responses.append(client.get('/api/airports', headers={'If-None-Match': etag}))) == 0
+    cached = responses[0]
+    assert cached.status_code == 304
+    assert cached.get_data() == b""
+    assert cached.headers['ETag'] == etag
+
+    setup_airport.short_name = "Renamed Test Airport"
+    db.session.commit()
+
+    changed = client.get('/api/airports', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert any(airport['short_name'] == "Renamed Test Airport" for airport in changed.get_json())
@@ -0,0 +1,62 @@
+from app.cache import LRUCache, route_tag, route_tags_for_flight
+from tests.helpers import FakeClock
+
+
+def test_lru_eviction_and_stats():
+    cache = LRUCache(max_entries=2, ttl_seconds=None)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    assert cache.get("a") == 1  # "a" becomes the most recently used
+    cache.set("c", 3)
+
+    assert "b" not in cache, "Least recently used entry should be evicted"
+    assert cache.get("b") is None
+    stats = cache.stats()
+    assert (stats["size"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 1, 1, 1)
+
+def test_ttl_expiry():
+    clock = FakeClock()
+    cache = LRUCache(ttl_seconds=10, clock=clock)
+    cache.set("key", "value")
+    clock.now = 9.9
+    assert cache.get("key") == "value"
+    clock.now = 10.0
+    assert cache.get("key") is None
+    assert cache.stats()["expirations"] == 1
+
+def test_tag_invalidation_is_precise():
+    cache = LRUCache()
+    cache.set("full_route", 1, tags=[route_tag("A", "B")])
+    cache.set("from_a", 2, tags=[route_tag("A", None)])
+    cache.set("other_route", 3, tags=[route_tag("C", "D")])
+
+    assert cache.invalidate_tags(route_tags_for_flight("A", "B")) == 2
+    assert "other_route" in cache
+    assert "full_route" not in cache and "from_a" not in cache
+
+def test_get_or_set_skips_values_invalidated_while_computing():
+    cache = LRUCache()
+
+    def compute():
+        cache.invalidate_tags([route_tag("A", "B")])  # A write lands while the miss is being computed
+        return "stale"
+
+    assert cache.get_or_set("key", compute, tags=[route_tag("A", "B")]) == "stale"
+    assert "key" not in cache
+    assert cache.get_or_set("key", lambda: "fresh") == "fresh"
+    assert cache.get_or_set("key", lambda: "unused") == "fresh"
+
+def test_get_many_loads_misses_in_one_call():
+    cache = LRUCache()
+    cache.set("a", 1)
+    calls = []
+
+    def load(keys):
+        calls.append(sorted(keys))
+        return {key: key.upper() for key in keys if key != "missing"}
+
+    assert cache.get_many(["a", "b", "missing"], load) == {"a": 1, "b": "B"}
+    assert calls == [["b", "missing"]]
+    assert "b" in cache and "missing" not in cache
+    assert cache.get_many(["a", "b"], load) == {"a": 1, "b": "B"}
+    assert len(calls) == 1
@@ -0,0 +1,62 @@
+import sqlite3
+import pytest
+from sqlalchemy import text
+from sqlalchemy.pool import QueuePool
+from app import create_app, db
+
+
+def test_unknown_profile_is_rejected():
+    with pytest.raises(ValueError):
+        create_app("staging")
+
+def test_production_profile_tunes_sqlite(tmp_path):
+    """Test that production connections use WAL and the configured pragmas, and readers are not blocked by a writer."""
+    path = tmp_path / "production.db"
+    app = create_app("production")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{path}"
+    with app.app_context():
+        assert isinstance(db.engine.pool, QueuePool)
+        with db.engine.connect() as connection:
+            pragma = lambda name: connection.execute(text(f"PRAGMA {name}")).scalar()
+            assert pragma("journal_mode") == "wal"
+            assert pragma("synchronous") == 1  # NORMAL
+            assert pragma("foreign_keys") == 1
+            assert pragma("busy_timeout") == 5000
+            assert pragma("cache_size") == -32 * 1024
+            connection.execute(text("CREATE TABLE seats (seat_id INTEGER)"))
+            connection.execute(text("INSERT INTO seats VALUES (1)"))
+
+        # A write transaction holding the lock does not stop another connection from reading
+        writer = sqlite3.connect(path, isolation_level=None)
+        writer.execute("BEGIN EXCLUSIVE")
+        writer.execute("INSERT INTO seats VALUES (2)")
+        try:
+            with db.engine.connect() as reader:
+                reader.execute(text("PRAGMA busy_timeout=0"))
+                assert reader.execute(text("SELECT COUNT(*) FROM seats")).scalar() == 1
+        finally:
+            writer.execute("ROLLBACK")
+            writer.close()
+        db.engine.dispose()
+
+def test_postgres_profile_pools_and_locks_seat_maps(client):
+    """Test the PostgreSQL pool settings, and that bookings lock seat map rows in flight order."""
+    from sqlalchemy.dialects import postgresql
+    from sqlalchemy.exc import OperationalError
+    from sqlalchemy.orm.exc import StaleDataError
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.repositories.flight_repository import FlightRepository
+
+    options = create_app("postgres").config["SQLALCHEMY_ENGINE_OPTIONS"]
+    assert options["pool_pre_ping"] and options["pool_size"] > 0
+    assert "statement_timeout" in options["connect_args"]["options"]
+
+    query = FlightRepository.seat_maps_for_update(FlightSeatsEntity.flight_id.in_(["F2", "F1"]))
+    sql = str(query.statement.compile(dialect=postgresql.dialect()))
+    assert sql.endswith("ORDER BY flight_seats.flight_id FOR UPDATE OF flight_seats")
+
+    class LockNotAvailable(Exception):
+        pgcode = "55P03"
+    assert FlightRepository.is_retryable(StaleDataError())
+    assert FlightRepository.is_retryable(OperationalError("SELECT", {}, LockNotAvailable()))
+    assert not FlightRepository.is_retryable(OperationalError("SELECT", {}, Exception("syntax error")))
@@ -0,0 +1,68 @@
+import pytest
+from app.repositories.route_index import RouteIndex, FlightRecord
+from app.services.connection_search import ConnectionSearch
+
+
+def make_record(guid, departure, arrival, departure_minute, flight_time_minutes, price=100.0):
+    return FlightRecord(guid=guid, departure_airport_id=departure, arrival_airport_id=arrival,
+                        airline_id="airline", departure_minute=departure_minute, arrival_minute=None,
+                        flight_time_minutes=flight_time_minutes, num_stops=0,
+                        price_economy=price, price_business=None)
+
+@pytest.fixture
+def route_index():
+    """Small network with a direct flight, a one-stop via B and a two-stop via C and D."""
+    index = RouteIndex()
+    index.build([
+        make_record("direct", "A", "Z", 8 * 60, 600, price=900.0),
+        make_record("a_b", "A", "B", 8 * 60, 60),
+        make_record("b_z_tight", "B", "Z", 9 * 60 + 30, 60),  # Only 30 minutes after landing at B
+        make_record("b_z", "B", "Z", 10 * 60 + 30, 60),
+        make_record("a_c", "A", "C", 6 * 60, 60),
+        make_record("c_d", "C", "D", 8 * 60, 60),
+        make_record("d_z", "D", "Z", 10 * 60, 60),
+        make_record("z_a", "Z", "A", 12 * 60, 60),
+    ])
+    return index
+
+def test_connections_respect_minimum_connect_time(route_index):
+    search = ConnectionSearch(route_index, default_min_connect=60)
+    itineraries = search.search("A", "Z", max_stops=1)
+
+    legs = [[leg.guid for leg in itinerary.legs] for itinerary in itineraries]
+    assert legs[0] == ["a_b", "b_z"], "Fastest valid itinerary should be ranked first"
+    assert ["a_b", "b_z_tight"] not in legs, "Connections shorter than the minimum connect time are invalid"
+    assert ["direct"] in legs
+    assert itineraries[0].waits == (90,)
+    assert itineraries[0].total_minutes == 210
+
+def test_connections_per_airport_minimum_and_next_day(route_index):
+    search = ConnectionSearch(route_index, default_min_connect=60, min_connect_by_airport={"B": 30},
+                              max_connect=24 * 60)
+    itineraries = search.search("A", "Z", max_stops=1)
+    assert [leg.guid for leg in itineraries[0].legs] == ["a_b", "b_z_tight"]
+
+    # With a long minimum at B the same-day connections are missed and the next day's is used
+    search = ConnectionSearch(route_index, min_connect_by_airport={"B": 180}, max_connect=30 * 60)
+    one_stop = [it for it in search.search("A", "Z", max_stops=1) if len(it.legs) == 2]
+    assert one_stop[0].waits[0] == 9 * 60 + 30 + 24 * 60 - 9 * 60
+
+def test_two_stop_itineraries_and_ranking_by_price(route_index):
+    search = ConnectionSearch(route_index, default_min_connect=60)
+    assert all(len(it.legs) <= 2 for it in search.search("A", "Z", max_stops=1))
+
+    itineraries = search.search("A", "Z", max_stops=2, rank_by="price")
+    prices = [itinerary.total_price for itinerary in itineraries]
+    assert prices == sorted(prices)
+    assert ["a_c", "c_d", "d_z"] in [[leg.guid for leg in it.legs] for it in itineraries]
+
+def test_search_connections_endpoint(client):
+    response = client.post('/api/flights/search/connections', json={
+        "departure_airport_id": "missing-origin",
+        "arival_airport_id": "missing-destination"
+    })
+    assert response.status_code == 200
+    assert response.get_json() == []
+
+    response = client.post('/api/flights/search/connections', json={"max_stops": 5})
+    assert response.status_code == 400
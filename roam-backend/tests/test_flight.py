@@ -13,6 +13,8 @@ from app.models.entities.location_entity import LocationEntity
 from app.models.entities.continent_entity import ContinentEntity
 import warnings
 from sqlalchemy.exc import SAWarning
+from app.services.search_filters import encode_cursor
+from tests.helpers import denormalize_flight
 
 
 
@@ -26,7 +28,7 @@ def setup_continent_country():
 
     country = CountryEntity.query.filter_by(guid="country123").first()
     if not country:
-        country = CountryEntity(guid="country123", code="USA", name="United States", continent=continent)
+        country = CountryEntity(guid="country123", code="US", name="United States", continent=continent)
         db.session.add(country)
 
     db.session.commit()
@@ -153,7 +155,7 @@ def test_create_flight(client, setup_airport):
         "baggage_allowance": "1 checked bag",
         "airline": {
             "guid": "airline12",
-            "icao_code": "AL123",
+            "icao_code": "AL12",
             "name": "Test Airline",
             "logo_path": "/path/to/logo"
         },
@@ -239,3 +241,572 @@ def test_delete_flight(client, setup_flight):
     assert response.status_code == 200, f"Unexpected status code: {response.status_code}, response data: {response.get_json()}"
     data = response.get_json()
     assert data['message'] == "Flight deleted successfully", "Unexpected response message"
+
+def flight_payload(guid, airport, airline, departure_time="8:00AM", arrival_time="12:00PM",
+                   price_economy=199.99, flight_time_minutes=240, num_stops=0):
+    """Build the JSON body for creating a flight between the test airport and itself."""
+    airport_json = {
+        "guid": airport.guid,
+        "full_name": airport.full_name,
+        "short_name": airport.short_name,
+        "municipality_name": airport.municipality_name,
+        "iata_code": airport.iata_code
+    }
+    return {
+        "guid": guid,
+        "departure_time": departure_time,
+        "arrival_time": arrival_time,
+        "num_stops": num_stops,
+        "price_economy": price_economy,
+        "price_business": 499.99,
+        "baggage_allowance": "1 checked bag",
+        "airline": {
+            "guid": airline.guid,
+            "icao_code": airline.icao_code,
+            "name": airline.name,
+            "logo_path": airline.logo_path
+        },
+        "departure_airport": airport_json,
+        "arrival_airport": airport_json,
+        "flight_time_minutes": flight_time_minutes
+    }
+
+def test_search_uses_route_index(client, setup_airport, setup_airline):
+    """Test that route searches are answered from the in-memory index and follow writes."""
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid}
+
+    response = client.post('/api/flights', json=flight_payload("route_index_flight", setup_airport, setup_airline))
+    assert response.status_code == 201
+
+    route_index = client.application.extensions['route_index']
+    record = route_index.get("route_index_flight")
+    assert record is not None, "Created flight should be indexed"
+    assert record.departure_minute == 8 * 60
+
+    response = client.post('/api/flights/search', json=search_data)
+    assert response.status_code == 200
+    assert any(flight['guid'] == "route_index_flight" for flight in response.get_json())
+
+    response = client.delete('/api/flights/route_index_flight')
+    assert response.status_code == 200
+    assert route_index.get("route_index_flight") is None, "Deleted flight should leave the index"
+
+    response = client.post('/api/flights/search', json=search_data)
+    assert all(flight['guid'] != "route_index_flight" for flight in response.get_json())
+
+def test_deleted_airport_leaves_route_index(client, setup_airport, setup_airline):
+    """Test that flights removed with their airport leave the route index and cached searches."""
+    response = client.post('/api/airports', json={
+        "guid": "doomed_airport", "full_name": "Doomed Airport", "short_name": "Doomed",
+        "municipality_name": "Doomed City", "iata_code": "DMD",
+        "location": {"guid": "doomed_location", "latitude": 5.0, "longitude": 6.0},
+        "country": {"guid": "country123", "code": "US", "name": "United States"}
+    })
+    assert response.status_code == 201
+    payload = flight_payload("doomed_flight", setup_airport, setup_airline)
+    payload["arrival_airport"] = {**payload["arrival_airport"], "guid": "doomed_airport", "iata_code": "DMD"}
+    assert client.post('/api/flights', json=payload).status_code == 201
+
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": "doomed_airport"}
+    assert [flight['guid'] for flight in client.post('/api/flights/search', json=search_data).get_json()] == ["doomed_flight"]
+
+    assert client.delete('/api/airports/doomed_airport').status_code == 200
+    route_index = client.application.extensions['route_index']
+    assert route_index.get("doomed_flight") is None
+    assert route_index.find(setup_airport.guid, "doomed_airport") == []
+    assert client.post('/api/flights/search', json=search_data).get_json() == []
+    db.session.delete(LocationEntity.query.filter_by(guid="doomed_location").one())
+    db.session.commit()
+
+def test_search_filters_sorting_and_pagination(client, setup_airport, setup_airline):
+    """Test server-side filters, sorting and keyset pagination on the search endpoint."""
+    flights = [
+        flight_payload("paged_morning_cheap", setup_airport, setup_airline, "6:15AM", "10:15AM", 150.0, 240),
+        flight_payload("paged_afternoon", setup_airport, setup_airline, "1:00PM", "3:00PM", 300.0, 120),
+        flight_payload("paged_evening", setup_airport, setup_airline, "7:30PM", "11:30PM", 450.0, 240, num_stops=1),
+        flight_payload("paged_morning_pricey", setup_airport, setup_airline, "9:00AM", "6:00PM", 900.0, 540),
+    ]
+    assert client.post('/api/flights', json=flights).status_code == 201
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid}
+    paged_guids = {flight["guid"] for flight in flights}
+
+    response = client.post('/api/flights/search', json={**search_data, "max_price": 500, "departure_time_of_day": "Morning"})
+    assert [flight['guid'] for flight in response.get_json() if flight['guid'] in paged_guids] == ["paged_morning_cheap"]
+
+    response = client.post('/api/flights/search', json={**search_data, "stops": 1, "arrival_time_of_day": "Evening"})
+    assert [flight['guid'] for flight in response.get_json()] == ["paged_evening"]
+
+    # Walk every page sorted by duration and make sure the pages are disjoint and ordered
+    seen = []
+    cursor = None
+    while True:
+        body = {**search_data, "sort_by": "duration", "page_size": 2}
+        if cursor:
+            body["cursor"] = cursor
+        response = client.post('/api/flights/search', json=body)
+        assert response.status_code == 200
+        page = response.get_json()
+        assert len(page["flights"]) <= 2
+        seen.extend(flight for flight in page["flights"])
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    durations = [flight["flight_time_minutes"] for flight in seen]
+    assert durations == sorted(durations)
+    assert len({flight["guid"] for flight in seen}) == len(seen)
+    assert paged_guids <= {flight["guid"] for flight in seen}
+
+    response = client.post('/api/flights/search', json={**search_data, "sort_by": "price", "cursor": "not-a-cursor"})
+    assert response.status_code == 400
+    for cursor in (5, ["price", 1, "x"], encode_cursor("price", ("cheap", "x")), encode_cursor("price", (1.0, 7)),
+                   encode_cursor("price", (None, "x"))):
+        response = client.post('/api/flights/search', json={**search_data, "sort_by": "price", "cursor": cursor})
+        assert response.status_code == 400, cursor
+        assert response.get_json()["error"] == "Invalid cursor."
+
+    # Null limits fall back to their defaults; values that are not numbers are rejected
+    response = client.post('/api/flights/search', json={**search_data, "max_stops": None, "max_results": None})
+    assert response.status_code == 200
+    assert client.post('/api/flights/search', json={**search_data, "max_stops": [1]}).status_code == 400
+    assert client.post('/api/flights/search', json={**search_data, "max_price": "cheap"}).status_code == 400
+
+    for flight in flights:
+        client.delete(f'/api/flights/{flight["guid"]}')
+
+def test_search_departure_window(client, setup_airport, setup_airline):
+    """Test "depart between" windows on both the route index and the SQL range query paths."""
+    flights = [
+        flight_payload("window_early", setup_airport, setup_airline, "5:30AM", "9:30AM"),
+        flight_payload("window_inside", setup_airport, setup_airline, "7:45AM", "11:45AM"),
+        flight_payload("window_late", setup_airport, setup_airline, "11:30PM", "3:30AM"),
+    ]
+    assert client.post('/api/flights', json=flights).status_code == 201
+    window_guids = {flight["guid"] for flight in flights}
+
+    for search_data in (
+        {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid},
+        {"departure_airport_id": setup_airport.guid},
+    ):
+        response = client.post('/api/flights/search', json={**search_data, "departure_after": "06:00", "departure_before": "10:00"})
+        assert response.status_code == 200
+        assert [flight['guid'] for flight in response.get_json() if flight['guid'] in window_guids] == ["window_inside"]
+
+        # A window that wraps past midnight
+        response = client.post('/api/flights/search', json={**search_data, "departure_after": "23:00", "departure_before": "06:00"})
+        assert {flight['guid'] for flight in response.get_json()} & window_guids == {"window_early", "window_late"}
+
+    response = client.post('/api/flights/search', json={"departure_airport_id": setup_airport.guid, "departure_after": "25:00"})
+    assert response.status_code == 400
+    for path in ('/api/flights/search', '/api/flights/search/connections'):
+        for value in (600, ["06:00"], {"hour": 6}):
+            response = client.post(path, json={"departure_airport_id": setup_airport.guid, "departure_after": value})
+            assert response.status_code == 400
+            assert response.get_json()["error"] == "departure_after must be a time in HH:MM format."
+
+    for flight in flights:
+        client.delete(f'/api/flights/{flight["guid"]}')
+
+def test_backfill_minute_columns(client, setup_airport, setup_airline):
+    """Test that the schema upgrade backfills minute-of-day columns left empty by older rows."""
+    from app.schema import add_flight_minute_columns
+
+    payload = flight_payload("backfill_flight", setup_airport, setup_airline, "1:30PM", "4:05PM")
+    assert client.post('/api/flights', json=payload).status_code == 201
+    db.session.query(FlightEntity).filter_by(guid="backfill_flight").update(
+        {"departure_minute": None, "arrival_minute": None}, synchronize_session=False
+    )
+    db.session.commit()
+
+    with db.engine.begin() as connection:
+        assert add_flight_minute_columns(connection) == 1
+        assert add_flight_minute_columns(connection) == 0, "Backfill should be idempotent"
+
+    db.session.expire_all()
+    flight = FlightEntity.query.filter_by(guid="backfill_flight").first()
+    assert flight.departure_minute == 13 * 60 + 30
+    assert flight.arrival_minute == 16 * 60 + 5
+
+    client.delete('/api/flights/backfill_flight')
+
+def test_search_responses_are_cached_and_invalidated(client, setup_airport, setup_airline):
+    """Test that repeated searches are served from the cache until a write touches the route."""
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid, "sort_by": "price"}
+    cache = client.application.extensions['search_cache']
+
+    first = client.post('/api/flights/search', json=search_data)
+    hits = cache.stats()["hits"]
+    second = client.post('/api/flights/search', json=search_data)
+    assert second.status_code == 200
+    assert second.get_data() == first.get_data()
+    assert cache.stats()["hits"] == hits + 1
+
+    payload = flight_payload("cached_route_flight", setup_airport, setup_airline, price_economy=1.0)
+    assert client.post('/api/flights', json=payload).status_code == 201
+    response = client.post('/api/flights/search', json=search_data)
+    assert response.get_json()[0]['guid'] == "cached_route_flight", "Adding a flight should invalidate its route"
+
+    client.delete('/api/flights/cached_route_flight')
+    response = client.post('/api/flights/search', json=search_data)
+    assert all(flight['guid'] != "cached_route_flight" for flight in response.get_json())
+
+    stats = client.get('/api/flights/search/cache').get_json()
+    assert stats["hits"] >= 1 and stats["invalidations"] >= 1
+
+def test_flight_endpoints_use_constant_query_count(client, setup_airport, setup_airline, count_queries):
+    """Test that eager loading keeps each endpoint's query count independent of the number of flights."""
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid}
+    endpoints = [
+        lambda: client.get(f'/api/flights/departure/{setup_airport.guid}'),
+        lambda: client.get(f'/api/flights/airline/{setup_airline.guid}'),
+        lambda: client.get('/api/flights'),
+        lambda: client.post('/api/flights/search', json=search_data),
+    ]
+    guids = []
+
+    def measure(total):
+        while len(guids) < total:
+            guids.append(f"eager_flight_{len(guids)}")
+            assert client.post('/api/flights', json=flight_payload(guids[-1], setup_airport, setup_airline)).status_code == 201
+        return [count_queries(endpoint) for endpoint in endpoints]
+
+    few = measure(2)
+    many = measure(8)
+    assert few == many, "Query count should not grow with the number of flights"
+    assert max(many) <= 2
+
+    for guid in guids:
+        client.delete(f'/api/flights/{guid}')
+
+def test_serialized_responses_match_dto_path(client, setup_airport, setup_airline):
+    """Test that the row serializers produce the same bytes as serializing through entities and DTOs."""
+    from flask import jsonify
+    from app.models.entities.trip_entity import TripEntity
+    from app.models.entities.passenger_entity import PassengerEntity
+    from datetime import date
+
+    payload = flight_payload("serialized_flight", setup_airport, setup_airline, "9:15PM", "1:15AM")
+    payload["layover"] = {"guid": "serialized_layover", "airport": payload["departure_airport"], "duration_minutes": 75}
+    assert client.post('/api/flights', json=[payload, flight_payload("serialized_plain", setup_airport, setup_airline)]).status_code == 201
+    trip = TripEntity(name="Serialized Trip", is_round_trip=True, departure_date=date(2024, 11, 20), return_date=None,
+                      departing_flight_id="serialized_flight", returning_flight_id="serialized_plain")
+    trip.passengers.append(PassengerEntity(name="Passenger", departing_seat_id=3, returning_seat_id=None))
+    db.session.add(trip)
+    db.session.commit()
+
+    flights = FlightEntity.query.filter_by(departure_airport_id=setup_airport.guid).all()
+    expected = {
+        f'/api/flights/departure/{setup_airport.guid}': [flight.to_dto().to_dict() for flight in flights],
+        '/api/flights/serialized_flight': FlightEntity.query.get("serialized_flight").to_dto().to_dict(),
+        f'/api/airports/{setup_airport.guid}': setup_airport.to_dto().to_dict(),
+        f'/api/trips/{trip.guid}': trip.to_dto().to_dict(),
+    }
+    for url, body in expected.items():
+        assert client.get(url).get_data() == jsonify(body).get_data(), url
+
+    assert client.get('/api/flights/missing-flight').status_code == 404
+    assert client.get('/api/trips/missing-trip').status_code == 404
+
+    db.session.delete(trip)
+    db.session.commit()
+    for guid in ("serialized_flight", "serialized_plain"):
+        client.delete(f'/api/flights/{guid}')
+
+def test_search_normalized_shape(client, setup_airport, setup_airline):
+    """Test that ?shape=normalized sends each airport and airline once and denormalizes to the nested shape."""
+    flights = [flight_payload(f"normalized_flight_{i}", setup_airport, setup_airline, price_economy=100.0 + i) for i in range(3)]
+    flights[0]["layover"] = {"guid": "normalized_layover", "airport": flights[0]["departure_airport"], "duration_minutes": 45}
+    assert client.post('/api/flights', json=flights).status_code == 201
+    search_data = {"departure_airport_id": setup_airport.guid, "arival_airport_id": setup_airport.guid, "sort_by": "price"}
+
+    nested = client.post('/api/flights/search', json=search_data).get_json()
+    normalized = client.post('/api/flights/search?shape=normalized', json=search_data).get_json()
+    assert set(normalized) == {"flights", "airports", "airlines"}
+    assert list(normalized["airports"]) == [setup_airport.guid]
+    assert list(normalized["airlines"]) == [setup_airline.guid]
+    assert "departure_airport" not in normalized["flights"][0]
+    assert [denormalize_flight(flight, normalized["airports"], normalized["airlines"]) for flight in normalized["flights"]] == nested
+
+    page = client.post('/api/flights/search?shape=normalized', json={**search_data, "page_size": 2}).get_json()
+    assert len(page["flights"]) == 2 and page["next_cursor"]
+
+    assert client.post('/api/flights/search?shape=flat', json=search_data).status_code == 400
+
+    for flight in flights:
+        client.delete(f'/api/flights/{flight["guid"]}')
+
+def test_seat_map_is_stored_as_bitset(client, setup_airport, setup_airline):
+    """Test that seat maps keep their wire format while storing only a booked-seat bitset per flight."""
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.services.flight_service import FlightService
+
+    assert client.post('/api/flights', json=flight_payload("bitset_flight", setup_airport, setup_airline)).status_code == 201
+    seats = FlightSeatsEntity.query.filter_by(flight_id="bitset_flight").first()
+    assert len(seats.booked_seats) == 24
+
+    response = client.get('/api/flight/bitset_flight/seats')
+    assert response.status_code == 200
+    data = response.get_json()
+    configuration = data['seat_configuration']
+    assert len(configuration) == 188
+    assert configuration[0] == {"seat_id": 1, "type": "Business", "position": "Window", "available": configuration[0]["available"]}
+    assert configuration[20] == {"seat_id": 21, "type": "Economy", "position": "Middle", "available": configuration[20]["available"]}
+    assert data['seats_available'] == sum(seat["available"] for seat in configuration)
+
+    free_seat = next(seat["seat_id"] for seat in configuration if seat["available"])
+    FlightService.mark_seat_as_booked(seats.guid, free_seat)
+    data = client.get('/api/flight/bitset_flight/seats').get_json()
+    assert data['seat_configuration'][free_seat - 1]["available"] is False
+    assert data['seats_available'] == sum(seat["available"] for seat in configuration) - 1
+
+    with pytest.raises(ValueError):
+        FlightService.mark_seat_as_booked(seats.guid, 189)
+
+    client.delete('/api/flights/bitset_flight')
+
+def test_convert_json_seat_configurations(client, setup_airport, setup_airline):
+    """Test that the schema upgrade turns legacy JSON seat lists into bitsets and drops the JSON column."""
+    import json
+    from sqlalchemy import inspect, text
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.schema import convert_seat_configurations
+
+    assert client.post('/api/flights', json=flight_payload("legacy_seats_flight", setup_airport, setup_airline)).status_code == 201
+    seats = FlightSeatsEntity.query.filter_by(flight_id="legacy_seats_flight").first()
+    legacy = [dict(seat, available=seat["seat_id"] not in (2, 40)) for seat in seats.seat_configuration]
+    with db.engine.begin() as connection:
+        connection.execute(text("ALTER TABLE flight_seats ADD COLUMN seat_configuration JSON"))
+        connection.execute(text("UPDATE flight_seats SET seat_configuration = :configuration WHERE flight_id = 'legacy_seats_flight'"),
+                           {"configuration": json.dumps(legacy)})
+        assert convert_seat_configurations(connection) == 1
+        assert "seat_configuration" not in {column["name"] for column in inspect(connection).get_columns("flight_seats")}
+        assert convert_seat_configurations(connection) == 0, "Conversion should be idempotent"
+
+    db.session.expire_all()
+    seats = FlightSeatsEntity.query.filter_by(flight_id="legacy_seats_flight").first()
+    assert seats.seat_configuration == legacy
+    assert seats.seats_available == 186
+
+    client.delete('/api/flights/legacy_seats_flight')
+
+def test_suggest_adjacent_seats(client, setup_airport, setup_airline):
+    """Test that seat suggestions find blocks of free seats within a row, preferring one side of the aisle."""
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.seat_layouts import STANDARD_LAYOUT
+
+    assert client.post('/api/flights', json=flight_payload("suggest_flight", setup_airport, setup_airline)).status_code == 201
+    # Row 14 is seats 99-101 | 102-104; leave 100-103 free in the economy cabin
+    seats = FlightSeatsEntity.query.filter_by(flight_id="suggest_flight").first()
+    economy = STANDARD_LAYOUT.cabin_mask("Economy")
+    seats.booked_mask = economy & ~sum(STANDARD_LAYOUT.seat_mask(seat_id) for seat_id in (100, 101, 102, 103))
+    db.session.commit()
+
+    def suggest(count, cabin="Economy"):
+        response = client.get(f'/api/flight/suggest_flight/seats/suggest?count={count}&cabin={cabin}')
+        assert response.status_code == 200
+        return [suggestion["seat_ids"] for suggestion in response.get_json()["suggestions"]]
+
+    assert suggest(2) == [[100, 101], [102, 103]]
+    assert suggest(3) == [[100, 101, 102]], "Only an aisle-split block of three is left"
+    assert suggest(4) == [[100, 101, 102, 103]]
+    assert suggest(5) == []
+    assert suggest(2, "Business")[:2] == STANDARD_LAYOUT.suggest_blocks(seats.booked_mask, 2, "Business")[:2]
+
+    hold = client.post('/api/flight/suggest_flight/holds', json={"seat_ids": [101]}).get_json()
+    assert suggest(2) == [[102, 103]], "Held seats should not be suggested"
+    client.delete(f'/api/flight/holds/{hold["token"]}')
+
+    response = client.post('/api/flights/availability', json={"flight_ids": ["suggest_flight"], "group_size": 4})
+    assert response.get_json()["suggest_flight"]["cabins"]["Economy"]["seats_together"] is True
+    response = client.post('/api/flights/availability', json={"flight_ids": ["suggest_flight"], "group_size": 5})
+    assert response.get_json()["suggest_flight"]["cabins"]["Economy"]["seats_together"] is False
+
+    assert client.get('/api/flight/suggest_flight/seats/suggest?count=7').status_code == 400
+    assert client.get('/api/flight/suggest_flight/seats/suggest?count=2&cabin=First').status_code == 400
+    assert client.get('/api/flight/suggest_flight/seats/suggest').status_code == 400
+    assert client.get('/api/flight/missing_flight/seats/suggest?count=2').status_code == 404
+
+    client.delete('/api/flights/suggest_flight')
+
+def test_vectorized_occupancy_matches_seat_walk(client):
+    """Test that the NumPy seat generator books exactly the seats the one-seat-at-a-time walk books for the same draws."""
+    import numpy as np
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.seat_layouts import STANDARD_LAYOUT
+    from app.seat_occupancy import occupancy_from_draws, random_occupancy
+
+    def walk(fraction, picks):
+        seats, booked = STANDARD_LAYOUT.seats, set()
+        remaining = int(len(seats) * fraction)
+        i = 0
+        while remaining > 0 and i < len(seats):
+            seat_type, position = seats[i]
+            if i not in booked and picks[i]:
+                booked.add(i)
+                remaining -= 1
+                if remaining > 0 and seat_type == "Economy":
+                    for adj in ([i + 1, i - 1] if position in ["Middle", "Aisle"] else [i + 1]):
+                        if 0 <= adj < len(seats) and adj not in booked:
+                            booked.add(adj)
+                            remaining -= 1
+                            if remaining == 0:
+                                break
+            i += 1
+        return booked
+
+    rng = np.random.default_rng(17)
+    fractions = np.concatenate([rng.uniform(0.25, 0.80, 300), [0.25, 0.80, 0.0, 1.0]])
+    picks = rng.random((len(fractions), STANDARD_LAYOUT.size)) < 0.75
+    booked = occupancy_from_draws(STANDARD_LAYOUT, fractions, picks)
+    for flight in range(len(fractions)):
+        assert set(np.flatnonzero(booked[flight])) == walk(fractions[flight], picks[flight])
+
+    assert (random_occupancy(STANDARD_LAYOUT, 5, np.random.default_rng(3)) == random_occupancy(STANDARD_LAYOUT, 5, np.random.default_rng(3))).all()
+
+    seat_maps = FlightSeatsEntity.generate_many(["a", "b"], rng=np.random.default_rng(3))
+    expected = random_occupancy(STANDARD_LAYOUT, 2, np.random.default_rng(3))
+    for seat_map, row in zip(seat_maps, expected):
+        assert [not seat["available"] for seat in seat_map.seat_configuration] == row.tolist()
+        assert seat_map.seats_available == STANDARD_LAYOUT.size - row.sum()
+        assert 47 <= STANDARD_LAYOUT.size - seat_map.seats_available <= 150
+
+def test_bulk_flight_import(client, setup_airport, setup_airline, count_queries):
+    """Test that a list of flights is validated up front and inserted in chunks with a constant number of lookups."""
+    from app.models.entities.flight_seats_entity import FlightSeatsEntity
+    from app.models.entities.layover_entity import LayoverEntity
+
+    new_airport = {
+        "guid": "bulk_airport", "full_name": "Bulk International", "short_name": "Bulk",
+        "municipality_name": "Bulkton", "iata_code": "BLK",
+        "location": {"guid": "bulk_location", "latitude": 1.0, "longitude": 2.0},
+        "country": {"guid": "bulk_country", "code": "BK", "name": "Bulkland",
+                    "continent": {"guid": "bulk_continent", "code": "BC", "name": "Bulk Continent"}},
+    }
+
+    def payload(count, prefix):
+        flights = []
+        for i in range(count):
+            flight = flight_payload(f"{prefix}_{i}", setup_airport, setup_airline, departure_time="9:30AM")
+            flight["arrival_airport"] = new_airport
+            if i % 2:
+                flight["layover"] = {"guid": f"{prefix}_layover_{i}", "airport": new_airport, "duration_minutes": 45}
+            flights.append(flight)
+        return flights
+
+    def run(count, prefix):
+        response = client.post('/api/flights', json=payload(count, prefix))
+        assert response.status_code == 201, response.get_json()
+        return response.get_json()
+
+    client.application.config['FLIGHT_IMPORT_CHUNK_SIZE'] = 10
+    try:
+        run(5, "bulk_warmup")
+        few = count_queries(lambda: run(20, "bulk_few"))
+        many = count_queries(lambda: run(40, "bulk_many"))
+        # Twice the flights is two more chunks, each one executemany per table rather than per-flight queries
+        assert many - few == 2 * 3
+
+        report = run(30, "bulk_report")
+    finally:
+        client.application.config['FLIGHT_IMPORT_CHUNK_SIZE'] = 1000
+    assert report["created"] == 30
+    assert report["rows_inserted"] == {"flights": 30, "flight_seats": 30, "layovers": 15}
+    assert report["rows_per_second"] > 0 and report["flights_per_second"] > 0
+
+    flight = client.get('/api/flights/bulk_report_1').get_json()
+    assert flight["arrival_airport"]["country"]["continent"]["code"] == "BC"
+    assert flight["layover"]["duration_minutes"] == 45
+    assert FlightSeatsEntity.query.filter_by(flight_id="bulk_report_1").first().version_id == 1
+    search = client.post('/api/flights/search', json={"departure_airport_id": setup_airport.guid, "arival_airport_id": "bulk_airport"})
+    assert "bulk_report_29" in {flight["guid"] for flight in search.get_json()}
+
+    duplicate = payload(2, "bulk_new") + payload(1, "bulk_report")
+    response = client.post('/api/flights', json=duplicate)
+    assert response.status_code == 400
+    assert "bulk_report_0" in response.get_json()["error"]
+    assert client.get('/api/flights/bulk_new_0').status_code == 404, "A rejected batch writes nothing"
+
+    for prefix, count in (("bulk_warmup", 5), ("bulk_few", 20), ("bulk_many", 40), ("bulk_report", 30)):
+        for i in range(count):
+            client.delete(f'/api/flights/{prefix}_{i}')
+    assert LayoverEntity.query.filter(LayoverEntity.guid.like("bulk_%")).count() == 0
+
+def test_bulk_import_rejects_taken_codes(client, setup_airport, setup_airline):
+    """Test that new references reusing a stored or repeated unique code are an input error, not a 500."""
+    from app.models.entities.airport_entity import AirportEntity
+
+    taken = {
+        "guid": "taken_airport", "full_name": "Taken International", "short_name": "Taken",
+        "municipality_name": "Takenton", "iata_code": setup_airport.iata_code,
+        "location": {"guid": "taken_location", "latitude": 1.0, "longitude": 2.0},
+        "country": {"guid": setup_airport.country.guid, "code": setup_airport.country.code, "name": setup_airport.country.name},
+    }
+    flight = flight_payload("taken_flight", setup_airport, setup_airline)
+    flight["arrival_airport"] = taken
+    response = client.post('/api/flights', json=[flight])
+    assert response.status_code == 400
+    assert setup_airport.iata_code in response.get_json()["error"]
+
+    twins = [flight_payload(f"twin_flight_{i}", setup_airport, setup_airline) for i in range(2)]
+    for i, twin in enumerate(twins):
+        twin["airline"] = {"guid": f"twin_airline_{i}", "icao_code": "TWN", "name": f"Twin Air {i}", "logo_path": None}
+    response = client.post('/api/flights', json=twins)
+    assert response.status_code == 400
+    assert "icao_code" in response.get_json()["error"]
+
+    assert AirportEntity.query.get("taken_airport") is None
+    assert client.get('/api/flights/taken_flight').status_code == 404
+    assert client.get('/api/flights/twin_flight_0').status_code == 404
+
+def test_bulk_import_rejects_missing_required_fields(client, setup_airport, setup_airline, monkeypatch):
+    """Test that a flight missing a required column is rejected before any chunk is committed."""
+    flights = [flight_payload(f"required_flight_{i}", setup_airport, setup_airline) for i in range(2)]
+    flights[1]["price_economy"] = None
+    client.application.config['FLIGHT_IMPORT_CHUNK_SIZE'] = 1
+    try:
+        response = client.post('/api/flights', json=flights)
+        assert response.status_code == 400
+        assert "price_economy" in response.get_json()["error"]
+        assert client.get('/api/flights/required_flight_0').status_code == 404
+
+        # Should the database still reject a chunk, the client learns what the earlier chunks committed
+        monkeypatch.setattr("app.repositories.flight_import.check_required", lambda entity, rows: None)
+        response = client.post('/api/flights', json=flights)
+        assert response.status_code == 409
+        assert response.get_json()["created"] == 1
+        assert client.get('/api/flights/required_flight_0').status_code == 200
+        assert client.get('/api/flights/required_flight_1').status_code == 404
+    finally:
+        client.application.config['FLIGHT_IMPORT_CHUNK_SIZE'] = 1000
+        client.delete('/api/flights/required_flight_0')
+
+def test_random_flight_keeps_unparsed_times(client, setup_airport, setup_airline):
+    """Test that a reverse flight whose minute columns are empty is copied with its stored times."""
+    from app.repositories.airport_repository import AirportRepository
+
+    flight = flight_payload("random_reverse", setup_airport, setup_airline, "8:00AM", "12:00PM")
+    flight["departure_airport"] = {
+        "guid": "random_airport", "full_name": "Random International", "short_name": "Random",
+        "municipality_name": "Randomton", "iata_code": "RND",
+        "location": {"guid": "random_location", "latitude": 1.0, "longitude": 2.0},
+        "country": {"guid": setup_airport.country.guid, "code": setup_airport.country.code, "name": setup_airport.country.name},
+    }
+    assert client.post('/api/flights', json=[flight]).status_code == 201
+    # Like legacy rows the minute backfill could not parse
+    db.session.query(FlightEntity).filter_by(guid="random_reverse").update({"departure_minute": None, "arrival_minute": None})
+    db.session.commit()
+
+    try:
+        response = client.post('/api/flights/random', json={"departure_airport_id": setup_airport.guid,
+                                                             "arival_airport_id": "random_airport"})
+        assert response.status_code == 200, response.get_json()
+        generated = response.get_json()
+        assert generated["guid"] != "random_reverse"
+        assert (generated["departure_time"], generated["arrival_time"]) == ("8:00AM", "12:00PM")
+        assert generated["arrival_airport"]["guid"] == "random_airport"
+    finally:
+        AirportRepository.delete_airport("random_airport")
+        location = db.session.get(LocationEntity, "random_location")
+        if location is not None:
+            db.session.delete(location)
+            db.session.commit()
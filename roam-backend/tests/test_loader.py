@@ -0,0 +1,90 @@
+import io
+import json
+import pytest
+from app import db
+from app.loader import iter_json_records
+from app.models.entities.airline_entity import AirlineEntity
+from app.models.entities.airport_entity import AirportEntity
+from app.models.entities.continent_entity import ContinentEntity
+from app.models.entities.country_entity import CountryEntity
+from app.models.entities.flight_entity import FlightEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.location_entity import LocationEntity
+from app.models.entities.pop_destination_entity import PopularDestinationEntity
+from app.repositories.airport_repository import AirportRepository
+
+
+AIRPORT = {
+    "guid": "load_airport", "full_name": "Loader International", "short_name": "Loader",
+    "municipality_name": "Loadville", "iata_code": "LDR",
+    "location": {"guid": "load_location", "latitude": 3.0, "longitude": 4.0},
+    # Exported the way data/flights.json has it, with the continent beside the country
+    "country": {"guid": "load_country", "code": "LD", "name": "Loadland"},
+    "continent": {"guid": "load_continent", "code": "LC", "name": "Load Continent"},
+}
+
+def flight_record(guid):
+    return {
+        "guid": guid, "departure_time": "7:15AM", "arrival_time": "9:45AM", "num_stops": 0,
+        "price_economy": 120.0, "price_business": 300.0, "baggage_allowance": "1 checked bag",
+        "flight_time_minutes": 150,
+        "airline": {"guid": "load_airline", "icao_code": "LDA", "name": "Loader Air", "logo_path": "loader.png"},
+        "departure_airport": AIRPORT, "arrival_airport": AIRPORT,
+    }
+
+@pytest.fixture
+def loaded_rows(client):
+    """Remove whatever the loads of a test stored, so later tests see the shared database as it was."""
+    yield
+
+    # Deleting the airports takes their flights, seat maps and route index entries with them
+    for guid in ("load_airport", "load_airport_2"):
+        AirportRepository.delete_airport(guid)
+    for entity, guid in ((LocationEntity, "load_location"), (CountryEntity, "load_country"),
+                         (ContinentEntity, "load_continent"), (AirlineEntity, "load_airline"),
+                         (PopularDestinationEntity, "load_destination")):
+        row = db.session.get(entity, guid)
+        if row is not None:
+            db.session.delete(row)
+    db.session.commit()
+
+def test_iter_json_records_reads_arrays_objects_and_ndjson(monkeypatch):
+    """Test that records are streamed out of every supported layout, even across read blocks."""
+    monkeypatch.setattr("app.loader.READ_BLOCK_SIZE", 7)
+    records = [{"guid": str(i), "name": "x" * i} for i in range(12)]
+
+    assert list(iter_json_records(io.StringIO(json.dumps(records, indent=2)))) == records
+    assert list(iter_json_records(io.StringIO("\n".join(json.dumps(r) for r in records)))) == records
+    assert list(iter_json_records(io.StringIO(json.dumps(records[3])))) == [records[3]]
+    assert list(iter_json_records(io.StringIO(" [ ] "))) == []
+
+def test_roam_load_command(client, tmp_path, loaded_rows):
+    """Test that `flask roam load` inserts flights, airports and destinations, and skips them when re-run."""
+    flights = tmp_path / "flights.ndjson"
+    flights.write_text("\n".join(json.dumps(flight_record(f"load_flight_{i}")) for i in range(7)))
+    airports = tmp_path / "airports.json"
+    airports.write_text(json.dumps([AIRPORT, dict(AIRPORT, guid="load_airport_2", iata_code="LD2")]))
+    destinations = tmp_path / "destinations.json"
+    destinations.write_text(json.dumps([{"guid": "load_destination", "name": "Loadville", "image_path": "l.png"}]))
+    runner = client.application.test_cli_runner()
+
+    result = runner.invoke(args=["roam", "load", "--batch-size", "3", str(flights), str(airports), str(destinations)])
+    assert result.exit_code == 0, result.output
+    assert "flights: 7 records read, 19 rows inserted, 0 skipped" in result.output
+    assert "airports: 2 records read, 1 rows inserted, 1 skipped" in result.output
+    assert db.session.query(FlightEntity).filter(FlightEntity.guid.like("load_flight_%")).count() == 7
+    assert db.session.query(FlightSeatsEntity).filter(FlightSeatsEntity.flight_id.like("load_flight_%")).count() == 7
+    assert db.session.get(FlightEntity, "load_flight_0").departure_minute == 7 * 60 + 15
+    assert db.session.get(AirportEntity, "load_airport").country.continent_id == "load_continent"
+    assert db.session.get(PopularDestinationEntity, "load_destination").name == "Loadville"
+
+    rerun = runner.invoke(args=["roam", "load", str(flights)])
+    assert rerun.exit_code == 0, rerun.output
+    assert "flights: 7 records read, 0 rows inserted, 7 skipped" in rerun.output
+
+    bad = tmp_path / "more_flights.json"
+    bad.write_text(json.dumps([flight_record("load_flight_bad"), {"guid": "load_flight_broken"}]))
+    failed = runner.invoke(args=["roam", "load", str(bad)])
+    assert failed.exit_code != 0
+    assert "Batch starting at record 1" in failed.output
+    assert db.session.get(FlightEntity, "load_flight_bad") is None
@@ -0,0 +1,60 @@
+import shutil
+import pytest
+from sqlalchemy import text
+from sqlalchemy.exc import OperationalError
+from app import create_app, db
+from app.read_routing import STICKY_COOKIE, primary
+from app.repositories.airline_repository import AirlineRepository
+from app.unit_of_work import unit_of_work
+
+AIRLINE = {"guid": "a7c1e9d2-0000-4000-8000-000000000001", "icao_code": "RPL", "name": "Replica Air", "logo_path": None}
+USER = {"guid": "a7c1e9d2-0000-4000-8000-000000000002", "first_name": "Rep", "last_name": "Lica",
+        "email": "replica@example.com", "password": "secret"}
+
+@pytest.fixture
+def lagging_app(tmp_path):
+    """A production app whose replica is a copy of the primary taken before any airline was added."""
+    primary_path, replica_path = tmp_path / "primary.db", tmp_path / "replica.db"
+    app = create_app("production")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{primary_path}"
+    app.config["READ_REPLICA_URI"] = f"sqlite:///{replica_path}"
+    with app.app_context():
+        db.create_all()
+        db.engine.dispose()  # Closing the last connection checkpoints the WAL into the file
+    shutil.copy(primary_path, replica_path)
+    yield app
+    with app.app_context():
+        db.engine.dispose()
+        db.get_replica_engine().dispose()
+
+def test_reads_go_to_replica_and_writes_stick_to_primary(lagging_app):
+    """Test that a client reads its own writes from the primary while other clients read the replica."""
+    writer = lagging_app.test_client()
+    assert writer.post("/api/airlines", json=AIRLINE).status_code == 201
+    response = writer.post("/api/users", json=USER)
+    assert response.status_code == 201
+    assert STICKY_COOKIE in response.headers["Set-Cookie"]
+
+    # The replica has not caught up: other clients do not see the user yet, its writer does
+    other = lagging_app.test_client(use_cookies=False)
+    assert other.get("/api/users").get_json() == []
+    assert [user["guid"] for user in writer.get("/api/users").get_json()] == [USER["guid"]]
+
+    # Views tagged with the primary's table versions read the primary, so a stale body is never revalidated
+    response = other.get("/api/airlines")
+    assert [airline["guid"] for airline in response.get_json()] == [AIRLINE["guid"]]
+    assert other.get("/api/airlines", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
+
+    with lagging_app.app_context():
+        assert AirlineRepository.get_by_guid(AIRLINE["guid"]) is None
+        with primary():
+            assert AirlineRepository.get_by_guid(AIRLINE["guid"]) is not None
+        with unit_of_work():
+            assert AirlineRepository.get_by_guid(AIRLINE["guid"]) is not None
+
+def test_sqlite_replica_is_read_only(lagging_app):
+    """Test that nothing can be written through the replica engine."""
+    with lagging_app.app_context():
+        with db.get_replica_engine().connect() as connection:
+            with pytest.raises(OperationalError, match="readonly"):
+                connection.execute(text("INSERT INTO airlines (guid, name) VALUES ('x', 'Nobody')"))
@@ -0,0 +1,60 @@
+import re
+import pytest
+from alembic.autogenerate import compare_metadata
+from alembic.migration import MigrationContext
+from sqlalchemy import event, inspect
+from app import create_app, db
+from app.models.entities.country_entity import CountryEntity
+from app.repositories.airport_repository import AirportRepository
+from app.repositories.flight_repository import FlightRepository
+from app.repositories.trip_repository import TripRepository
+from app.schema import upgrade_database
+
+# A full scan of one of these tables in a lookup means an index is missing
+SCANNED_TABLE = re.compile(r"^SCAN (?:TABLE )?(flights|trips|passengers|airports|countries|layovers)\b")
+
+@pytest.mark.parametrize("created_by", ["migrations", "create_all"])
+def test_upgrade_database_matches_models(tmp_path, created_by):
+    """Test that migrating a new database, or adopting one made by create_all, ends at the models' schema."""
+    app = create_app("production")
+    app.config["SQLALCHEMY_DATABASE_URI"] = f"sqlite:///{tmp_path / 'roam.db'}"
+    with app.app_context():
+        if created_by == "create_all":
+            db.create_all()
+        upgrade_database()
+        with db.engine.connect() as connection:
+            assert compare_metadata(MigrationContext.configure(connection), db.metadata) == []
+            assert MigrationContext.configure(connection).get_current_revision() == "0002"
+            assert "ix_passengers_trip_id" in {index["name"] for index in inspect(connection).get_indexes("passengers")}
+        db.engine.dispose()
+
+def test_hot_queries_use_indexes(client):
+    """Test that no repository lookup on a foreign key or code falls back to a full table scan."""
+    if db.engine.dialect.name != "sqlite":
+        pytest.skip("EXPLAIN QUERY PLAN is SQLite's")
+
+    statements = []
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    event.listen(db.engine, "before_cursor_execute", record)
+    try:
+        FlightRepository.find_by_departure_id("airport-1")
+        FlightRepository.find_by_destination_id("airport-2")
+        FlightRepository.find_by_airline_id("airline-1")
+        FlightRepository.find_by_departure_and_arrival("airport-1", "airport-2", departure_windows=[(360, 720)])
+        FlightRepository.find_by_departure_and_arrival("", "airport-2", arrival_windows=[(1320, 120)])
+        TripRepository.get_by_departing_flight("flight-1")
+        TripRepository.get_by_returning_flight("flight-1")
+        TripRepository.get_passengers_by_trip_id("trip-1")
+        AirportRepository.find_serialized_by_country_code("US")
+        CountryEntity.query.filter_by(code="US").first()
+    finally:
+        event.remove(db.engine, "before_cursor_execute", record)
+
+    assert len(statements) >= 10
+    connection = db.session.connection()
+    for statement, parameters in statements:
+        plan = [row[-1] for row in connection.exec_driver_sql("EXPLAIN QUERY PLAN " + statement, parameters)]
+        assert not [step for step in plan if SCANNED_TABLE.match(step)], f"{plan}\n{statement}"
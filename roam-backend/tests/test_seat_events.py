@@ -0,0 +1,58 @@
+import threading
+from app.seat_events import RESET, SeatEventBroker
+from app.seat_holds import SeatHolds
+from tests.helpers import FakeClock
+
+
+def test_subscribers_receive_deltas_published_after_they_subscribe():
+    broker = SeatEventBroker()
+    broker.publish("F1", taken=[1])  # Nobody is watching yet
+    first, second = broker.subscribe("F1"), broker.subscribe("F1")
+    other = broker.subscribe("F2")
+    broker.publish("F1", taken=[3, 2], free=[1])
+
+    assert first.wait(0) == [(1, {"taken": [2, 3], "free": [1]})]
+    assert second.wait(0) == [(1, {"taken": [2, 3], "free": [1]})]
+    assert first.wait(0) == [], "Deltas are delivered once"
+    assert other.wait(0) == []
+
+def test_lagging_subscribers_are_reset():
+    broker = SeatEventBroker(history=2)
+    subscription = broker.subscribe("F1")
+    for seat_id in range(1, 4):
+        broker.publish("F1", taken=[seat_id])
+    assert subscription.wait(0) == [(3, RESET)]
+    broker.publish("F1", free=[1])
+    assert subscription.wait(0) == [(4, {"taken": [], "free": [1]})]
+
+def test_closing_wakes_the_waiter_and_drops_idle_channels():
+    broker = SeatEventBroker()
+    subscription = broker.subscribe("F1")
+    results = []
+    waiter = threading.Thread(target=lambda: results.append(subscription.wait(30)))
+    waiter.start()
+    subscription.close()
+    waiter.join(timeout=5)
+    assert results == [[]]
+    assert broker.subscriber_count() == 0
+
+def test_hold_changes_reach_the_listener():
+    clock = FakeClock()
+    broker = SeatEventBroker()
+    holds = SeatHolds(clock=clock, listener=broker.publish)
+    subscription = broker.subscribe("F1", on_idle=holds.expire)
+
+    hold = holds.hold("F1", [1, 2], ttl_seconds=60)
+    holds.hold("F1", [2, 3], ttl_seconds=60, token=hold.token)
+    assert [delta for _, delta in subscription.wait(0)] == [
+        {"taken": [1, 2], "free": []},
+        {"taken": [3], "free": [1]},
+    ]
+
+    clock.now = 60
+    assert subscription.wait(0) == [], "An idle wait checks for expired holds"
+    assert subscription.wait(0) == [(3, {"taken": [], "free": [2, 3]})]
+
+    claimed = holds.hold("F1", [5], ttl_seconds=60)
+    holds.release(claimed.token, booked=True)
+    assert [delta for _, delta in subscription.wait(0)] == [{"taken": [5], "free": []}], "Booked seats stay taken"
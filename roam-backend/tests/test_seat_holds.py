@@ -0,0 +1,69 @@
+import pytest
+from app.seat_holds import SeatHolds
+from app.seat_layouts import SeatUnavailableError
+from tests.helpers import FakeClock
+
+
+def test_holds_expire_and_release_their_seats():
+    clock = FakeClock()
+    holds = SeatHolds(clock=clock)
+    hold = holds.hold("F1", [1, 2], ttl_seconds=60)
+    assert holds.held_seats("F1") == {1, 2}
+    assert holds.held_seats("F1", exclude_tokens=[hold.token]) == set()
+
+    clock.now = 59.9
+    assert holds.get(hold.token) is hold
+    clock.now = 60.0
+    assert holds.get(hold.token) is None
+    assert holds.held_seats("F1") == set()
+
+def test_conflicting_holds_are_rejected():
+    holds = SeatHolds(clock=FakeClock())
+    holds.hold("F1", [1, 2], ttl_seconds=60)
+    with pytest.raises(SeatUnavailableError):
+        holds.hold("F1", [2, 3], ttl_seconds=60)
+    assert holds.hold("F2", [2], ttl_seconds=60), "The same seat on another flight is free"
+    assert holds.held_seats("F1") == {1, 2}
+
+def test_extending_a_hold_replaces_its_seats_and_restarts_its_clock():
+    clock = FakeClock()
+    holds = SeatHolds(clock=clock)
+    hold = holds.hold("F1", [1], ttl_seconds=60)
+    clock.now = 50
+    extended = holds.hold("F1", [1, 5], ttl_seconds=60, token=hold.token)
+    assert extended.token == hold.token
+    clock.now = 100
+    assert holds.held_seats("F1") == {1, 5}, "The stale expiry of the original hold must be ignored"
+    clock.now = 110
+    assert holds.held_seats("F1") == set()
+
+    other = holds.hold("F2", [1], ttl_seconds=60)
+    with pytest.raises(ValueError):
+        holds.hold("F1", [1], ttl_seconds=60, token=other.token)
+
+def test_released_holds_free_seats_immediately():
+    holds = SeatHolds(clock=FakeClock())
+    hold = holds.hold("F1", [7], ttl_seconds=60)
+    assert holds.release(hold.token)
+    assert not holds.release(hold.token)
+    assert holds.hold("F1", [7], ttl_seconds=60).token != hold.token
+
+def test_unknown_tokens_start_a_hold_with_a_new_token():
+    clock = FakeClock()
+    holds = SeatHolds(clock=clock)
+    assert holds.hold("F1", [1], ttl_seconds=60, token="chosen-by-client").token != "chosen-by-client"
+
+    expired = holds.hold("F1", [2], ttl_seconds=60)
+    clock.now = 60
+    renewed = holds.hold("F1", [2], ttl_seconds=60, token=expired.token)
+    assert renewed.token != expired.token
+    assert holds.get(expired.token) is None
+
+def test_reclaiming_only_touches_expired_holds():
+    clock = FakeClock()
+    holds = SeatHolds(clock=clock)
+    for i in range(100):
+        holds.hold(f"F{i}", [1], ttl_seconds=10 + i)
+    clock.now = 15
+    assert len(holds) == 94
+    assert len(holds._expiry) == 94, "Expired entries should be popped, live ones left alone"
@@ -1,4 +1,9 @@
+import json
+import uuid
+from concurrent.futures import ThreadPoolExecutor
 import pytest
+from sqlalchemy import event
+from sqlalchemy.exc import IntegrityError
 from app import create_app, db
 from app.models.dto.trip_dto import TripDTO
 from app.models.entities.trip_entity import TripEntity
@@ -12,8 +17,13 @@ from app.models.dto.airline_dto import AirlineDTO
 from app.models.entities.airline_entity import AirlineEntity
 from app.models.entities.continent_entity import ContinentEntity
 from app.models.entities.country_entity import CountryEntity
+from app.models.entities.passenger_entity import PassengerEntity
+from app.models.entities.flight_seats_entity import FlightSeatsEntity
+from app.models.entities.location_entity import LocationEntity
+from app.repositories.trip_repository import TripRepository
 
 from datetime import date
+from tests.helpers import denormalize_flight
 
 @pytest.fixture
 def setup_airport_flight():
@@ -26,7 +36,7 @@ def setup_airport_flight():
     # Check if country exists, create if not
     country = CountryEntity.query.filter_by(guid="country123").first()
     if not country:
-        country = CountryEntity(guid="country123", code="USA", name="United States", continent=continent)
+        country = CountryEntity(guid="country123", code="US", name="United States", continent=continent)
         db.session.add(country)
 
     test_airport = AirportEntity.query.filter_by(guid="12345").first()
@@ -38,7 +48,7 @@ def setup_airport_flight():
             municipality_name="Test City",
             iata_code="TPT",
             location=LocationDTO(guid="loc123", latitude=37.7749, longitude=-122.4194),
-            country=CountryDTO(guid="country123", code="USA", name="United States", continent=None)
+            country=CountryDTO(guid="country123", code="US", name="United States", continent=None)
         )
         test_airport = AirportEntity.from_dto(airport_dto)
         db.session.add(test_airport)
@@ -47,7 +57,7 @@ def setup_airport_flight():
     if not test_airline:
         airline_dto = AirlineDTO(
             guid="test_airline123",
-            icao_code="ICAO123",
+            icao_code="IC12",
             name="Test Airline",
             logo_path=None
         )
@@ -117,6 +127,23 @@ def setup_trip(client, setup_airport_flight):
     db.session.delete(trip)
     db.session.commit()
 
+def trip_payload(departing_flight, seats=(), returning_flight=None, guid=None, **fields):
+    """Build the JSON body for booking a trip, with one passenger per seat.
+
+    For a round trip, each seat is a (departing, returning) pair of seat numbers.
+    """
+    passengers = []
+    for i, seat in enumerate(seats):
+        departing, returning = seat if returning_flight else (seat, None)
+        passengers.append({"guid": str(uuid.uuid4()), "name": f"Passenger {i}",
+                           "departing_seat_id": departing, "returning_seat_id": returning})
+    return {
+        "guid": guid or str(uuid.uuid4()), "name": "Test Trip", "is_round_trip": returning_flight is not None,
+        "departure_date": "2024-11-20", "return_date": "2024-11-27" if returning_flight else None,
+        "departing_flight": departing_flight, "returning_flight": returning_flight, "passengers": passengers,
+        **fields,
+    }
+
 def test_create_trip(client):
     response = client.post('/api/trips', json={
         "guid": "trip456",
@@ -135,7 +162,7 @@ def test_create_trip(client):
             "baggage_allowance": "1 checked bag", 
             "airline": {
                 "guid": "test_airline123", 
-                "icao_code": "ICAO123", 
+                "icao_code": "IC12", 
                 "name": "Test Airline", 
                 "logo_path": None
             },
@@ -152,7 +179,7 @@ def test_create_trip(client):
                 },
                 "country": {
                     "guid": "country123",
-                    "code": "USA",
+                    "code": "US",
                     "name": "United States",
                     "continent": {
                         "guid": "cont123",
@@ -174,7 +201,7 @@ def test_create_trip(client):
                 },
                 "country": {
                     "guid": "country123",
-                    "code": "USA",
+                    "code": "US",
                     "name": "United States",
                     "continent": {
                         "guid": "cont123",
@@ -212,4 +239,275 @@ def test_delete_trip(client, setup_trip):
 
     assert response.status_code == 200
     data = response.get_json()
-    assert data == {"message": "Trip deleted successfully"}
\ No newline at end of file
+    assert data == {"message": "Trip deleted successfully"}
+
+def test_trip_endpoints_use_constant_query_count(client, setup_airport_flight, count_queries):
+    """Test that eager loading keeps the trip list query count independent of the number of trips."""
+    trips = []
+
+    def measure(total):
+        while len(trips) < total:
+            trip = TripEntity(name=f"Eager Trip {len(trips)}", is_round_trip=True, departure_date=date(2024, 11, 20),
+                              return_date=date(2024, 11, 27), departing_flight_id="test_flight123",
+                              returning_flight_id="test_flight123")
+            trip.passengers.append(PassengerEntity(name="Passenger", departing_seat_id=len(trips) + 1,
+                                                   returning_seat_id=len(trips) + 1))
+            db.session.add(trip)
+            trips.append(trip)
+        db.session.commit()
+        return count_queries(lambda: client.get('/api/trips/round_trip/true'))
+
+    few = measure(1)
+    many = measure(6)
+    assert few == many, "Query count should not grow with the number of trips"
+    assert many <= 4
+
+    for trip in trips:
+        db.session.delete(trip)
+    db.session.commit()
+
+def test_get_trips_normalized_shape(client, setup_trip):
+    nested = client.get('/api/trips').get_json()
+    response = client.get('/api/trips?shape=normalized')
+    assert response.status_code == 200
+    normalized = response.get_json()
+    assert set(normalized) == {"trips", "airports", "airlines"}
+
+    rebuilt = [
+        {
+            **trip,
+            "departing_flight": denormalize_flight(trip["departing_flight"], normalized["airports"], normalized["airlines"]),
+            "returning_flight": denormalize_flight(trip["returning_flight"], normalized["airports"], normalized["airlines"]),
+        }
+        for trip in normalized["trips"]
+    ]
+    assert rebuilt == nested
+    assert client.get('/api/trips?shape=flat').status_code == 400
+
+def test_concurrent_bookings_never_double_book(tmp_path):
+    """Test that hundreds of parallel checkouts on one flight book each seat at most once and lose no bookings."""
+    # SQLite in memory shares one connection between threads, so this test gets a database file of its own.
+    # Everything touching it runs on worker threads, which keeps their sessions apart from the suite's session.
+    app = create_app('testing')
+    app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{tmp_path / 'bookings.db'}"
+    db.create_all(app=app)
+    stress_client = app.test_client()
+    free_seats = list(range(21, 81))
+
+    def seed():
+        with app.app_context():
+            continent = ContinentEntity(guid="cont123", code="NA", name="North America")
+            country = CountryEntity(guid="country123", code="US", name="United States", continent=continent)
+            airport = AirportEntity(guid="12345", full_name="Test Airport", short_name="Test", municipality_name="Test City",
+                                    iata_code="TST", country=country, location=LocationEntity(guid="loc123", latitude=1.0, longitude=2.0))
+            airline = AirlineEntity(guid="test_airline123", icao_code="IC12", name="Test Airline", logo_path=None)
+            flight = FlightEntity(guid="stress_flight", flight_time_minutes=60, departure_time="8:00AM", arrival_time="9:00AM",
+                                  num_stops=0, price_economy=100.0, price_business=300.0, baggage_allowance="1 checked bag",
+                                  airline=airline, departure_airport=airport, arrival_airport=airport)
+            flight.seat_configuration = FlightSeatsEntity(flight_id="stress_flight")
+            flight.seat_configuration.booked_mask = flight.seat_configuration.layout.all_seats
+            for seat_id in free_seats:
+                flight.seat_configuration.booked_mask &= ~flight.seat_configuration.layout.seat_mask(seat_id)
+            db.session.add(flight)
+            db.session.commit()
+            return flight.to_dto().to_dict()
+
+    def book(i):
+        return stress_client.post('/api/trips', json=trip_payload(flight, [free_seats[i % len(free_seats)]])).status_code
+
+    def booked_state():
+        with app.app_context():
+            seats = FlightSeatsEntity.query.filter_by(flight_id="stress_flight").first()
+            passengers = PassengerEntity.query.join(TripEntity).filter(TripEntity.departing_flight_id == "stress_flight").all()
+            return seats.seat_configuration, seats.seats_available, [passenger.departing_seat_id for passenger in passengers]
+
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        flight = executor.submit(seed).result()
+    with ThreadPoolExecutor(max_workers=16) as executor:
+        statuses = list(executor.map(book, range(4 * len(free_seats))))
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        configuration, seats_available, passenger_seats = executor.submit(booked_state).result()
+
+    assert set(statuses) <= {201, 409}
+    assert statuses.count(201) == len(free_seats), "Every free seat should be booked exactly once"
+    assert sorted(passenger_seats) == free_seats, "Each booked seat should belong to exactly one trip"
+    assert all(not seat["available"] for seat in configuration), "No successful booking should be lost"
+    assert seats_available == 0
+
+def test_create_trip_reserves_all_seats_or_none(client, setup_airport_flight):
+    """Test that a trip's seats are booked together and a single conflict books none of them."""
+    flight = FlightEntity.query.filter_by(guid="test_flight123").first().to_dto().to_dict()
+    seats = FlightSeatsEntity.query.filter_by(flight_id="test_flight123").first()
+    free = [seat["seat_id"] for seat in seats.seat_configuration if seat["available"]][:3]
+    taken = next(seat["seat_id"] for seat in seats.seat_configuration if not seat["available"])
+
+    conflicting = trip_payload(flight, [(free[0], free[1]), (free[2], taken)], returning_flight=flight)
+    response = client.post('/api/trips', json=conflicting)
+    assert response.status_code == 409
+    assert str(taken) in response.get_json()["error"]
+    db.session.expire_all()
+    assert all(seat["available"] for seat in seats.seat_configuration if seat["seat_id"] in free), "No seat should be booked"
+    assert TripEntity.query.filter_by(guid=conflicting["guid"]).first() is None
+
+    # The same flight both ways: the outbound and return seats share one seat map
+    duplicate = trip_payload(flight, [(free[0], free[0])], returning_flight=flight)
+    assert client.post('/api/trips', json=duplicate).status_code == 409
+
+    booked = trip_payload(flight, [(free[0], free[1])], returning_flight=flight)
+    assert client.post('/api/trips', json=booked).status_code == 201
+    db.session.expire_all()
+    assert [seat["available"] for seat in seats.seat_configuration if seat["seat_id"] in free[:2]] == [False, False]
+    assert len(PassengerEntity.query.filter_by(trip_id=booked["guid"]).all()) == 1
+
+    db.session.delete(TripEntity.query.filter_by(guid=booked["guid"]).first())
+    db.session.commit()
+
+def test_checkout_seat_holds(client, setup_airport_flight):
+    """Test that held seats are hidden from other checkouts and claimed by the booking that holds them."""
+    flight = FlightEntity.query.filter_by(guid="test_flight123").first().to_dto().to_dict()
+    seats = FlightSeatsEntity.query.filter_by(flight_id="test_flight123").first()
+    seat_id = next(seat["seat_id"] for seat in seats.seat_configuration if seat["available"])
+
+    response = client.post('/api/flight/test_flight123/holds', json={"seat_ids": [seat_id]})
+    assert response.status_code == 201
+    hold = response.get_json()
+    assert hold["seat_ids"] == [seat_id]
+    assert hold["expires_in_seconds"] == client.application.config['SEAT_HOLD_MINUTES'] * 60
+
+    seat_map = client.get('/api/flight/test_flight123/seats').get_json()
+    assert seat_map["seat_configuration"][seat_id - 1]["available"] is False
+    own_map = client.get(f'/api/flight/test_flight123/seats?hold={hold["token"]}').get_json()
+    assert own_map["seat_configuration"][seat_id - 1]["available"] is True
+    assert own_map["seats_available"] == seat_map["seats_available"] + 1
+
+    assert client.post('/api/flight/test_flight123/holds', json={"seat_ids": [seat_id]}).status_code == 409
+    assert client.post('/api/flight/test_flight123/holds', json={"seat_ids": [999]}).status_code == 400
+    assert client.post('/api/flight/test_flight123/holds', json={"seat_ids": [True]}).status_code == 400
+    for token in (["x"], {"token": "x"}, 5):
+        response = client.post('/api/flight/test_flight123/holds', json={"seat_ids": [seat_id], "token": token})
+        assert response.status_code == 400
+        assert response.get_json()["error"] == "token must be a hold token."
+    assert client.post('/api/flight/missing_flight/holds', json={"seat_ids": [1]}).status_code == 404
+
+    def trip(hold_tokens):
+        return trip_payload(flight, [seat_id], hold_tokens=hold_tokens)
+
+    assert client.post('/api/trips', json=trip([])).status_code == 409, "Another checkout's hold should block the seat"
+    assert client.post('/api/trips', json=trip(hold["token"])).status_code == 400, "A bare token is not a list of tokens"
+    booked = trip([hold["token"]])
+    assert client.post('/api/trips', json=booked).status_code == 201
+    assert client.delete(f'/api/flight/holds/{hold["token"]}').status_code == 404, "Booking should release the hold"
+
+    db.session.delete(TripEntity.query.filter_by(guid=booked["guid"]).first())
+    db.session.commit()
+
+def test_seat_availability_follows_bookings_and_cancellations(client, setup_airport_flight):
+    """Test that availability summaries match the seat map and move with bookings and cancellations."""
+    def summary():
+        response = client.get('/api/flight/test_flight123/availability')
+        assert response.status_code == 200
+        return response.get_json()
+
+    def counted_from_seat_map():
+        seat_map = client.get('/api/flight/test_flight123/seats').get_json()
+        cabins = {}
+        for seat in seat_map["seat_configuration"]:
+            cabin = cabins.setdefault(seat["type"], {"seats_available": 0, "positions": {}})
+            cabin["positions"].setdefault(seat["position"], 0)
+            if seat["available"]:
+                cabin["seats_available"] += 1
+                cabin["positions"][seat["position"]] += 1
+        return {"flight_id": "test_flight123", "seats_available": seat_map["seats_available"], "cabins": cabins}
+
+    before = summary()
+    assert before == counted_from_seat_map()
+    assert client.get('/api/flight/missing_flight/availability').status_code == 404
+
+    flight = FlightEntity.query.filter_by(guid="test_flight123").first().to_dto().to_dict()
+    seats = FlightSeatsEntity.query.filter_by(flight_id="test_flight123").first()
+    free = [seat["seat_id"] for seat in seats.seat_configuration if seat["available"] and seat["type"] == "Economy"][:2]
+    trip = trip_payload(flight, free)
+    assert client.post('/api/trips', json=trip).status_code == 201
+    booked = summary()
+    assert booked["seats_available"] == before["seats_available"] - 2
+    assert booked["cabins"]["Economy"]["seats_available"] == before["cabins"]["Economy"]["seats_available"] - 2
+    assert booked == counted_from_seat_map()
+
+    response = client.post('/api/flights/availability', json={"flight_ids": ["test_flight123", "missing_flight"]})
+    assert response.status_code == 200
+    assert response.get_json() == {"test_flight123": booked}
+
+    assert client.delete(f'/api/trips/{trip["guid"]}/{trip["passengers"][0]["guid"]}').status_code == 200
+    assert summary()["seats_available"] == before["seats_available"] - 1
+    assert client.delete(f'/api/trips/{trip["guid"]}').status_code == 200
+    assert summary() == before, "Cancelling should free every seat the trip booked"
+
+def test_seat_stream_pushes_bookings_holds_and_cancellations(client, setup_airport_flight):
+    """Test that the seat stream sends a delta for every change to which seats can be picked."""
+    assert client.get('/api/flight/missing_flight/seats/stream').status_code == 404
+    response = client.get('/api/flight/test_flight123/seats/stream', buffered=False)
+    assert response.status_code == 200
+    assert response.mimetype == "text/event-stream"
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b"retry:")
+
+    def next_delta():
+        lines = next(chunks).decode().splitlines()
+        assert "event: seats" in lines
+        return json.loads(next(line for line in lines if line.startswith("data: "))[len("data: "):])
+
+    flight = FlightEntity.query.filter_by(guid="test_flight123").first().to_dto().to_dict()
+    seats = FlightSeatsEntity.query.filter_by(flight_id="test_flight123").first()
+    held, booked = [seat["seat_id"] for seat in seats.seat_configuration if seat["available"]][:2]
+
+    hold = client.post('/api/flight/test_flight123/holds', json={"seat_ids": [held]}).get_json()
+    assert next_delta() == {"taken": [held], "free": []}
+    client.delete(f'/api/flight/holds/{hold["token"]}')
+    assert next_delta() == {"taken": [], "free": [held]}
+
+    trip = trip_payload(flight, [booked])
+    assert client.post('/api/trips', json=trip).status_code == 201
+    assert next_delta() == {"taken": [booked], "free": []}
+    assert client.delete(f'/api/trips/{trip["guid"]}').status_code == 200
+    assert next_delta() == {"taken": [], "free": [booked]}
+
+    response.close()
+    assert client.application.extensions["seat_events"].subscriber_count("test_flight123") == 0
+
+def test_trip_creation_is_one_unit_of_work(client, setup_airport_flight):
+    """Test that creating a trip with a new flight commits once, and that a failure stores none of its graph."""
+    airport = {"guid": "12345", "full_name": "Test Airport Full Name", "short_name": "Test Airport",
+               "municipality_name": "Test City", "iata_code": "TPT"}
+    new_airport = {"guid": "uow_airport", "full_name": "Unit Of Work Airport", "short_name": "UoW",
+                   "municipality_name": "Worktown", "iata_code": "UOW",
+                   "location": {"guid": "uow_location", "latitude": 1.0, "longitude": 2.0},
+                   "country": {"guid": "country123", "code": "US", "name": "United States"}}
+
+    def new_flight(flight_guid):
+        return {
+            "guid": flight_guid, "flight_time_minutes": 90, "departure_time": "6:00AM", "arrival_time": "7:30AM",
+            "num_stops": 1, "price_economy": 150.0, "price_business": 450.0, "baggage_allowance": "1 checked bag",
+            "airline": {"guid": "test_airline123", "icao_code": "IC12", "name": "Test Airline", "logo_path": None},
+            "departure_airport": airport, "arrival_airport": airport,
+            "layover": {"guid": f"{flight_guid}_layover", "airport": new_airport, "duration_minutes": 40},
+        }
+
+    commits = []
+    def record(conn):
+        commits.append(conn)
+
+    trip_guid = str(uuid.uuid4())
+    event.listen(db.engine, "commit", record)
+    try:
+        response = client.post('/api/trips', json=trip_payload(new_flight("uow_flight"), guid=trip_guid))
+    finally:
+        event.remove(db.engine, "commit", record)
+    assert response.status_code == 201, response.get_json()
+    assert len(commits) == 1
+    assert db.session.get(AirportEntity, "uow_airport").location_id == "uow_location"
+
+    # The trip GUID is taken, so the insert fails after the new flight, its layover and seat map were added
+    with pytest.raises(IntegrityError):
+        TripRepository.add(TripDTO.from_dict(trip_payload(new_flight("uow_flight_2"), guid=trip_guid)))
+    assert db.session.get(FlightEntity, "uow_flight_2") is None
+    assert db.session.query(TripEntity).filter_by(guid=trip_guid).one().departing_flight_id == "uow_flight"
@@ -0,0 +1,21 @@
+import { FlightSearch, FlightSearchPage } from "@/models";
+
+export async function fetchFlightPageBySearchQuery(searchData: FlightSearch): Promise<FlightSearchPage> {
+  const response = await fetch(
+    `/api/flights/search`,
+    {
+      method: "POST",
+      headers: {
+        "Content-Type": "application/json",
+      },
+      body: JSON.stringify({ page_size: 20, ...searchData }),
+    }
+  );
+
+  if (!response.ok) {
+    throw new Error("Failed to fetch flights");
+  }
+
+  const data: FlightSearchPage = await response.json();
+  return data;
+}
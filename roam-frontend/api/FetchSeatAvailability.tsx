@@ -0,0 +1,38 @@
+import { SeatAvailability, SeatSuggestions } from "@/models";
+
+export async function fetchSeatAvailability(flightGuid: string): Promise<SeatAvailability> {
+  const response = await fetch(`/api/flight/${flightGuid}/availability`);
+  if (!response.ok) {
+    throw new Error("Failed to fetch seat availability");
+  }
+  const data = await response.json();
+  return data;
+}
+
+// One request for a whole results page; flights without a seat map are left out of the result.
+// Passing groupSize adds a seats_together flag to every cabin.
+export async function fetchSeatAvailabilities(flightGuids: string[], groupSize?: number): Promise<Record<string, SeatAvailability>> {
+  const response = await fetch(`/api/flights/availability`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ flight_ids: flightGuids, group_size: groupSize }),
+  });
+  if (!response.ok) {
+    throw new Error("Failed to fetch seat availability");
+  }
+  const data = await response.json();
+  return data;
+}
+
+export async function fetchSeatSuggestions(flightGuid: string, count: number, cabin?: string): Promise<SeatSuggestions> {
+  const params = new URLSearchParams({ count: String(count) });
+  if (cabin) params.set("cabin", cabin);
+  const response = await fetch(`/api/flight/${flightGuid}/seats/suggest?${params}`);
+  if (!response.ok) {
+    throw new Error("Failed to fetch seat suggestions");
+  }
+  const data = await response.json();
+  return data;
+}
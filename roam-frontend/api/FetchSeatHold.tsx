@@ -0,0 +1,25 @@
+import { SeatHold } from "@/models";
+
+export class SeatHoldError extends Error {
+  constructor(message: string, public status: number) {
+    super(message);
+  }
+}
+
+// Holds the given seats for the rest of the checkout; passing the flight's existing token replaces its seats
+export async function createSeatHold(flightGuid: string, seatIds: number[], token?: string): Promise<SeatHold> {
+  const response = await fetch(`/api/flight/${flightGuid}/holds`, {
+    method: "POST",
+    headers: {
+      "Content-Type": "application/json",
+    },
+    body: JSON.stringify({ seat_ids: seatIds, token }),
+  });
+
+  if (!response.ok) {
+    throw new SeatHoldError("Failed to hold seats", response.status);
+  }
+
+  const data: SeatHold = await response.json();
+  return data;
+}
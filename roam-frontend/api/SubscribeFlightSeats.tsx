@@ -0,0 +1,20 @@
+import { SeatDelta } from "@/models";
+
+// Follows live seat changes on a flight; onReset means changes were missed and the seat map should be reloaded.
+// Returns a function that closes the stream.
+export function subscribeToFlightSeats(
+  flightGuid: string,
+  onDelta: (delta: SeatDelta) => void,
+  onReset: () => void,
+): () => void {
+  if (typeof EventSource === "undefined") {
+    return () => {};
+  }
+
+  const source = new EventSource(`/api/flight/${flightGuid}/seats/stream`);
+  source.addEventListener("seats", (event) => {
+    onDelta(JSON.parse((event as MessageEvent).data));
+  });
+  source.addEventListener("reset", onReset);
+  return () => source.close();
+}
@@ -59,7 +59,10 @@ const Checkout: React.FC = () => {
       if (!tripData.trip) {
         return;
       }
-      await FetchBookingCheckout(tripData.trip);
+      await FetchBookingCheckout({
+        ...tripData.trip,
+        hold_tokens: Object.values(tripData.seat_holds ?? {}),
+      });
       setSuccessLoaderShowButton(true);
       setSuccessLoaderState("success");
       setSuccessLoaderShowButton(true);
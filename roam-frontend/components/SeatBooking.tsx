@@ -9,7 +9,9 @@ import { useTripStore, TripData } from "@/context/TripContext";
 import { useLoaderStore } from "@/context/LoaderContext";
 import { PossibleSeatStates } from "@/components/SeatSelection/Seat";
 import { fetchFlightSeats } from "@/api/FetchFlightSeats";
-import { PassengerFormData, transformToPassenger, Passenger, Seat, Flight } from "@/models";
+import { createSeatHold, SeatHoldError } from "@/api/FetchSeatHold";
+import { subscribeToFlightSeats } from "@/api/SubscribeFlightSeats";
+import { PassengerFormData, transformToPassenger, Passenger, Seat, SeatDelta, Flight } from "@/models";
 
 export default function SeatBookingPage() {
   const [selectedSeat, setSelectedSeat] = useState<number | null>(null);
@@ -78,6 +80,29 @@ export default function SeatBookingPage() {
     }
   }, []);
 
+  // Seats other travellers book, hold, or give up; this traveller's own selected and reserved seats are left alone
+  const applySeatDelta = useCallback((delta: SeatDelta) => {
+    setSeatStates((prev) => {
+      const next = { ...prev };
+      delta.taken.forEach((id) => {
+        if (next[id] === "available") next[id] = "taken";
+      });
+      delta.free.forEach((id) => {
+        if (next[id] === "taken") next[id] = "available";
+      });
+      return next;
+    });
+  }, []);
+
+  const flightGuid = tripData?.current_flight?.guid;
+  useEffect(() => {
+    if (!flightGuid || !tripData.current_flight) return;
+    const flight = tripData.current_flight;
+    return subscribeToFlightSeats(flightGuid, applySeatDelta, () => loadFlightSeats(flight));
+    // Resubscribe only when the flight changes, not on every update of the trip data
+    // eslint-disable-next-line react-hooks/exhaustive-deps
+  }, [flightGuid]);
+
   const toggleSeatState = (id: number) => {
     setSeatStates((prevState) => {
       const newSeatStates: { [id: number]: PossibleSeatStates } = {};
@@ -131,9 +156,33 @@ export default function SeatBookingPage() {
       ...tripData.trip.passengers.slice(passengerIndex + 1),
     ];
 
+    // Hold every seat picked on this flight so far, so they are not lost before checkout
+    let seatHolds = tripData.seat_holds ?? {};
+    const flight = tripData.current_flight;
+    if (selectedSeat !== null && flight) {
+      const seatIds = updatedPassengers
+        .slice(0, passengerIndex + 1)
+        .map((passenger) => (isFirstFlight ? passenger.departing_seat_id : passenger.returning_seat_id))
+        .filter((seatId): seatId is number => !!seatId);
+      try {
+        const hold = await createSeatHold(flight.guid, seatIds, seatHolds[flight.guid]);
+        seatHolds = { ...seatHolds, [flight.guid]: hold.token };
+      } catch (error) {
+        if (error instanceof SeatHoldError && error.status === 409) {
+          // Someone else got the seat first
+          setSeatStates((prev) => ({ ...prev, [selectedSeat]: "taken" }));
+          setSelectedSeat(null);
+          hideLoader();
+          return;
+        }
+        console.error("Error holding seat:", error);
+      }
+    }
+
     // Prepare the new trip data
     const updatedTrip: TripData = {
       ...tripData,
+      seat_holds: seatHolds,
       trip: {
         ...tripData.trip,
         passengers: updatedPassengers,
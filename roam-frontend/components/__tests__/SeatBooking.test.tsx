@@ -56,6 +56,16 @@ jest.mock("@/components/SeatSelection/Airplane", () => {
   };
 });
 
+jest.mock('@/api/FetchSeatHold', () => ({
+  SeatHoldError: class SeatHoldError extends Error {},
+  createSeatHold: jest.fn().mockResolvedValue({
+    token: "mock-hold-token",
+    flight_id: "mock-flight-id",
+    seat_ids: [1],
+    expires_in_seconds: 600,
+  }),
+}));
+
 jest.mock('@/api/FetchFlightSeats', () => ({
   fetchFlightSeats: jest.fn().mockResolvedValue({
     guid: "mock-guid",
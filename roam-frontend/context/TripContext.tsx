@@ -11,6 +11,7 @@ export interface TripData {
   total_cost: number;
   trip_booking_active: boolean;
   trip_purchased: boolean
+  seat_holds?: Record<string, string>; // Seat hold token by flight guid
 }
 
 export interface TripState {
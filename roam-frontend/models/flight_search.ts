@@ -1,4 +1,24 @@
+import { Flight } from "@/models";
+
+export type TimeOfDay = "Morning" | "Afternoon" | "Evening";
+export type FlightSortKey = "price" | "duration" | "departure_time";
+
 export interface FlightSearch {
     departure_airport_id: string;
     arival_airport_id: string;
+    max_price?: number;
+    stops?: number;
+    departure_time_of_day?: TimeOfDay;
+    arrival_time_of_day?: TimeOfDay;
+    departure_after?: string;  // 24-hour "HH:MM", inclusive
+    departure_before?: string;  // 24-hour "HH:MM", inclusive, may wrap past midnight
+    airline_id?: string;
+    sort_by?: FlightSortKey;
+    page_size?: number;
+    cursor?: string;
+}
+
+export interface FlightSearchPage {
+    flights: Flight[];
+    next_cursor: string | null;
 }
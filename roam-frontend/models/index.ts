@@ -6,6 +6,7 @@ export * from "./airline";
 export * from "./flight";
 export * from "./layover";
 export * from "./flight_search";
+export * from "./normalized";
 export * from "./filter_options";
 export * from "./user";
 export * from "./login_response";
@@ -14,5 +15,8 @@ export * from "./passenger";
 export * from "./passenger_form_data";
 export * from "./flight_seat_configuration";
 export * from "./seat";
+export * from "./seat_hold";
+export * from "./seat_availability";
+export * from "./seat_delta";
 export * from "./display_purchase"
 export * from "./helper_functions";
\ No newline at end of file
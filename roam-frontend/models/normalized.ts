@@ -0,0 +1,62 @@
+import { Airline, Airport, Flight, Trip } from "@/models";
+
+// Responses requested with ?shape=normalized reference airports and airlines by guid
+// and carry each distinct one once in the side tables.
+
+export interface NormalizedLayover {
+    guid: string;
+    airport_id: string | null;
+    duration_minutes: number;
+}
+
+export interface NormalizedFlight extends Omit<Flight, "airline" | "departure_airport" | "arrival_airport" | "layover"> {
+    airline_id: string | null;
+    departure_airport_id: string | null;
+    arrival_airport_id: string | null;
+    layover: NormalizedLayover | null;
+}
+
+export interface NormalizedTrip extends Omit<Trip, "departing_flight" | "returning_flight"> {
+    departing_flight: NormalizedFlight | null;
+    returning_flight: NormalizedFlight | null;
+}
+
+export interface ReferenceTables {
+    airports: Record<string, Airport>;
+    airlines: Record<string, Airline>;
+}
+
+export interface NormalizedFlightList extends ReferenceTables {
+    flights: NormalizedFlight[];
+    next_cursor?: string | null;
+}
+
+export interface NormalizedTripList extends ReferenceTables {
+    trips: NormalizedTrip[];
+}
+
+export function denormalizeFlight(flight: NormalizedFlight, tables: ReferenceTables): Flight {
+    const { airline_id, departure_airport_id, arrival_airport_id, layover, ...rest } = flight;
+
+    return {
+        ...rest,
+        airline: tables.airlines[airline_id ?? ""],
+        departure_airport: tables.airports[departure_airport_id ?? ""],
+        arrival_airport: tables.airports[arrival_airport_id ?? ""],
+        layover: layover
+            ? { guid: layover.guid, airport: tables.airports[layover.airport_id ?? ""], duration_minutes: layover.duration_minutes }
+            : undefined,
+    };
+}
+
+export function denormalizeFlights(list: NormalizedFlightList): Flight[] {
+    return list.flights.map((flight) => denormalizeFlight(flight, list));
+}
+
+export function denormalizeTrips(list: NormalizedTripList): Trip[] {
+    return list.trips.map((trip) => ({
+        ...trip,
+        departing_flight: trip.departing_flight ? denormalizeFlight(trip.departing_flight, list) : null,
+        returning_flight: trip.returning_flight ? denormalizeFlight(trip.returning_flight, list) : null,
+    }));
+}
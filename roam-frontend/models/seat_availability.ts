@@ -0,0 +1,18 @@
+export interface CabinAvailability {
+    seats_available: number;
+    positions: Record<string, number>; // Window, Aisle, or Middle
+    seats_together?: boolean; // Only when requested with a group_size
+}
+
+export interface SeatAvailability {
+    flight_id: string;
+    seats_available: number;
+    cabins: Record<string, CabinAvailability>; // Business or Economy
+}
+
+export interface SeatSuggestions {
+    flight_id: string;
+    cabin: string | null;
+    count: number;
+    suggestions: { seat_ids: number[] }[];
+}
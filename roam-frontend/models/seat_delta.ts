@@ -0,0 +1,5 @@
+// Change pushed by /api/flight/<guid>/seats/stream: seats that became unavailable or free
+export interface SeatDelta {
+    taken: number[];
+    free: number[];
+}
@@ -0,0 +1,6 @@
+export interface SeatHold {
+    token: string;
+    flight_id: string;
+    seat_ids: number[];
+    expires_in_seconds: number;
+}
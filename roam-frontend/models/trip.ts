@@ -9,4 +9,5 @@ export interface Trip {
     passengers: Passenger[];
     departure_date: Date | null;
     return_date: Date | null;
+    hold_tokens?: string[];
 }
\ No newline at end of file